@@ -5,7 +5,7 @@ from psiqworkbench.filter_presets import BIT_DEFAULT
 
 from qmath.utils.symbolic import alloc_temp_qreg_like
 from qmath.func.common import MultiplyAdd, MultiplyConstAdd, Add, AddConst, Negate
-from qmath.func.square import Square
+from qmath.func.square import Square, SquareOptimized
 
 from qmath.utils.gates import ParallelCnot
 
@@ -26,11 +26,15 @@ ops = []
 
 
 class EvaluateExpression(Qubrick):
-    """Evaluates arithmetic expression."""
+    """Evaluates arithmetic expression.
 
-    def __init__(self, expr: str, mutable_vars: set[str] = None, **kwargs):
+    If `optimized_square` is set, squares are computed with padded SquareOptimized.
+    """
+
+    def __init__(self, expr: str, mutable_vars: set[str] = None, *, optimized_square: bool = False, **kwargs):
         super().__init__(**kwargs)
         self.expr = expr
+        self.optimized_square = optimized_square
         self.vars = dict()
         self.immutable_regs = set()
         self.mutable_vars = mutable_vars or set()
@@ -124,7 +128,10 @@ class EvaluateExpression(Qubrick):
 
         if isinstance(arg2, QFixed):
             if arg1.mask() == arg2.mask():
-                Square().compute(arg1, ans)
+                if self.optimized_square:
+                    SquareOptimized(padding="auto").compute(arg1, ans)
+                else:
+                    Square().compute(arg1, ans)
                 return ans
             MultiplyAdd().compute(ans, arg1, arg2)
         else:
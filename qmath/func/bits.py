@@ -2,12 +2,78 @@
 
 from psiqworkbench import Qubits
 from psiqworkbench.qubricks import Qubrick
+from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
+
+from ..utils.gates import ParallelCnot, write_uint
+from ..utils.perm import ShiftLeft
+from ..utils.prefix import brent_kung_schedule
+
+
+class _SuffixOr(Qubrick):
+    """Computes s[i]=OR(a[i:]) for all i, using Brent-Kung prefix tree.
+
+    Result register is made of a[n-1] and n-1 new ancillae.
+    """
+
+    def _or(self, x: Qubits, y: Qubits) -> Qubits:
+        t = self.alloc_temp_qreg(1, "or")
+        x.x()
+        y.x()
+        t.lelbow(x | y)
+        x.x()
+        y.x()
+        t.x()
+        return t
+
+    def _compute(self, a: Qubits):
+        n = a.num_qubits
+        p = [a[n - 1 - k] for k in range(n)]
+        for k, j in brent_kung_schedule(n):
+            p[k] = self._or(p[j], p[k])
+        s = p[n - 1]
+        for k in range(n - 2, -1, -1):
+            s = s | p[k]
+        self.set_result_qreg(s)
 
 
 class HighestSetBit(Qubrick):
-    """Finds most significant set bit in a and sets it in ans."""
+    """Finds most significant set bit in a and sets it in ans.
+
+    By default, input is scanned from the top with a single flag qubit. This
+    takes n elbows with depth n, and leaves the flag as garbage.
+
+    If `log_depth` is set, ORs of all suffixes of a are computed with
+    Brent-Kung prefix tree, and ans[i]:=OR(a[i:]) XOR OR(a[i+1:]). This takes
+    ~2n elbows with depth 2*log2(n), which are uncomputed, leaving no garbage.
+
+    If `binary` is set, ans is set to position of the most significant set bit
+    (0 if a=0) and must have at least ceil(log2(n)) qubits.
+    """
+
+    def __init__(self, *, log_depth: bool = False, binary: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.log_depth = log_depth
+        self.binary = binary
 
     def _compute(self, a: Qubits, ans: Qubits):
+        n = a.num_qubits
+        if self.binary:
+            assert 2**ans.num_qubits >= n, "Output register is too small."
+        else:
+            assert ans.num_qubits == n
+
+        if self.log_depth:
+            self._compute_log_depth(a, ans)
+        elif self.binary:
+            one_hot = self.alloc_temp_qreg(n, "one_hot")
+            with HighestSetBit().computed(a, one_hot):
+                for i in range(n):
+                    write_uint(ans, i, ctrl=one_hot[i])
+            one_hot.release()
+        else:
+            self._compute_linear(a, ans)
+
+    def _compute_linear(self, a: Qubits, ans: Qubits):
         flag: Qubits = self.alloc_temp_qreg(1, "flag")
 
         # For each input qubit i compute which output qubit must be set if i is MSB.
@@ -20,3 +86,97 @@ class HighestSetBit(Qubrick):
             # If ans[i]=1 (which implies flag was unset), set the flag.
             # All less significant qubits will be ignored.
             flag.x(ans[i])
+
+    def _compute_log_depth(self, a: Qubits, ans: Qubits):
+        n = a.num_qubits
+        suffix_or = _SuffixOr()
+        with suffix_or.computed(a):
+            s = suffix_or.get_result_qreg()
+            if self.binary:
+                # s[i]=1 iff i<=h, where h is the answer. Number of multiples
+                # of 2^j in [1, h] is h>>j, so its parity is j-th bit of h.
+                for j in range(ans.num_qubits):
+                    for i in range(2**j, n, 2**j):
+                        ans[j].x(s[i])
+            else:
+                for i in range(n):
+                    ans[i].x(s[i])
+                    if i + 1 < n:
+                        ans[i].x(s[i + 1])
+
+    def _estimate(self, a: Qubits, ans: Qubits):
+        n = a.num_qubits
+        if not self.log_depth and not self.binary:
+            self.alloc_temp_qreg(1, "flag")
+            self.get_qc().add_cost_event(QubrickCosts(gidney_lelbows=n, active_volume=48 * n))
+            return
+
+        assert isinstance(n, int), "Estimate requires numeric input size."
+        if self.log_depth:
+            num_elbows = len(brent_kung_schedule(n))
+            ancillae = num_elbows
+            if self.binary:
+                num_cnots = sum(len(range(2**j, n, 2**j)) for j in range(ans.num_qubits))
+            else:
+                num_cnots = 2 * n - 1
+            # Elbows of the tree, its uncomputation, and CNOTs. Active volume
+            # of elbow and its uncomputation is the same as in lookup.
+            av = 53 * num_elbows + 4 * num_cnots
+        else:
+            # Default method, its uncomputation, and CNOTs.
+            num_elbows = n
+            ancillae = n + 1
+            av = 2 * 48 * n + 4 * sum(i.bit_count() for i in range(n))
+        cost = QubrickCosts(
+            gidney_lelbows=num_elbows,
+            gidney_relbows=num_elbows,
+            local_ancillae=ancillae,
+            active_volume=av,
+        )
+        self.get_qc().add_cost_event(cost)
+
+
+class Normalize(Qubrick):
+    """Computes shift:=number of leading zeros of x and mantissa:=x*2^shift.
+
+    If x!=0, the most significant bit of mantissa is set. If x=0, both results
+    are 0. `mantissa` must have the same size n as x, and `shift` must have
+    at least ceil(log2(n)) qubits.
+
+    The one-hot result of HighestSetBit is converted to binary and uncomputed.
+    Then a copy of x is shifted by a barrel shifter, where j-th stage shifts
+    it by 2^j if shift[j] is set. This takes n elbows and n*log2(n) Toffolis,
+    instead of n^2/2 Toffolis for controlled shift-copies for every position.
+    """
+
+    def _compute(self, x: Qubits, shift: Qubits, mantissa: Qubits):
+        n = x.num_qubits
+        assert mantissa.num_qubits == n
+        assert 2**shift.num_qubits >= n, "Shift register is too small."
+
+        msb = self.alloc_temp_qreg(n, "msb")
+        with HighestSetBit().computed(x, msb):
+            for i in range(n):
+                write_uint(shift, n - 1 - i, ctrl=msb[i])
+        msb.release()
+
+        ParallelCnot().compute(x, mantissa)
+        for j in range(shift.num_qubits):
+            if 2**j < n:
+                ShiftLeft(2**j).compute(mantissa, ctrl=shift[j])
+
+    def _estimate(self, x: Qubits, shift: Qubits, mantissa: Qubits):
+        n = x.num_qubits
+        assert isinstance(n, int), "Estimate requires numeric input size."
+        num_cnots = sum(v.bit_count() for v in range(n))
+        num_swaps = sum(max(n - 2**j, 0) for j in range(shift.num_qubits))
+        # HighestSetBit is computed and uncomputed. Active volume of controlled
+        # swap is the same as in JHHAMultipler.
+        cost = QubrickCosts(
+            gidney_lelbows=n,
+            gidney_relbows=n,
+            toffs=num_swaps,
+            local_ancillae=n + 1,
+            active_volume=2 * 48 * n + 4 * num_cnots + 4 * n + 51 * num_swaps,
+        )
+        self.get_qc().add_cost_event(cost)
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+from psiqworkbench import QPU, QUInt, SymbolicQPU, SymbolicQubits, resource_estimator
+from psiqworkbench.filter_presets import BIT_DEFAULT
+
+from qmath.func.bits import HighestSetBit, Normalize
+from qmath.utils.re_utils import FILTERS_FOR_NUMERIC_RE, verify_re
+
+
+@pytest.mark.parametrize("log_depth", [False, True])
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("n", [2, 5, 8, 13])
+def test_highest_set_bit(n: int, log_depth: bool, binary: bool):
+    m = (n - 1).bit_length() if binary else n
+    for x in [0, 1, 2**n - 1] + [random.randint(1, 2**n - 1) for _ in range(10)]:
+        qpu = QPU(filters=BIT_DEFAULT)
+        qpu.reset(5 * n)
+        qs_x = QUInt(n, name="x", qpu=qpu)
+        ans = QUInt(m, name="ans", qpu=qpu)
+        qs_x.write(x)
+        HighestSetBit(log_depth=log_depth, binary=binary).compute(qs_x, ans)
+
+        position = max(x.bit_length() - 1, 0)
+        if binary:
+            assert ans.read() == position
+        else:
+            assert ans.read() == (0 if x == 0 else 2**position)
+        assert qs_x.read() == x
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("log_depth, binary", [(False, False), (False, True), (True, False), (True, True)])
+def test_re_highest_set_bit(log_depth: bool, binary: bool):
+    op = HighestSetBit(log_depth=log_depth, binary=binary)
+    for n in [8, 13, 32]:
+        m = (n - 1).bit_length() if binary else n
+        qpu = SymbolicQPU()
+        op.compute(SymbolicQubits(n, "x", qpu), SymbolicQubits(m, "ans", qpu))
+        re_symbolic = resource_estimator(qpu).resources()
+
+        def re_numeric(assgn):
+            qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+            qpu.reset(5 * n)
+            op.compute(QUInt(n, name="x", qpu=qpu), QUInt(m, name="ans", qpu=qpu))
+            return resource_estimator(qpu).resources()
+
+        verify_re(re_symbolic, re_numeric, {}, av_rtol=0.1)
+
+
+@pytest.mark.re
+def test_highest_set_bit_log_depth_elbows():
+    for n in [16, 32, 64]:
+        qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+        qpu.reset(4 * n)
+        HighestSetBit(log_depth=True).compute(QUInt(n, name="x", qpu=qpu), QUInt(n, name="ans", qpu=qpu))
+        assert resource_estimator(qpu).resources()["gidney_lelbows"] <= 2 * n
+
+
+@pytest.mark.parametrize("n", [2, 5, 8, 13])
+def test_normalize(n: int):
+    w = (n - 1).bit_length()
+    for x in [0, 1, 2**n - 1] + [random.randint(1, 2**n - 1) for _ in range(10)]:
+        qpu = QPU(filters=BIT_DEFAULT)
+        qpu.reset(3 * n + w + 2)
+        qs_x = QUInt(n, name="x", qpu=qpu)
+        shift = QUInt(w, name="shift", qpu=qpu)
+        mantissa = QUInt(n, name="mantissa", qpu=qpu)
+        qs_x.write(x)
+        Normalize().compute(qs_x, shift, mantissa)
+
+        expected_shift = 0 if x == 0 else n - x.bit_length()
+        assert shift.read() == expected_shift
+        assert mantissa.read() == x << expected_shift
+        assert qs_x.read() == x
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("n", [32, 64])
+def test_normalize_toffolis(n: int):
+    qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+    qpu.reset(4 * n)
+    w = (n - 1).bit_length()
+    Normalize().compute(QUInt(n, name="x", qpu=qpu), QUInt(w, name="shift", qpu=qpu), QUInt(n, name="y", qpu=qpu))
+    toffs = resource_estimator(qpu).resources()["toffs"]
+    # Controlled shift-copy for every position of the highest set bit.
+    shift_copy_toffs = n * (n + 1) // 2 + n - 2
+    assert toffs == n * w - (2**w - 1)
+    assert toffs < shift_copy_toffs / 4
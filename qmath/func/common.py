@@ -4,11 +4,18 @@ Some of these are wrappers around routines from psiqworkbench.qubricks, this is
 done so we can define symbolic resource estimates for them.
 """
 
+import dataclasses
+import math
+
 import psiqworkbench.qubricks as qbk
 from psiqworkbench import QFixed, Qubrick, QInt, QUInt, Qubits
 from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
 from psiqworkbench.symbolics import Min
+from psiqworkbench.symbolics.parameter import Max
 
+from ..uint_arith.add.costs import adder_costs, constant_adder_costs
+from ..uint_arith.add.policy import get_adder_policy
+from ..utils.lookup import TableLookup, num_lookup_elbows, popcount, unlookup_costs
 from ..utils.symbolic import SymbolicQFixed
 from ..utils.re_utils import fraction_length
 
@@ -19,16 +26,32 @@ class Negate(Qubrick):
     def _compute(self, x: QFixed, ctrl: Qubits | None = None):
         x_as_int = QInt(x)
         x_as_int.x(ctrl)
-        qbk.GidneyAdd().compute(x_as_int, 1, ctrl=ctrl)
+        get_adder_policy().add(x_as_int, 1, ctrl=ctrl)
 
-    def _estimate(self, x: SymbolicQFixed):
+    def _estimate(self, x: SymbolicQFixed, ctrl: Qubits | None = None):
         n = x.num_qubits
-        cost = QubrickCosts(
-            gidney_lelbows=n - 2,
-            gidney_relbows=n - 2,
-            local_ancillae=n - 2,
-            active_volume=61 * n - 118,
-        )
+        adder = get_adder_policy().choose(n, controlled=ctrl is not None, constant=1)
+        if not isinstance(adder, qbk.GidneyAdd):
+            # Negation of x, then addition of 1.
+            cost = constant_adder_costs(adder, n, 1, controlled=ctrl is not None)
+            fan_out = 0 if ctrl is None else 4 * n
+            cost = dataclasses.replace(cost, active_volume=cost.active_volume + fan_out).to_qubrick_costs()
+        elif ctrl is None:
+            cost = QubrickCosts(
+                gidney_lelbows=n - 2,
+                gidney_relbows=n - 2,
+                local_ancillae=n - 2,
+                active_volume=61 * n - 118,
+            )
+        else:
+            # Same as AbsInPlace, without computing the sign.
+            cost = QubrickCosts(
+                gidney_lelbows=n - 2,
+                gidney_relbows=n - 2,
+                toffs=n - 1,
+                local_ancillae=n - 2,
+                active_volume=105.5 * n - 154,
+            )
         self.get_qc().add_cost_event(cost)
 
 
@@ -39,10 +62,22 @@ class AbsInPlace(Qubrick):
         sign = self.alloc_temp_qreg(1, "sign")
         sign.lelbow(x[-1])
         x.x(sign)
-        qbk.GidneyAdd().compute(QUInt(x), 1, ctrl=sign)
+        get_adder_policy().add(QUInt(x), 1, ctrl=sign)
 
     def _estimate(self, x: SymbolicQFixed):
         n = x.num_qubits
+        adder = get_adder_policy().choose(n, controlled=True, constant=1)
+        if not isinstance(adder, qbk.GidneyAdd):
+            # Sign, controlled negation of x, then controlled addition of 1.
+            cost = constant_adder_costs(adder, n, 1, controlled=True)
+            cost = dataclasses.replace(
+                cost,
+                elbows=cost.elbows + 1,
+                ancillae=cost.ancillae + 1,
+                active_volume=cost.active_volume + 53 + 4 * n,
+            )
+            self.get_qc().add_cost_event(cost.to_qubrick_costs())
+            return
         cost = QubrickCosts(
             gidney_lelbows=n - 2,
             gidney_relbows=n - 2,
@@ -57,19 +92,14 @@ class Add(Qubrick):
     """Computes lhs += rhs."""
 
     def _compute(self, lhs: QFixed, rhs: QFixed):
-        qbk.GidneyAdd().compute(lhs, rhs)
+        get_adder_policy().add(lhs, rhs)
 
     def _estimate(self, lhs: SymbolicQFixed, rhs: SymbolicQFixed):
         # qbk.GidneyAdd has _estimate, but active volume there differs from
-        # what we observe from numeric RE. So we have to re-define _estimate.
+        # what we observe from numeric RE. So we use our cost model.
         n = lhs.num_qubits
-        cost = QubrickCosts(
-            gidney_lelbows=n - 1,
-            gidney_relbows=n - 1,
-            local_ancillae=n - 1,
-            active_volume=72 * n - 83,
-        )
-        self.get_qc().add_cost_event(cost)
+        adder = get_adder_policy().choose(n)
+        self.get_qc().add_cost_event(adder_costs(adder, n).to_qubrick_costs())
 
 
 class AddConst(Qubrick):
@@ -83,9 +113,17 @@ class AddConst(Qubrick):
 
     def _compute(self, lhs: QFixed):
         assert abs(self.rhs) <= 2 ** (lhs.num_qubits - lhs.radix - 1), f"Constant {self.rhs} is too large."
-        qbk.GidneyAdd().compute(lhs, self.rhs)
+        get_adder_policy().add(lhs, self.rhs)
 
     def _estimate(self, lhs: SymbolicQFixed):
+        if isinstance(lhs.num_qubits, int) and isinstance(lhs.radix, int):
+            constant = round(self.rhs * 2**lhs.radix) % 2**lhs.num_qubits
+            adder = get_adder_policy().choose(lhs.num_qubits, constant=constant)
+            if not isinstance(adder, qbk.GidneyAdd):
+                cost = constant_adder_costs(adder, lhs.num_qubits, constant)
+                self.get_qc().add_cost_event(cost.to_qubrick_costs())
+                return
+
         # This estimate might be off (overestimate) by O(1) in case when lhs
         # is not "round" number, but when rounded to fixed precision, few of
         # least significant bits become zeroes.
@@ -115,12 +153,26 @@ class Subtract(Qubrick):
 
 
 class MultiplyAdd(Qubrick):
-    """Computes dst += lhs * rhs."""
+    """Computes dst += lhs * rhs.
+
+    If `guard_bits` is set, uses TruncatedMultiplyAdd with that many guard
+    bits instead of computing the full product.
+    """
+
+    def __init__(self, *, guard_bits: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.guard_bits = guard_bits
 
     def _compute(self, dst: QFixed, lhs: QFixed, rhs: QFixed):
+        if self.guard_bits is not None:
+            TruncatedMultiplyAdd(guard_bits=self.guard_bits).compute(dst, lhs, rhs)
+            return
         qbk.GidneyMultiplyAdd().compute(dst, lhs, rhs)
 
     def _estimate(self, dst: SymbolicQFixed, lhs: SymbolicQFixed, rhs: SymbolicQFixed):
+        if self.guard_bits is not None:
+            TruncatedMultiplyAdd(guard_bits=self.guard_bits).compute(dst, lhs, rhs)
+            return
         n = dst.num_qubits
         assert lhs.num_qubits == n
         assert rhs.num_qubits == n
@@ -138,6 +190,107 @@ class MultiplyAdd(Qubrick):
         self.get_qc().add_cost_event(cost)
 
 
+# Preparation for TruncatedMultiplyAdd to handle negative inputs.
+class _MulPrep(Qubrick):
+
+    def _compute(self, lhs: QFixed, rhs: QFixed, signs: Qubits, acc: Qubits):
+        signs[0].lelbow(lhs[-1])
+        signs[1].lelbow(rhs[-1])
+        Negate().compute(lhs, ctrl=signs[0])
+        Negate().compute(rhs, ctrl=signs[1])
+        signs[0].x(signs[1])
+        acc.x(signs[0])
+
+
+class _PartialProduct(Qubrick):
+    def _compute(self, x: Qubits, y: Qubits, anc: Qubits):
+        for i in range(x.num_qubits):
+            anc[i].lelbow(x[i] | y)
+
+
+class TruncatedMultiplyAdd(Qubrick):
+    """Computes dst += lhs * rhs, skipping partial products below precision of dst.
+
+    Schoolbook multiplication where, for every bit of rhs, the shifted copy of
+    lhs is added to an accumulator, which is dst extended with `guard_bits`
+    less significant qubits. Bits of the partial products below the
+    accumulator are discarded, so the product is never computed in full.
+
+    Error bound: |result - lhs*rhs| < (1 + n*2^-guard_bits) * 2^-dst.radix,
+    where n is the number of qubits in rhs. Guard qubits are left as garbage.
+    """
+
+    def __init__(self, *, guard_bits: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        assert guard_bits >= 0
+        self.guard_bits = guard_bits
+
+    # Yields (j, shift, m, k): bit j of rhs adds k bits of lhs to acc[shift:] of size m.
+    def _partial_products(self, lhs: QFixed, rhs: QFixed, dst: QFixed):
+        acc_size = dst.num_qubits + self.guard_bits
+        t = lhs.radix + rhs.radix - dst.radix - self.guard_bits
+        for j in range(rhs.num_qubits):
+            shift = j - t
+            if shift >= acc_size:
+                continue
+            m = acc_size - max(shift, 0)
+            k = lhs.num_qubits - max(-shift, 0)
+            if k > 0:
+                yield j, shift, m, min(k, m)
+
+    # acc += x*y, assuming x>=0, y>=0.
+    def _compute_unsigned(self, acc: Qubits, x: QFixed, y: QFixed, dst: QFixed):
+        anc = self.alloc_temp_qreg(x.num_qubits, "anc")
+        for j, shift, _, k in self._partial_products(x, y, dst):
+            x_part = x[max(-shift, 0) :][0:k]
+            with _PartialProduct().computed(x_part, y[j], anc[0:k]):
+                qbk.GidneyAdd().compute(QInt(acc[max(shift, 0) :]), QInt(anc[0:k]))
+        anc.release()
+
+    def _compute(self, dst: QFixed, lhs: QFixed, rhs: QFixed):
+        acc = dst
+        if self.guard_bits > 0:
+            acc = self.alloc_temp_qreg(self.guard_bits, "guard") | dst
+        signs = self.alloc_temp_qreg(2, "signs")
+
+        # Preparation to handle negative inputs.
+        with _MulPrep().computed(lhs, rhs, signs, acc):
+            self._compute_unsigned(acc, lhs, rhs, dst)
+
+        signs.release()
+
+    def _estimate(self, dst: SymbolicQFixed, lhs: SymbolicQFixed, rhs: SymbolicQFixed):
+        n = dst.num_qubits
+        assert lhs.num_qubits == n
+        assert rhs.num_qubits == n
+        g = self.guard_bits
+        t = lhs.radix + rhs.radix - dst.radix - g
+
+        # This RE is correct when 0<=t and t+g<n.
+        if isinstance(n, int) and isinstance(t, int):
+            assert 0 <= t and t + g < n, "Estimate requires 0<=t and t+g<n, where t is number of truncated bits."
+
+        # AND gates for the partial products (and_elbows) and additions (add_elbows).
+        l = n - t
+        and_elbows = t * n - t * (t + 1) / 2 + (g + 1) * n + (l - 1 - g) * (n + g) - l * (l - 1) / 2 + g * (g + 1) / 2
+        add_elbows = n * (n + g - 1) - l * (l - 1) / 2
+
+        if g > 0:
+            self.alloc_temp_qreg(g, "guard")
+        # Preparation and its uncomputation: signs, 2 controlled negations, flipping acc.
+        cost = QubrickCosts(
+            gidney_lelbows=4 * (n - 2) + and_elbows + add_elbows,
+            gidney_relbows=4 * (n - 2) + and_elbows + add_elbows,
+            toffs=4 * (n - 1),
+            local_ancillae=2 + Max(n - 2, 2 * n + g - 1),
+            active_volume=2 * (2 * (105.5 * n - 154) + 12 + 4 * (n + g))
+            + 48 * and_elbows
+            + 72 * (add_elbows + n)
+            - 83 * n,
+        )
+        self.get_qc().add_cost_event(cost)
+
+
 # Preparation for MultiplyConstAdd to handle negative inputs.
 class _MulConstPrep(Qubrick):
 
@@ -149,29 +302,132 @@ class _MulConstPrep(Qubrick):
         dst.x(x_sign)
 
 
-class MultiplyConstAdd(Qubrick):
-    """Computes dst += lhs * rhs (rhs is a classical number)."""
+def _naf(value: int) -> list[tuple[int, int]]:
+    """Non-adjacent form of non-negative integer.
 
-    def __init__(self, rhs: float, **kwargs):
+    Returns list of pairs (j, d) such that value=sum(d*2^j), where d=±1 and no
+    two positions j are adjacent. This has minimal number of non-zero digits.
+    """
+    digits = []
+    j = 0
+    while value != 0:
+        if value % 2 == 1:
+            d = 2 - (value % 4)
+            digits.append((j, d))
+            value -= d
+        value //= 2
+        j += 1
+    return digits
+
+
+class MultiplyConstAdd(Qubrick):
+    """Computes dst += lhs * rhs (rhs is a classical number).
+
+    Supports 3 methods:
+      * "csd" (default) - shift-and-add with the constant in non-adjacent
+        form (canonical signed digits), so every run of ones in the binary
+        expansion of rhs costs one addition and one subtraction.
+      * "binary" - shift-and-add with one addition per 1-bit of rhs.
+      * "windowed" - splits lhs into windows of `window_size` bits and, for
+        each window, looks up rhs*window from a table and adds it to dst
+        (https://arxiv.org/abs/1905.07682). The product register is cleaned
+        with measurement-based unlookup. If `window_size` is not given, it is
+        chosen to minimize the number of elbows.
+
+    The "windowed" method is not unitary (it measures the product register),
+    so it can't be controlled or uncomputed.
+    """
+
+    def __init__(self, rhs: float, *, method: str = "csd", window_size: int | None = None, **kwargs):
         super().__init__(**kwargs)
+        assert method in ("csd", "binary", "windowed"), f"Unknown method: {method}."
+        assert window_size is None or window_size >= 1
         self.rhs = rhs
+        self.method = method
+        self.window_size = window_size
+
+    def compute(self, *args, **kwargs):
+        assert kwargs.get("ctrl") is None or self.method != "windowed", "Windowed method can't be controlled."
+        super().compute(*args, **kwargs)
+
+    def uncompute(self, *args, **kwargs):
+        assert self.method != "windowed", "Windowed method can't be uncomputed."
+        super().uncompute(*args, **kwargs)
+
+    def _digits(self, y: float, x_num_qubits: int) -> list[tuple[int, int]]:
+        # Returns pairs (shift, sign), such that y*x≈sum(sign*(x<<shift)).
+        # Bits of y below 2^-(x_num_qubits-1) are truncated.
+        offset = x_num_qubits - 1
+        y_int = int(y * (2**offset))
+        if self.method == "binary":
+            return [(j - offset, 1) for j in range(y_int.bit_length()) if (y_int >> j) % 2 == 1]
+        return [(j - offset, d) for j, d in _naf(y_int)]
+
+    def _window_range(self, y: float, x_num_qubits: int) -> tuple[int, int]:
+        # Bits of x which need to be looked up. Sign bit is always zero. Bits
+        # below lo contribute less than half of the least significant bit of dst.
+        lo = max(0, math.floor(-math.log2(y)) - 1)
+        return min(lo, x_num_qubits - 2), x_num_qubits - 1
+
+    def _window_widths(self, y: float, x_num_qubits: int, window_size: int) -> list[int]:
+        lo, hi = self._window_range(y, x_num_qubits)
+        return [min(window_size, hi - start) for start in range(lo, hi, window_size)]
+
+    def _windowed_elbows(self, widths: list[int], z_num_qubits: int) -> int:
+        # Lookup, addition and unlookup to clean the product register.
+        return sum(num_lookup_elbows(w, 2**w) + unlookup_costs(2**w)[0] + z_num_qubits - 1 for w in widths)
+
+    def _choose_window_size(self, y: float, x_num_qubits: int, z_num_qubits: int) -> int:
+        if self.window_size is not None:
+            return self.window_size
+        lo, hi = self._window_range(y, x_num_qubits)
+        candidates = range(1, max(1, min(hi - lo, 16)) + 1)
+        return min(
+            candidates, key=lambda w: self._windowed_elbows(self._window_widths(y, x_num_qubits, w), z_num_qubits)
+        )
+
+    def _window_table(self, y: float, start: int, width: int, z_num_qubits: int) -> list[int]:
+        return [round(y * v * 2**start) % 2**z_num_qubits for v in range(2**width)]
 
     # z += y*x, assuming x>=0, y>0.
     def _compute_positive(self, x: QFixed, y: float, z: QFixed):
         assert y > 0
         x = QInt(x)
         z = QInt(z)
-        min_i = x.radix - z.radix - (x.num_qubits - 1)
-        max_i = x.radix - z.radix + (z.num_qubits - 1)
-
-        for i in range(min_i, max_i + 1):
-            shift = z.radix - x.radix + i
-            bit = int(y * (2 ** (-shift))) % 2
-            if bit == 1:
-                if shift < 0:
-                    qbk.GidneyAdd().compute(z, x[(-shift):])
-                else:
-                    qbk.GidneyAdd().compute(z[shift:], x)
+        for shift, sign in self._digits(y, x.num_qubits):
+            if shift > z.num_qubits - 1:
+                continue
+            if shift < 0:
+                z_part, x_part = z, x[(-shift):]
+            else:
+                z_part, x_part = z[shift:], x
+            if sign == 1:
+                get_adder_policy().add(z_part, x_part)
+            else:
+                # z-x = ~(~z+x).
+                z_part.x()
+                get_adder_policy().add(z_part, x_part)
+                z_part.x()
+
+    # z += y*x, assuming x>=0, y>0.
+    def _compute_positive_windowed(self, x: QFixed, y: float, z: QFixed):
+        assert y > 0
+        x = QInt(x)
+        z = QInt(z)
+        xn, zn = x.num_qubits, z.num_qubits
+        if xn < 2:
+            return
+        w = self._choose_window_size(y, xn, zn)
+        lo, hi = self._window_range(y, xn)
+        product = QInt(self.alloc_temp_qreg(zn, "window_product"))
+        for start in range(lo, hi, w):
+            width = min(w, hi - start)
+            window = x[start : start + width]
+            lookup = TableLookup(self._window_table(y, start, width, zn))
+            lookup.compute(window, product)
+            get_adder_policy().add(z, product)
+            lookup.unlookup(window, product)
+        product.release()
 
     def _compute(self, dst: QFixed, lhs: QFixed):
         if self.rhs == 0:
@@ -181,10 +437,91 @@ class MultiplyConstAdd(Qubrick):
 
         # Preparation to handle negative inputs.
         with _MulConstPrep().computed(lhs, x_sign, self.rhs, dst):
-            self._compute_positive(lhs, abs(self.rhs), dst)
+            if self.method == "windowed":
+                self._compute_positive_windowed(lhs, abs(self.rhs), dst)
+            else:
+                self._compute_positive(lhs, abs(self.rhs), dst)
 
         x_sign.release()
 
+    def _estimate_shift_add(self, y: float, xn, zn) -> tuple:
+        # If size of lhs is symbolic, this estimate assumes that rhs has finite
+        # binary expansion which is not truncated by lhs precision. It also
+        # assumes that dst is wide enough to hold all shifted copies of lhs.
+        if isinstance(xn, int):
+            shifts = [shift for shift, _ in self._digits(y, xn)]
+        else:
+            fl = fraction_length(y, max_length=1100)
+            shifts = [shift - fl for shift, _ in self._digits(y * 2**fl, 1)]
+
+        # Each addition to z[shift:] costs as adder of that size.
+        add_sizes = [zn - max(shift, 0) for shift in shifts]
+        return *self._additions_costs(add_sizes, zn), 0
+
+    def _additions_costs(self, add_sizes: list, zn) -> tuple:
+        # Returns elbows, Toffolis, active volume and ancillae of additions.
+        # Ancillae of GidneyAdd are bounded by zn-1.
+        elbows, toffs, av, ancillae = 0, 0, 0, zn - 1
+        for size in add_sizes:
+            adder = get_adder_policy().choose(size)
+            cost = adder_costs(adder, size)
+            elbows += cost.elbows
+            toffs += cost.toffs
+            av += cost.active_volume
+            if not isinstance(adder, qbk.GidneyAdd):
+                ancillae = Max(ancillae, cost.ancillae)
+        return elbows, toffs, av, ancillae
+
+    def _estimate_windowed(self, y: float, xn, zn) -> tuple:
+        # If size of lhs is symbolic, this estimate assumes that window size
+        # divides number of looked up bits, and that half of the bits in lookup
+        # tables are set.
+        if isinstance(xn, int) and isinstance(zn, int):
+            w = self._choose_window_size(y, xn, zn)
+            lo, _ = self._window_range(y, xn)
+            widths = self._window_widths(y, xn, w)
+            starts = [lo + i * w for i in range(len(widths))]
+            num_windows = len(widths)
+            lookup_elbows = sum(num_lookup_elbows(wd, 2**wd) for wd in widths)
+            bits = sum(popcount(self._window_table(y, st, wd, zn)) for st, wd in zip(starts, widths))
+            costs = [unlookup_costs(2**wd) for wd in widths]
+            unlookup_elbows = sum(c[0] for c in costs)
+            unlookup_ancillae = max(c[1] for c in costs)
+            unlookup_av = sum(c[2] for c in costs)
+        else:
+            assert self.window_size is not None, "Symbolic estimate requires explicit window size."
+            w = self.window_size
+            lo = max(0, math.floor(-math.log2(y)) - 1)
+            num_windows = (xn - 1 - lo) / w
+            lookup_elbows = num_windows * num_lookup_elbows(w, 2**w)
+            bits = num_windows * 2**w * zn / 2
+            unlookup_elbows, unlookup_ancillae, unlookup_av = unlookup_costs(2**w)
+            unlookup_elbows *= num_windows
+            unlookup_av *= num_windows
+        add_cost = adder_costs(get_adder_policy().choose(zn), zn)
+        elbows = lookup_elbows + unlookup_elbows + num_windows * add_cost.elbows
+        av = 53 * lookup_elbows + 4 * bits + unlookup_av + num_windows * add_cost.active_volume
+        ancillae = zn + Max(w - 1, Max(add_cost.ancillae, unlookup_ancillae))
+        return elbows, num_windows * add_cost.toffs, av, ancillae, num_windows * zn
+
     def _estimate(self, dst: SymbolicQFixed, lhs: SymbolicQFixed):
-        # TODO: implement.
-        pass
+        if self.rhs == 0:
+            return
+        xn = lhs.num_qubits
+        zn = dst.num_qubits
+        y = abs(self.rhs)
+        if self.method == "windowed":
+            elbows, toffs, av, ancillae, measurements = self._estimate_windowed(y, xn, zn)
+        else:
+            elbows, toffs, av, ancillae, measurements = self._estimate_shift_add(y, xn, zn)
+
+        # Preparation and its uncomputation: sign, controlled negation, flipping dst.
+        cost = QubrickCosts(
+            gidney_lelbows=2 * (xn - 2) + elbows,
+            gidney_relbows=2 * (xn - 2) + elbows,
+            toffs=2 * (xn - 1) + toffs,
+            measurements=measurements,
+            local_ancillae=1 + Max(xn - 2, ancillae),
+            active_volume=2 * (4 + 105.5 * xn - 154 + 4 * zn) + av,
+        )
+        self.get_qc().add_cost_event(cost)
@@ -1,5 +1,16 @@
-from qmath.func.common import AbsInPlace, Add, Negate, Subtract, MultiplyAdd, AddConst
+from qmath.func.common import (
+    AbsInPlace,
+    Add,
+    Negate,
+    Subtract,
+    MultiplyAdd,
+    AddConst,
+    MultiplyConstAdd,
+    TruncatedMultiplyAdd,
+)
 from qmath.utils.re_utils import re_numeric_fixed_point, re_symbolic_fixed_point, verify_re
+from qmath.utils.symbolic import SymbolicQFixed
+from psiqworkbench import SymbolicQPU
 import pytest
 
 
@@ -56,3 +67,53 @@ def test_re_multiply_add():
     re_numeric = lambda assgn: re_numeric_fixed_point(op, assgn, n_inputs=3)
     for n, radix in [(4, 1), (4, 2), (4, 3), (5, 1), (5, 4), (10, 1), (10, 9), (16, 8)]:
         verify_re(re_symbolic, re_numeric, {"n": n, "radix": radix}, av_rtol=0.001)
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("guard_bits", [0, 2, 4])
+def test_re_truncated_multiply_add(guard_bits: int):
+    op = TruncatedMultiplyAdd(guard_bits=guard_bits)
+    re_symbolic = re_symbolic_fixed_point(op, n_inputs=3)
+    re_numeric = lambda assgn: re_numeric_fixed_point(op, assgn, n_inputs=3)
+    for n, radix in [(10, 5), (10, 9), (16, 8), (16, 12)]:
+        verify_re(re_symbolic, re_numeric, {"n": n, "radix": radix}, av_rtol=0.1)
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("n, radix, guard_bits", [(10, 1, 2), (8, 8, 0)])
+def test_re_truncated_multiply_add_out_of_range(n: int, radix: int, guard_bits: int):
+    qpu = SymbolicQPU()
+    inputs = [SymbolicQFixed(num_qubits=n, name=f"input_{i}", qpu=qpu, radix=radix) for i in range(3)]
+    with pytest.raises(AssertionError, match="truncated bits"):
+        TruncatedMultiplyAdd(guard_bits=guard_bits).compute(*inputs)
+
+
+@pytest.mark.re
+def test_truncated_multiply_add_is_cheaper():
+    op_full, op_truncated = MultiplyAdd(), MultiplyAdd(guard_bits=2)
+    for n, radix in [(16, 8), (32, 24)]:
+        assgn = {"n": n, "radix": radix}
+        full = re_numeric_fixed_point(op_full, assgn, n_inputs=3)
+        truncated = re_numeric_fixed_point(op_truncated, assgn, n_inputs=3)
+        assert truncated["toffs"] + truncated["gidney_lelbows"] < full["toffs"] + full["gidney_lelbows"]
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("c", [0.99609375, -1.5, 5.25])
+def test_re_multiply_const_add(c: float):
+    op = MultiplyConstAdd(c)
+    re_symbolic = re_symbolic_fixed_point(op, n_inputs=2)
+    re_numeric = lambda assgn: re_numeric_fixed_point(op, assgn, n_inputs=2)
+    for n, radix in [(16, 10), (30, 20)]:
+        verify_re(re_symbolic, re_numeric, {"n": n, "radix": radix}, av_rtol=0.02, elbows_rtol=0.02)
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("c, sizes", [(0.1, [19, 35]), (-3.14159, [17, 33])])
+def test_re_multiply_const_add_windowed(c: float, sizes: list[int]):
+    op = MultiplyConstAdd(c, method="windowed", window_size=4)
+    re_symbolic = re_symbolic_fixed_point(op, n_inputs=2)
+    re_numeric = lambda assgn: re_numeric_fixed_point(op, assgn, n_inputs=2)
+    # Sizes are such that window size divides the number of looked up bits.
+    for n in sizes:
+        verify_re(re_symbolic, re_numeric, {"n": n, "radix": n // 2}, av_rtol=0.1)
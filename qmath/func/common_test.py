@@ -1,8 +1,10 @@
 import random
 
+import numpy as np
 import pytest
+from psiqworkbench import QPU, QFixed, Qubits
 
-from qmath.func.common import AbsInPlace, MultiplyConstAdd, Subtract
+from qmath.func.common import AbsInPlace, MultiplyAdd, MultiplyConstAdd, Subtract, TruncatedMultiplyAdd
 from qmath.utils.test_utils import QPUTestHelper
 
 
@@ -33,14 +35,101 @@ def test_subtract():
 
 
 @pytest.mark.smoke
-def test_multiply_const_add():
-    for y in [-11.25, 0, 1.5, 10.3]:
+@pytest.mark.parametrize("method", ["csd", "binary"])
+def test_multiply_const_add(method: str):
+    for y in [-11.25, 0, 1.5, 10.3, 0.99609375, -7.75]:
         qpu_helper = QPUTestHelper(num_inputs=2, num_qubits=200, qubits_per_reg=25, radix=15)
         qs_x, qs_z = qpu_helper.inputs
-        MultiplyConstAdd(y).compute(qs_z, qs_x)
+        MultiplyConstAdd(y, method=method).compute(qs_z, qs_x)
         qpu_helper.record_op(qs_z)
 
         for x in [-10, 5.5, 0, 10.125]:
             result = qpu_helper.apply_op([x, 0])
             expected = x * y
             assert abs(result - expected) < 1e-4
+
+
+@pytest.mark.parametrize("guard_bits", [0, 2, 5])
+def test_truncated_multiply_add(guard_bits: int):
+    n, radix = 20, 12
+    qpu_helper = QPUTestHelper(num_inputs=3, num_qubits=150, qubits_per_reg=n, radix=radix)
+    qs_x, qs_y, qs_z = qpu_helper.inputs
+    TruncatedMultiplyAdd(guard_bits=guard_bits).compute(qs_z, qs_x, qs_y)
+    qpu_helper.record_op(qs_z)
+
+    error_bound = (1 + n * 2**-guard_bits) * 2**-radix
+    for x, y, z in [(1.5, 2.25, 0), (-3.125, 1.75, 1.0), (-2.5, -2.5, -0.5), (0, 7.5, 3.0), (-1, 0.5, 0)]:
+        assert abs(qpu_helper.apply_op([x, y, z]) - (z + x * y)) < error_bound
+    for _ in range(10):
+        x, y, z = [-5 + 10 * random.random() for _ in range(3)]
+        assert abs(qpu_helper.apply_op([x, y, z]) - (z + x * y)) < error_bound + 3 * 2**-radix
+
+
+def test_multiply_add_truncated():
+    qpu_helper = QPUTestHelper(num_inputs=3, num_qubits=150, qubits_per_reg=16, radix=8)
+    qs_x, qs_y, qs_z = qpu_helper.inputs
+    MultiplyAdd(guard_bits=3).compute(qs_z, qs_x, qs_y)
+    qpu_helper.record_op(qs_z)
+    assert abs(qpu_helper.apply_op([-2.75, 3.5, 1.25]) - (1.25 - 2.75 * 3.5)) < 4 * 2**-8
+
+
+def test_multiply_const_add_signed_digits():
+    # 0.11111111b = 1 - 2^-8: one addition and one subtraction.
+    assert MultiplyConstAdd(0.99609375)._digits(0.99609375, 25) == [(-8, -1), (0, 1)]
+    assert len(MultiplyConstAdd(7.75)._digits(7.75, 25)) == 2
+
+
+def _check_multiply_const_add_windowed(y: float, window_size: int | None, xs: list[float]):
+    # Unlookup measures in X basis, so this needs quantum simulator instead of QPUTestHelper.
+    for x in xs:
+        qpu = QPU()
+        qpu.reset(200)
+        qs_x = QFixed(25, name="x", radix=15, qpu=qpu)
+        qs_z = QFixed(25, name="z", radix=15, qpu=qpu)
+        qs_x.write(x)
+        MultiplyConstAdd(y, method="windowed", window_size=window_size).compute(qs_z, qs_x)
+        assert abs(qs_z.read() - x * y) < 1e-4
+        assert qs_x.read() == x
+
+
+@pytest.mark.smoke
+def test_multiply_const_add_windowed_auto_size():
+    for y in [-11.25, 0, 1.5, 10.3, 0.99609375, -7.75]:
+        _check_multiply_const_add_windowed(y, None, [-10, 5.5])
+
+
+@pytest.mark.parametrize("window_size", [1, 2, 5])
+def test_multiply_const_add_windowed(window_size: int):
+    for y in [0.1, -3.14159]:
+        _check_multiply_const_add_windowed(y, window_size, [-10, 5.5, 0, 10.125])
+
+
+def test_multiply_const_add_windowed_not_unitary():
+    qpu = QPU()
+    qpu.reset(100)
+    qs_x = QFixed(8, name="x", radix=4, qpu=qpu)
+    qs_z = QFixed(8, name="z", radix=4, qpu=qpu)
+    qs_ctrl = Qubits(1, "ctrl", qpu)
+    with pytest.raises(AssertionError, match="controlled"):
+        MultiplyConstAdd(1.5, method="windowed").compute(qs_z, qs_x, ctrl=qs_ctrl)
+    op = MultiplyConstAdd(1.5, method="windowed")
+    op.compute(qs_z, qs_x)
+    with pytest.raises(AssertionError, match="uncomputed"):
+        op.uncompute()
+
+
+@pytest.mark.slow
+def test_multiply_const_add_crossover():
+    # Benchmark: Toffoli count of the 3 methods for a dense constant.
+    y = np.pi
+    results = dict()
+    for n in [16, 32, 64]:
+        for method in ["binary", "csd", "windowed"]:
+            qpu = QPU(filters=[">>witness>>"])
+            qpu.reset(10 * n)
+            qs_x = QFixed(n, name="x", radix=n // 2, qpu=qpu)
+            qs_z = QFixed(n, name="z", radix=n // 2, qpu=qpu)
+            MultiplyConstAdd(y, method=method).compute(qs_z, qs_x)
+            results[(n, method)] = qpu.metrics()["toffoli_count"]
+    assert results[(64, "csd")] < results[(64, "binary")]
+    assert results[(64, "windowed")] < results[(64, "binary")]
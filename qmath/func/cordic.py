@@ -0,0 +1,265 @@
+"""CORDIC algorithm for trigonometric functions.
+
+Each iteration rotates vector (x, y) by angle ±atan(2^-i), which only needs
+shifted additions, and accumulates the rotation angle in register z using
+classical constants. No multiplications or table lookups are used, so k
+iterations on n-qubit registers take O(k*n) Toffolis. Each iteration leaves
+the old value of y as garbage, so they also take O(k*n) qubits (like CosFbe
+without pebbling).
+
+Angles are in units of pi (half-turns), like in CosFbe.
+
+Reference:
+    Jack E. Volder. The CORDIC trigonometric computing technique. 1959.
+    https://doi.org/10.1109/TEC.1959.5222693
+"""
+
+import math
+
+from psiqworkbench import QFixed, Qubits
+from psiqworkbench.qubricks import Qubrick
+from psiqworkbench.symbolics import Min
+from psiqworkbench.symbolics.parameter import Max
+from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
+
+from ..utils.gates import ParallelCnot, write_uint
+from .common import Add, AddConst, Negate
+from .fbe import Neq
+
+
+def cordic_gain(num_iterations: int) -> float:
+    """Returns product of cos(atan(2^-i)) for i<num_iterations."""
+    return math.prod(1 / math.sqrt(1 + 4**-i) for i in range(num_iterations))
+
+
+def _cordic_angle(i: int, radix: int) -> float:
+    # atan(2^-i)/pi, rounded to `radix` fractional bits.
+    return round(math.atan(2**-i) / math.pi * 2**radix) / 2**radix
+
+
+class _SignExtension(Qubrick):
+    """Computes ext^=sign of src in every qubit of ext."""
+
+    def _compute(self, src: Qubits, ext: Qubits):
+        for j in range(ext.num_qubits):
+            ext[j].x(src[-1])
+
+
+def _add_or_subtract(lhs: QFixed, sub: Qubits, op: Qubrick, *args):
+    # Adds if sub=0, subtracts if sub=1, using lhs-rhs=~(~lhs+rhs).
+    lhs.x(sub)
+    op.compute(lhs, *args)
+    lhs.x(sub)
+
+
+class _CordicBase(Qubrick):
+    def __init__(self, *, result_radix: int, guard_bits: int = 4, **kwargs):
+        super().__init__(**kwargs)
+        self.result_radix = result_radix
+        self.guard_bits = guard_bits
+
+    def _load(self, v: QFixed, name: str) -> QFixed:
+        # Copies v to new register with 2 more integer and guard_bits more fractional bits.
+        g, n = self.guard_bits, v.num_qubits
+        ans = QFixed(self.alloc_temp_qreg(n + 2 + g, name), radix=v.radix + g)
+        ParallelCnot().compute(v, ans[g : g + n])
+        ans[g + n].x(v[-1])
+        ans[g + n + 1].x(v[-1])
+        return ans
+
+    def _add_shifted(self, lhs: QFixed, sub: Qubits, rhs: QFixed, shift: int):
+        # lhs:=lhs±(rhs>>shift) (arithmetic shift). Shifted rhs is the slice of
+        # its high qubits, extended with copies of the sign bit, because
+        # adders need operands of the same size.
+        s = min(shift, rhs.num_qubits - 1)
+        if s == 0:
+            _add_or_subtract(lhs, sub, Add(), rhs)
+            return
+        ext = self.alloc_temp_qreg(s, "ext")
+        with _SignExtension().computed(rhs, ext):
+            _add_or_subtract(lhs, sub, Add(), QFixed(rhs[s:] | ext, radix=rhs.radix))
+        ext.release()
+
+    def _iterate(self, x: QFixed, y: QFixed, z: QFixed, *, vectoring: bool) -> tuple[QFixed, QFixed]:
+        """Does result_radix iterations, returns new x and y.
+
+        Rotation mode drives z to 0, vectoring mode drives y to 0. x and z are
+        updated in place. New y depends on old x, so it is computed into a new
+        register, and old values of y and directions of rotations are left as
+        garbage. So each iteration leaves y.num_qubits+1 qubits of garbage,
+        and the number of qubits grows as O(result_radix^2).
+        """
+        w = x.num_qubits
+        for i in range(self.result_radix):
+            # Rotation direction is d=+1 if c=0, and d=-1 if c=1.
+            c = self.alloc_temp_qreg(1, "c")
+            c.x((y if vectoring else z)[-1])
+            if vectoring:
+                c.x()
+            new_y = QFixed(self.alloc_temp_qreg(w, "y"), radix=y.radix)
+            ParallelCnot().compute(y, new_y)
+
+            # new_y:=y+d*(x>>i), then x:=x-d*(y>>i), z:=z-d*atan(2^-i).
+            self._add_shifted(new_y, c, x, i)
+            c.x()
+            self._add_shifted(x, c, y, i)
+            _add_or_subtract(z, c, AddConst(_cordic_angle(i, z.radix)))
+            c.x()
+            y = new_y
+        return x, y
+
+    def _iterations_costs(self, w, u) -> tuple:
+        """Returns elbows, active volume and garbage of iterations on registers of size w (x, y) and u (z)."""
+        m = self.result_radix
+        # Each iteration copies c and y, and does 2 additions of shifted
+        # registers and 1 addition of constant, each surrounded by 2 fan-outs.
+        elbows = m * (2 * w + u - 4)
+        av = m * (4 + 4 * w + 2 * (8 * w + 72 * w - 83) + 8 * u + 61 * u - 118)
+        # Sign extension by min(i, w-1) qubits is computed and uncomputed
+        # twice in i-th iteration.
+        k = Max(m - w, 0)
+        av += 16 * (m * (m - 1) / 2 - k * (k + 1) / 2)
+        return elbows, av, m * (w + 1)
+
+
+class _CordicRotation(_CordicBase):
+    """Computes (cos(pi*x), sin(pi*x)) with CORDIC in rotation mode."""
+
+    def _rotate(self, x: QFixed) -> tuple[QFixed, QFixed]:
+        r, m, g = x.radix, self.result_radix, self.guard_bits
+        assert 1 <= r < x.num_qubits
+        radix = m + g
+
+        # Copy x mod 2 to z, as signed number in [-1, 1).
+        z = QFixed(self.alloc_temp_qreg(radix + 1, "z"), radix=radix)
+        lo = max(0, r - radix)
+        ParallelCnot().compute(x[lo : r + 1], z[radix - r + lo : radix + 1])
+
+        # Start from (K, 0), so that the result doesn't need to be scaled.
+        cx = QFixed(self.alloc_temp_qreg(radix + 2, "x"), radix=radix)
+        cy = QFixed(self.alloc_temp_qreg(radix + 2, "y"), radix=radix)
+        write_uint(cx, round(cordic_gain(m) * 2**radix))
+
+        # If |z|>=1/2, rotate by the remaining angle z∓1 and negate the result.
+        # Flipping the sign bit adds or subtracts 1.
+        t = self.alloc_temp_qreg(1, "t")
+        with Neq().computed(t, x[r - 1], x[r]):
+            z[radix].x(t)
+            cx, cy = self._iterate(cx, cy, z, vectoring=False)
+            Negate().compute(cx, ctrl=t)
+            Negate().compute(cy, ctrl=t)
+        t.release()
+        return QFixed(cx[g:], radix=m), QFixed(cy[g:], radix=m)
+
+    def _estimate(self, x: QFixed):
+        m, g = self.result_radix, self.guard_bits
+        w, u = m + g + 2, m + g + 1
+        it_elbows, it_av, it_garbage = self._iterations_costs(w, u)
+        ancs = self.alloc_temp_qreg(u + 2 * w + it_garbage, "ancs")
+        self.set_result_qreg(ancs[0 : m + 2])
+
+        # Copy of x, Neq and its uncomputation, iterations and 2 controlled
+        # negations. Peak is in the last iteration: t, sign extension and adder.
+        num_cnots = Min(x.radix, m + g) + 2
+        cost = QubrickCosts(
+            gidney_lelbows=it_elbows + 2 * w - 3,
+            gidney_relbows=it_elbows + 2 * w - 3,
+            toffs=2 * w,
+            local_ancillae=w + Min(m - 1, w - 1),
+            active_volume=4 * num_cnots + 155 + it_av + 2 * (105.5 * w - 154),
+        )
+        self.get_qc().add_cost_event(cost)
+
+
+class CordicCos(_CordicRotation):
+    """Computes cos(pi*x) with CORDIC. Correct for any x.
+
+    Uses result_radix iterations, absolute error is at most about
+    2^-(result_radix-2). Sine is computed too and left as garbage.
+    """
+
+    def _compute(self, x: QFixed):
+        self.set_result_qreg(self._rotate(x)[0])
+
+
+class CordicSin(_CordicRotation):
+    """Computes sin(pi*x) with CORDIC. Correct for any x.
+
+    Uses result_radix iterations, absolute error is at most about
+    2^-(result_radix-2). Cosine is computed too and left as garbage.
+    """
+
+    def _compute(self, x: QFixed):
+        self.set_result_qreg(self._rotate(x)[1])
+
+
+class CordicAtan2(_CordicBase):
+    """Computes atan2(y, x)/pi in [-1, 1) with CORDIC in vectoring mode.
+
+    x and y must have the same size and radix. Uses result_radix iterations.
+    Absolute error is at most about 2^-(result_radix-1), if length of vector
+    (x, y) is large compared to 2^-radix.
+    """
+
+    def _compute(self, y: QFixed, x: QFixed):
+        assert x.num_qubits == y.num_qubits and x.radix == y.radix
+        m, g = self.result_radix, self.guard_bits
+        cx = self._load(x, "x")
+        cy = self._load(y, "y")
+        z = QFixed(self.alloc_temp_qreg(m + g + 1, "z"), radix=m + g)
+
+        # If x<0, rotate by pi, so that iterations converge.
+        z[-1].x(x[-1])
+        Negate().compute(cx, ctrl=x[-1])
+        Negate().compute(cy, ctrl=x[-1])
+
+        self._iterate(cx, cy, z, vectoring=True)
+        self.set_result_qreg(QFixed(z[g:], radix=m))
+
+    def _estimate(self, y: QFixed, x: QFixed):
+        m, g, n = self.result_radix, self.guard_bits, x.num_qubits
+        w, u = n + g + 2, m + g + 1
+        it_elbows, it_av, it_garbage = self._iterations_costs(w, u)
+        ancs = self.alloc_temp_qreg(2 * w + u + it_garbage, "ancs")
+        self.set_result_qreg(ancs[0 : m + 1])
+
+        cost = QubrickCosts(
+            gidney_lelbows=it_elbows + 2 * w - 4,
+            gidney_relbows=it_elbows + 2 * w - 4,
+            toffs=2 * w - 2,
+            local_ancillae=w - 1 + Min(m - 1, w - 1),
+            active_volume=8 * (n + 2) + 4 + it_av + 2 * (105.5 * w - 154),
+        )
+        self.get_qc().add_cost_event(cost)
+
+
+class CordicAtan(_CordicBase):
+    """Computes atan(y)/pi with CORDIC in vectoring mode.
+
+    Uses result_radix iterations. Absolute error is at most about
+    2^-(result_radix-1).
+    """
+
+    def _compute(self, y: QFixed):
+        m, g = self.result_radix, self.guard_bits
+        cy = self._load(y, "y")
+        cx = QFixed(self.alloc_temp_qreg(cy.num_qubits, "x"), radix=cy.radix)
+        cx[cy.radix].x()
+        z = QFixed(self.alloc_temp_qreg(m + g + 1, "z"), radix=m + g)
+        self._iterate(cx, cy, z, vectoring=True)
+        self.set_result_qreg(QFixed(z[g:], radix=m))
+
+    def _estimate(self, y: QFixed):
+        m, g, n = self.result_radix, self.guard_bits, y.num_qubits
+        w, u = n + g + 2, m + g + 1
+        it_elbows, it_av, it_garbage = self._iterations_costs(w, u)
+        ancs = self.alloc_temp_qreg(2 * w + u + it_garbage, "ancs")
+        self.set_result_qreg(ancs[0 : m + 1])
+
+        cost = QubrickCosts(
+            gidney_lelbows=it_elbows,
+            gidney_relbows=it_elbows,
+            local_ancillae=w - 1 + Min(m - 1, w - 1),
+            active_volume=4 * (n + 2) + it_av,
+        )
+        self.get_qc().add_cost_event(cost)
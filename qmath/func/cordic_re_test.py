@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from psiqworkbench import QPU, QFixed, SymbolicQPU, resource_estimator
+from psiqworkbench.resource_estimation.qre._resource_dict import ResourceDict
+from psiqworkbench.symbolics import Parameter
+
+from qmath.func.cordic import CordicAtan, CordicAtan2, CordicCos
+from qmath.func.fbe import CosFbe, plan_cos_fbe
+from qmath.utils.re_utils import FILTERS_FOR_NUMERIC_RE, verify_re
+from qmath.utils.symbolic import SymbolicQFixed
+from qmath.utils.test_utils import QPUTestHelper
+
+
+def _re_symbolic(op, num_inputs: int) -> ResourceDict:
+    n = Parameter("n", "Input size")
+    r = Parameter("r", "Input radix")
+    qpu = SymbolicQPU()
+    inputs = [SymbolicQFixed(num_qubits=n, name=f"x{i}", qpu=qpu, radix=r) for i in range(num_inputs)]
+    op.compute(*inputs)
+    return resource_estimator(qpu).resources()
+
+
+def _re_numeric(make_op, num_inputs: int, assgn: dict[str, int]) -> ResourceDict:
+    n, r, m = assgn["n"], assgn["r"], assgn["m"]
+    qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+    qpu.reset(num_inputs * n + 3 * (n + m + 8) * (m + 2))
+    inputs = [QFixed(n, name=f"x{i}", qpu=qpu, radix=r) for i in range(num_inputs)]
+    make_op(m).compute(*inputs)
+    return resource_estimator(qpu).resources()
+
+
+@pytest.mark.re
+@pytest.mark.parametrize(
+    "op_class, num_inputs",
+    [(CordicCos, 1), (CordicAtan2, 2), (CordicAtan, 1)],
+)
+def test_re_cordic(op_class, num_inputs: int):
+    re_symbolic = _re_symbolic(op_class(result_radix=Parameter("m", "Result radix")), num_inputs)
+    re_numeric = lambda assgn: _re_numeric(lambda m: op_class(result_radix=m), num_inputs, assgn)
+    for n, r, m in [(4, 2, 4), (8, 5, 10), (12, 10, 8), (10, 6, 16)]:
+        verify_re(re_symbolic, re_numeric, {"n": n, "r": r, "m": m}, av_rtol=0.1, elbows_rtol=0.05)
+
+
+def _toffolis_qubits_and_max_error(make_op, f, xs, *, n: int, radix: int) -> tuple[int, int, float]:
+    qpu = QPU(filters=[">>witness>>"])
+    qpu.reset(2000)
+    make_op().compute(QFixed(n, name="x", radix=radix, qpu=qpu))
+    metrics = qpu.metrics()
+
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=2000, qubits_per_reg=n, radix=radix)
+    op = make_op()
+    op.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(op.get_result_qreg())
+    max_error = max(abs(qpu_helper.apply_op([x]) - f(x)) for x in xs)
+    return metrics["toffoli_count"], metrics["qubit_highwater"], max_error
+
+
+@pytest.mark.re
+@pytest.mark.slow
+def test_CordicCos_vs_fbe():
+    # Evaluate cos(pi*x) on [-1, 1) with absolute error 1e-3.
+    n, radix, error = 8, 6, 1e-3
+    f = lambda x: np.cos(np.pi * x)
+    xs = np.linspace(-1, 0.984375, 64)
+    m = 12
+    cordic = _toffolis_qubits_and_max_error(lambda: CordicCos(result_radix=m), f, xs, n=n, radix=radix)
+    fbe = _toffolis_qubits_and_max_error(lambda: CosFbe(plan=plan_cos_fbe(radix, error)), f, xs, n=n, radix=radix)
+    assert cordic[2] < error and fbe[2] < error
+    # CORDIC does one addition per bit, while FBE multiplies wide registers.
+    assert cordic[0] < fbe[0]
+    # Old values of y (w qubits) and rotation directions left as garbage by
+    # each iteration dominate the qubit count of CORDIC, so it needs more
+    # qubits than FBE.
+    w = m + 4 + 2
+    assert m * (w + 1) < cordic[1] < (m + 6) * (w + 1)
+    assert fbe[1] < cordic[1]
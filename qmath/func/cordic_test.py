@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from psiqworkbench import QPU, QFixed
+from psiqworkbench.filter_presets import BIT_DEFAULT
+
+from qmath.func.cordic import CordicAtan, CordicAtan2, CordicCos, CordicSin, cordic_gain
+from qmath.utils.test_utils import QPUTestHelper
+
+
+def test_cordic_gain():
+    assert abs(cordic_gain(30) - 0.6072529350088813) < 1e-12
+
+
+@pytest.mark.smoke
+def test_cos_fast():
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(200)
+    qs_x = QFixed(5, name="x", radix=3, qpu=qpu)
+    qs_x.write(0.75)
+    op = CordicCos(result_radix=8)
+    op.compute(qs_x)
+    assert abs(op.get_result_qreg().read() - np.cos(0.75 * np.pi)) < 2**-5
+
+
+@pytest.mark.parametrize("op_class, f", [(CordicCos, np.cos), (CordicSin, np.sin)])
+def test_cos_sin(op_class, f):
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=500, qubits_per_reg=8, radix=5)
+    op = op_class(result_radix=10)
+    op.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(op.get_result_qreg())
+
+    for x in np.linspace(-4, 3.96875, 2**6 + 1):
+        result = qpu_helper.apply_op([x])
+        assert abs(result - f(np.pi * x)) < 2**-8
+
+
+def test_atan2():
+    qpu_helper = QPUTestHelper(num_inputs=2, num_qubits=600, qubits_per_reg=8, radix=5)
+    y, x = qpu_helper.inputs
+    op = CordicAtan2(result_radix=10)
+    op.compute(y, x)
+    qpu_helper.record_op(op.get_result_qreg())
+
+    for angle in np.linspace(-np.pi, np.pi, 17)[:-1]:
+        y, x = 3 * np.sin(angle), 3 * np.cos(angle)
+        result = qpu_helper.apply_op([y, x])
+        expected = np.arctan2(round(y * 32) / 32, round(x * 32) / 32) / np.pi
+        assert abs((result - expected + 1) % 2 - 1) < 2**-8
+
+
+def test_atan():
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=500, qubits_per_reg=8, radix=5)
+    op = CordicAtan(result_radix=10)
+    op.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(op.get_result_qreg())
+
+    for y in np.linspace(-4, 3.96875, 2**6 + 1):
+        result = qpu_helper.apply_op([y])
+        assert abs(result - np.arctan(y) / np.pi) < 2**-8
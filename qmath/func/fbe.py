@@ -9,18 +9,21 @@ Reference:
 """
 
 import math
+from dataclasses import dataclass
 
-from psiqworkbench import QFixed, QInt, Qubits, QUFixed, QUInt
+from psiqworkbench import QFixed, Qubits, QUFixed, QUInt
 from psiqworkbench.qubricks import Qubrick
+from psiqworkbench.symbolics.parameter import Max
 from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
 
-from ..utils.gates import ParallelCnot, ParallelCnotCtrl, write_int
-from ..utils.perm import Div2, Mul2
+from ..utils.gates import ParallelCnot
+from ..utils.pebbling import PebbledChain, pebbling_cost
+from ..utils.perm import Div2, Mul2, ShiftLeft
 from ..utils.symbolic import alloc_temp_qreg_like
-from .bits import HighestSetBit
+from .bits import Normalize
 from .common import AddConst, Negate, MultiplyConstAdd
-from .sqrt import Sqrt
-from .square import SquareOptimized
+from .sqrt import Sqrt, sqrt_costs
+from .square import SquareOptimized, square_optimized_costs, unsigned_square_costs
 
 
 def _sqrt_half(x: QFixed) -> QFixed:
@@ -29,6 +32,49 @@ def _sqrt_half(x: QFixed) -> QFixed:
     return op.get_result_qreg()
 
 
+@dataclass(frozen=True)
+class FbePrecisionPlan:
+    """Precision plan for FBE evaluator.
+
+    Number of iterations, and number of fractional bits of the working
+    register in each iteration.
+    """
+
+    radixes: tuple[int, ...]
+
+    @property
+    def num_iterations(self) -> int:
+        return len(self.radixes)
+
+
+def plan_cos_fbe(input_radix: int, error: float) -> FbePrecisionPlan:
+    """Plans CosFbe (or SinFbe) iterations so that absolute error of result is at most `error`.
+
+    Least significant input bits are ignored if they change result by less
+    than error/2. Errors made in early iterations are damped by the later
+    iterations, so early iterations use fewer fractional bits.
+    Rules are calibrated with classical simulation of the fixed-point algorithm.
+    """
+    k = min(input_radix, math.ceil(math.log2(2 * math.pi / error)))
+    # Each iteration roughly doubles error, and result has precision about
+    # half of radix.
+    m = 2 * (math.ceil(math.log2(2 / error)) + max(k - 4, 0)) + 2
+    return FbePrecisionPlan(tuple(max(4, m - 2 * (max(0, k - 2 - i) // 2)) for i in range(k)))
+
+
+def plan_log2_fbe(error: float) -> FbePrecisionPlan:
+    """Plans Log2FbeSegment iterations so that absolute error of result is at most `error`.
+
+    Each iteration computes one bit of result. Relative error in i-th
+    iteration changes result by 2^-i times less than in the first iteration,
+    so later iterations use fewer fractional bits.
+    Rules are calibrated with classical simulation of the fixed-point algorithm.
+    """
+    num_bits = math.ceil(math.log2(1 / error)) + 1
+    guard_bits = math.ceil(math.log2(num_bits)) + 2
+    return FbePrecisionPlan(tuple(num_bits + guard_bits - i for i in range(num_bits)))
+
+
 class Neq(Qubrick):
     """Computes t:=(a!=b)."""
 
@@ -42,40 +88,100 @@ class Neq(Qubrick):
         t.x()
 
 
+# a:=1-a if t=1 else 1+a.
+class _CosFbePrep(Qubrick):
+    def _compute(self, a: QFixed, t: Qubits):
+        Negate().compute(a, ctrl=t)
+        AddConst(1).compute(a)
+
+
+class _CosFbeStep(Qubrick):
+    """Computes i-th iteration of CosFbe out of place, keeping `a` unchanged.
+
+    Leaves remainder of Sqrt as garbage.
+    """
+
+    def __init__(self, i: int, **kwargs):
+        super().__init__(**kwargs)
+        self.i = i
+
+    def _compute(self, a: QFixed, x: QFixed):
+        _, c = alloc_temp_qreg_like(self, a, name="c")
+        t = self.alloc_temp_qreg(1, "t")
+        with Neq().computed(t, x[self.i - 1], x[self.i]):
+            with _CosFbePrep().computed(a, t):
+                ParallelCnot().compute(a, c)
+        t.release()
+        self.set_result_qreg(_sqrt_half(c))
+
+
 class CosFbe(Qubrick):
     """Computes cos(pi*x). Correct for any x.
 
     Precision of the answer will be about half of `result_radix`.
+
+    By default, each iteration leaves its input as garbage, so x.radix
+    registers of size result_radix+2 are allocated. If `pebbling_arity` is
+    set, iterations are done out of place and intermediate results are
+    uncomputed using PebbledChain. With arity 2, only O(log(x.radix)) such
+    registers are live at the same time, at the cost of O(x.radix^log2(3))
+    iterations.
+
+    If `plan` is given (see plan_cos_fbe), only plan.num_iterations most
+    significant bits of x are used, and iterations are done with given
+    numbers of fractional bits. Result has plan.radixes[-1] fractional bits.
     """
 
     def __init__(
         self,
         *,
         result_radix: None | int = None,
+        pebbling_arity: int | None = None,
+        plan: FbePrecisionPlan | None = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
+        assert plan is None or (result_radix is None and pebbling_arity is None)
         self.result_radix = result_radix
-
-    def _compute(self, x: QFixed):
-        if self.result_radix is None:
-            _, a = alloc_temp_qreg_like(self, x)
-        else:
-            a = QFixed(self.alloc_temp_qreg(self.result_radix + 2, name="a"), radix=self.result_radix)
-
-        # 0-th iteration: a:= 1 if x[0]==0 else 0.
-        x[0].x()
-        a[a.radix].x(x[0])
-        x[0].x()
-
-        for i in range(1, x.radix):
-            # Iteration: a:=sqrt((1±a)/2), sign is minus iff x[i-1]!=x[i].
+        self.pebbling_arity = pebbling_arity
+        self.plan = plan
+
+    def _iterate(self, a: QFixed, x: QFixed, s: int, radixes: list[int]) -> QFixed:
+        # 0-th iteration: a:= 1 if x[s]==0 else 0.
+        x[s].x()
+        a[a.radix].x(x[s])
+        x[s].x()
+
+        for i in range(1, len(radixes)):
+            # Iteration: a:=sqrt((1±a)/2), sign is minus iff x[s+i-1]!=x[s+i].
+            if radixes[i] > a.radix:
+                pad = self.alloc_temp_qreg(radixes[i] - a.radix, "pad")
+                a = QFixed(pad | a, radix=radixes[i])
             t = self.alloc_temp_qreg(1, "t")
-            with Neq().computed(t, x[i - 1], x[i]):
-                Negate().compute(a, ctrl=t)
-                AddConst(1).compute(a)
+            with Neq().computed(t, x[s + i - 1], x[s + i]):
+                _CosFbePrep().compute(a, t)
             a = _sqrt_half(a)
             t.release()
+        return a
+
+    def _compute(self, x: QFixed):
+        if self.plan is not None:
+            radixes = self.plan.radixes
+            a = QFixed(self.alloc_temp_qreg(radixes[0] + 2, name="a"), radix=radixes[0])
+            a = self._iterate(a, x, x.radix - self.plan.num_iterations, radixes)
+        else:
+            if self.result_radix is None:
+                _, a = alloc_temp_qreg_like(self, x)
+            else:
+                a = QFixed(self.alloc_temp_qreg(self.result_radix + 2, name="a"), radix=self.result_radix)
+            if self.pebbling_arity is None:
+                a = self._iterate(a, x, 0, [a.radix] * x.radix)
+            else:
+                a = self._iterate(a, x, 0, [a.radix])
+                if x.radix > 1:
+                    chain = PebbledChain(lambda i: _CosFbeStep(i + 1), x.radix - 1, arity=self.pebbling_arity)
+                    chain.compute(a, x)
+                    a = chain.get_result_qreg()
 
         t = self.alloc_temp_qreg(1, "t")
         with Neq().computed(t, x[x.radix - 1], x[x.radix]):
@@ -85,10 +191,16 @@ class CosFbe(Qubrick):
         self.set_result_qreg(a)
 
     def _estimate(self, x: QFixed):
+        if self.plan is not None:
+            self._estimate_planned()
+            return
         assert self.result_radix is not None
 
         n = x.radix  # Input radix = number of iterations.
         m = self.result_radix
+        if self.pebbling_arity is not None:
+            self._estimate_pebbled(n, m)
+            return
 
         ancs = self.alloc_temp_qreg(n * (m + 2), "ancs")
         self.set_result_qreg(ancs[0 : m + 2])
@@ -104,23 +216,72 @@ class CosFbe(Qubrick):
         )
         self.get_qc().add_cost_event(cost)
 
+    def _estimate_planned(self):
+        # Same as above, with per-iteration costs summed over iterations.
+        # This assumes that all radixes are even.
+        radixes = self.plan.radixes
+        m = radixes[-1]
+        # Initial register, pads and results of all iterations remain allocated.
+        ancs = self.alloc_temp_qreg(sum(r + 2 for r in radixes) + m - radixes[0], "ancs")
+        self.set_result_qreg(ancs[0 : m + 2])
+        elbows = m + 1 + sum(0.25 * r**2 + 4.5 * r + 7 for r in radixes[1:])
+        cost = QubrickCosts(
+            gidney_lelbows=elbows,
+            gidney_relbows=elbows,
+            toffs=m + 3 + sum(2 * r + 8 for r in radixes[1:]),
+            local_ancillae=m + 10,
+            active_volume=105.5 * m + 205 + sum(18.75 * r**2 + 407 * r + 886 for r in radixes[1:]),
+        )
+        self.get_qc().add_cost_event(cost)
+
+    def _estimate_pebbled(self, n: int, m):
+        assert isinstance(n, int), "Pebbling schedule requires numeric input radix."
+        assert n >= 2
+        steps, live = pebbling_cost(n - 1, self.pebbling_arity)
+
+        # Iteration-independent part (0-th iteration and final negation), plus
+        # cost of each step. Step is an iteration of the default method, plus
+        # uncomputation of Negate and AddConst and copying of a.
+        # Like the estimate above, this assumes m%2==0.
+        elbows = m + 1 + steps * (0.25 * m**2 + 5.5 * m + 7)
+        # Initial value, result and copy of input of the last step remain allocated.
+        ancs = self.alloc_temp_qreg(3 * (m + 2), "ancs")
+        self.set_result_qreg(ancs[0 : m + 2])
+        cost = QubrickCosts(
+            gidney_lelbows=elbows,
+            gidney_relbows=elbows,
+            toffs=m + 3 + steps * (3 * m + 9),
+            # Each live step holds its result and copy of its input. Peak is
+            # reached in Sqrt of a step when `live` steps are live.
+            local_ancillae=2 * (live - 1) * (m + 2) + m + 8,
+            active_volume=105.5 * m + 205 + steps * (18.75 * m**2 + 516.5 * m + 955),
+        )
+        self.get_qc().add_cost_event(cost)
+
 
 class SinFbe(Qubrick):
-    """Computes sin(pi*x)=cos(pi*(0.5-x))."""
+    """Computes sin(pi*x)=cos(pi*(0.5-x)).
+
+    See CosFbe for description of `pebbling_arity` and `plan`.
+    """
 
     def __init__(
         self,
         *,
         result_radix: None | int = None,
+        pebbling_arity: int | None = None,
+        plan: FbePrecisionPlan | None = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
         self.result_radix = result_radix
+        self.pebbling_arity = pebbling_arity
+        self.plan = plan
 
     def _compute(self, x: QFixed):
         Negate().compute(x)
         AddConst(0.5).compute(x)
-        cos_op = CosFbe(result_radix=self.result_radix)
+        cos_op = CosFbe(result_radix=self.result_radix, pebbling_arity=self.pebbling_arity, plan=self.plan)
         cos_op.compute(x)
         self.set_result_qreg(cos_op.get_result_qreg())
 
@@ -129,16 +290,42 @@ class Log2FbeSegment(Qubrick):
     """Computes log2(x) where 1<=x<2.
 
     Reference: https://arxiv.org/abs/2001.00807, section 3.1.1.
+
+    If `padded_square` is set, squares are padded to the precision of Square.
+
+    If `plan` is given (see plan_log2_fbe), i-th iteration is done on register
+    with plan.radixes[i] fractional bits, and the result must have
+    plan.num_iterations qubits.
     """
 
-    def _square(self, x: QUFixed) -> QUFixed:
-        result = QUFixed(self.alloc_temp_qreg(x.num_qubits, name="a"), radix=x.radix)
-        SquareOptimized(signed=False).compute(x, result)
+    def __init__(self, *, padded_square: bool = False, plan: FbePrecisionPlan | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.padded_square = padded_square
+        self.plan = plan
+
+    def _square(self, x: QUFixed, radix: int | None = None) -> QUFixed:
+        if radix is None:
+            radix = x.radix
+        result = QUFixed(self.alloc_temp_qreg(2 + radix, name="a"), radix=radix)
+        padding = "auto" if self.padded_square else 0
+        SquareOptimized(signed=False, padding=padding).compute(x, result)
         return result
 
     def _compute(self, x: QUFixed, result: QUFixed):
         assert x.num_qubits == 2 + x.radix
         assert result.num_qubits == result.radix
+        if self.plan is not None:
+            assert result.radix == self.plan.num_iterations
+            radixes = self.plan.radixes
+            a = self._square(x, radixes[0])
+            for i in range(result.radix):
+                result_bit = result[result.radix - 1 - i]
+                result_bit.x(a[-1])
+                Div2().compute(a, ctrl=result_bit)
+                if i + 1 < result.radix:
+                    a = self._square(a, radixes[i + 1])
+            return
+
         a = self._square(x)
 
         for i in range(result.radix):
@@ -147,52 +334,158 @@ class Log2FbeSegment(Qubrick):
             Div2().compute(a, ctrl=result_bit)
             a = self._square(a)
 
+    def _costs(self, n, r, num_iterations) -> tuple:
+        """Costs for input of n qubits with radix r.
+
+        Returns (elbows, toffs, active_volume, ancillae, garbage).
+        """
+        if self.plan is not None:
+            assert num_iterations == self.plan.num_iterations
+            return self._costs_planned(n, r)
+        p = self._num_padding_qubits(r, r)
+        sq_elbows, sq_toffs, sq_av, sq_ancillae = square_optimized_costs(n, r, p, signed=False)
+
+        # There are num_iterations+1 squares, each leaving its result and
+        # padding as garbage. Each iteration also copies one bit, and Div2
+        # does n controlled swaps and leaves one qubit as garbage.
+        k = num_iterations
+        elbows = (k + 1) * sq_elbows
+        toffs = (k + 1) * sq_toffs + k * n
+        # Active volume of controlled swap is the same as in JHHAMultipler.
+        av = (k + 1) * sq_av + k * (4 + 51 * n)
+        garbage = (k + 1) * (n + p) + k
+        return elbows, toffs, av, sq_ancillae, garbage
+
+    def _costs_planned(self, n: int, r: int) -> tuple:
+        # Same as above, with costs of each square computed for its sizes.
+        # There is no square after the last iteration.
+        assert isinstance(n, int) and isinstance(r, int), "Planned estimate requires numeric input size and radix."
+        radixes = self.plan.radixes
+        inputs = [(n, r)] + [(ri + 2, ri) for ri in radixes[:-1]]
+        elbows, toffs, av, ancillae, garbage = 0, 0, 0, 0, len(radixes)
+        for (xn, xr), tr in zip(inputs, radixes):
+            p = self._num_padding_qubits(xr, tr)
+            sq_elbows, sq_toffs, sq_av, sq_ancillae = unsigned_square_costs(xn, xr, tr + 2, tr, p)
+            elbows += sq_elbows
+            toffs += sq_toffs
+            av += sq_av
+            ancillae = max(ancillae, sq_ancillae)
+            garbage += tr + 2 + p
+        # Div2 does (r_i+2) controlled swaps in i-th iteration.
+        num_swaps = sum(ri + 2 for ri in radixes)
+        return elbows, toffs + num_swaps, av + 4 * len(radixes) + 51 * num_swaps, ancillae, garbage
+
+    def _num_padding_qubits(self, xr, tr) -> int:
+        # Same as SquareOptimized with padding="auto".
+        if not self.padded_square:
+            return 0
+        dropped = 2 * xr - tr
+        assert isinstance(dropped, int), "Symbolic estimate of padded square requires numeric radix."
+        return math.ceil(math.log2(dropped)) if dropped > 1 else 0
+
+    def _estimate(self, x: QUFixed, result: QUFixed):
+        elbows, toffs, av, ancillae, garbage = self._costs(x.num_qubits, x.radix, result.radix)
+        self.alloc_temp_qreg(garbage, "garbage")
+        cost = QubrickCosts(
+            gidney_lelbows=elbows,
+            gidney_relbows=elbows,
+            toffs=toffs,
+            local_ancillae=ancillae,
+            active_volume=av,
+        )
+        self.get_qc().add_cost_event(cost)
+
 
 class Log2Fbe(Qubrick):
-    """Computes log2(x) where x>0."""
+    """Computes log2(x) where x>0.
+
+    If `plan` is given (see plan_log2_fbe), result has plan.num_iterations
+    fractional bits.
+
+    Symbolic estimate requires numeric size and radix of input, but
+    `result_radix` can be symbolic. Size of integer part of the result and
+    the cost of Normalize depend on the input size, so symbolic input size
+    fails with AssertionError.
+    """
 
     def __init__(
         self,
         *,
         result_radix: None | int = None,
+        padded_square: bool = False,
+        plan: FbePrecisionPlan | None = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
+        assert plan is None or result_radix is None
         self.result_radix = result_radix
+        self.padded_square = padded_square
+        self.plan = plan
 
     def _compute(self, x: QUFixed):
-        # Find most significant bit of `x`, set it it `msb`.
-        xn = x.num_qubits
-        msb = self.alloc_temp_qreg(xn, "msb")
-        HighestSetBit().compute(x, msb)
-
-        # Make shifted copy of input, such that second most significnat bit in
+        # Make shifted copy of input, such that second most significant bit in
         # the copy corresponds to highest set bit in input.
         # This way value in x_copy is in range [1, 2).
-        x_copy_qubits = self.alloc_temp_qreg(xn, name="x_copy")
-        x_copy = QUFixed(x_copy_qubits, radix=xn - 2)
-        for i in range(xn):
-            # Controlled shift-copy.
-            if i == xn - 1:
-                ParallelCnotCtrl().compute(msb[i], x[1:], x_copy_qubits[0 : xn - 1])
-            else:
-                shift_left = xn - 2 - i
-                assert shift_left >= 0
-                ParallelCnotCtrl().compute(msb[i], x[0 : xn - shift_left], x_copy_qubits[shift_left:])
+        xn = x.num_qubits
+        shift = self.alloc_temp_qreg((xn - 1).bit_length(), "shift")
+        mantissa = self.alloc_temp_qreg(xn, "mantissa")
+        Normalize().compute(x, shift, mantissa)
+        x_copy = QUFixed(mantissa[1:] | self.alloc_temp_qreg(1, "top"), radix=xn - 2)
 
         # Compute logarithm for shifted copy.
         r = self.result_radix or x.radix
+        if self.plan is not None:
+            r = self.plan.num_iterations
         result_fract_part = QUFixed(self.alloc_temp_qreg(r, "result_frac"), radix=r)
-        Log2FbeSegment().compute(x_copy, result_fract_part)
+        Log2FbeSegment(padded_square=self.padded_square, plan=self.plan).compute(x_copy, result_fract_part)
 
         # Add integer to result, corresponding to input's shift.
         int_part_size = math.ceil(math.log2(max(x.radix, xn - x.radix))) + 1
-        result_int_part = QInt(self.alloc_temp_qreg(int_part_size, "result_int"))
-        for i in range(xn):
-            write_int(result_int_part, i - x.radix, ctrl=msb[i])
+        result_int_part = QFixed(self.alloc_temp_qreg(int_part_size, "result_int"), radix=0)
+        self._write_int_part(result_int_part, shift, xn - 1 - x.radix)
 
         self.set_result_qreg(QFixed(result_fract_part | result_int_part, radix=r))
 
+    def _write_int_part(self, target: QFixed, shift: Qubits, c: int):
+        # target:=c-shift. It fits in target, so higher bits of shift can be ignored.
+        k = min(target.num_qubits, shift.num_qubits)
+        ParallelCnot().compute(shift[0:k], target[0:k])
+        Negate().compute(target)
+        if c != 0:
+            AddConst(c).compute(target)
+
+    def _estimate(self, x: QUFixed):
+        n, radix = x.num_qubits, x.radix
+        assert isinstance(n, int) and isinstance(radix, int), "Estimate requires numeric input size and radix."
+        r = radix if self.result_radix is None else self.result_radix
+        if self.plan is not None:
+            r = self.plan.num_iterations
+        segment = Log2FbeSegment(padded_square=self.padded_square, plan=self.plan)
+        elbows, toffs, av, ancillae, garbage = segment._costs(n, n - 2, r)
+
+        shift = self.alloc_temp_qreg((n - 1).bit_length(), "shift")
+        mantissa = self.alloc_temp_qreg(n, "mantissa")
+        Normalize().compute(x, shift, mantissa)
+        self.alloc_temp_qreg(1 + garbage, "garbage")
+        int_part_size = math.ceil(math.log2(max(radix, n - radix))) + 1
+        result = self.alloc_temp_qreg(r + int_part_size, "result")
+        result.radix = r
+
+        cost = QubrickCosts(
+            gidney_lelbows=elbows,
+            gidney_relbows=elbows,
+            toffs=toffs,
+            # Integer part of result is allocated after the segment is computed.
+            local_ancillae=ancillae - int_part_size,
+            active_volume=av,
+        )
+        self.get_qc().add_cost_event(cost)
+
+        int_part = result[r : r + int_part_size]
+        int_part.radix = 0
+        self._write_int_part(int_part, shift, n - 1 - radix)
+        self.set_result_qreg(result)
+
 
 class LogFbe(Qubrick):
     """Computes logarithm in given base."""
@@ -202,14 +495,18 @@ class LogFbe(Qubrick):
         base: float,
         *,
         result_radix: None | int = None,
+        padded_square: bool = False,
+        plan: FbePrecisionPlan | None = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
         self.ans_multiplier = 1.0 / math.log2(base)
         self.result_radix = result_radix
+        self.padded_square = padded_square
+        self.plan = plan
 
     def _compute(self, x: QUFixed):
-        op = Log2Fbe(result_radix=self.result_radix)
+        op = Log2Fbe(result_radix=self.result_radix, padded_square=self.padded_square, plan=self.plan)
         with op.computed(x):
             _, ans = alloc_temp_qreg_like(self, op.get_result_qreg())
             if self.ans_multiplier == 1.0:
@@ -219,15 +516,37 @@ class LogFbe(Qubrick):
         self.set_result_qreg(ans)
 
 
+class _Pow2Step(Qubrick):
+    """Computes i-th iteration of Pow2Segment out of place, keeping `a` unchanged.
+
+    Leaves remainder of Sqrt as garbage.
+    """
+
+    def __init__(self, i: int, **kwargs):
+        super().__init__(**kwargs)
+        self.i = i
+
+    def _compute(self, a: QUFixed, x: QUFixed):
+        c = QUFixed(self.alloc_temp_qreg(a.num_qubits, name="c"), radix=a.radix)
+        with Mul2().computed(a, ctrl=x[self.i]):
+            ParallelCnot().compute(a, c)
+        op = Sqrt()
+        op.compute(c)
+        self.set_result_qreg(op.get_result_qreg())
+
+
 class Pow2Segment(Qubrick):
-    """Computes log2(x) where 0<=x<1.
+    """Computes 2^x where 0<=x<1.
 
     Reference: https://arxiv.org/abs/2001.00807, section 3.2.1.
+
+    See CosFbe for description of `pebbling_arity`.
     """
 
-    def __init__(self, *, result_radix: None | int = None, **kwargs):
+    def __init__(self, *, result_radix: None | int = None, pebbling_arity: int | None = None, **kwargs):
         super().__init__(**kwargs)
         self.result_radix = result_radix
+        self.pebbling_arity = pebbling_arity
 
     def _sqrt(self, x: QUFixed) -> QUFixed:
         op = Sqrt()
@@ -241,8 +560,169 @@ class Pow2Segment(Qubrick):
         assert a.qpu is not None
         a.write(1.0)
 
-        for i in range(x.radix):
-            Mul2().compute(a, ctrl=x[i])
-            a = self._sqrt(a)
+        if self.pebbling_arity is not None:
+            chain = PebbledChain(_Pow2Step, x.radix, arity=self.pebbling_arity)
+            chain.compute(a, x)
+            a = chain.get_result_qreg()
+        else:
+            for i in range(x.radix):
+                Mul2().compute(a, ctrl=x[i])
+                a = self._sqrt(a)
 
         self.set_result_qreg(a)
+
+    def _costs(self, n, m) -> tuple:
+        """Costs for input with n qubits and result radix m.
+
+        Returns (elbows, toffs, active_volume, ancillae, garbage). Garbage
+        includes the result.
+        """
+        sqrt_elbows, sqrt_toffs, sqrt_av, sqrt_ancillae = sqrt_costs(m + 2, m)
+        if self.pebbling_arity is not None:
+            assert isinstance(n, int), "Pebbling schedule requires numeric input radix."
+            steps, live = pebbling_cost(n, self.pebbling_arity)
+            # Each step does Sqrt, copies a (m+2 CNOTs) and computes and
+            # uncomputes Mul2 (2*(m+2) controlled swaps). Each live step holds
+            # its result and copy of its input. Initial value, result and copy
+            # of input of the last step remain allocated. Peak is reached in
+            # Sqrt of a step when `live` steps are live.
+            return (
+                steps * sqrt_elbows,
+                steps * (sqrt_toffs + 2 * (m + 2)),
+                steps * (sqrt_av + 106 * (m + 2)),
+                2 * (live - 1) * (m + 2) + sqrt_ancillae - (m + 2),
+                3 * (m + 2),
+            )
+        # Initial value, and results of Sqrt and qubit of Mul2 for each
+        # iteration. Mul2 does m+2 controlled swaps.
+        return (
+            n * sqrt_elbows,
+            n * (sqrt_toffs + m + 2),
+            n * (sqrt_av + 51 * (m + 2)),
+            sqrt_ancillae - (m + 2),
+            m + 2 + n * (m + 3),
+        )
+
+    def _estimate(self, x: QUFixed):
+        m = self.result_radix
+        elbows, toffs, av, ancillae, garbage = self._costs(x.num_qubits, m)
+        ancs = self.alloc_temp_qreg(garbage, "ancs")
+        result = ancs[0 : m + 2]
+        result.radix = m
+        cost = QubrickCosts(
+            gidney_lelbows=elbows,
+            gidney_relbows=elbows,
+            toffs=toffs,
+            local_ancillae=ancillae,
+            active_volume=av,
+        )
+        self.get_qc().add_cost_event(cost)
+        self.set_result_qreg(result)
+
+
+class Pow2Fbe(Qubrick):
+    """Computes 2^x for QFixed x.
+
+    x is split into integer part I and fractional part F. 2^F is computed with
+    Pow2Segment (with `result_radix` fractional bits), and then shifted left by
+    I with a barrel shifter, controlled by bits of I.
+
+    If `signed` is set, x is signed, and it is shifted by I+2^(q-1) instead,
+    where q is the number of integer bits of x (including sign). This only
+    flips the sign bit. Radix of the result is increased by 2^(q-1) to
+    compensate. Result has 2^(q-1)+1 integer bits for signed x, and 2^q+1
+    for unsigned. Relative error of the result is about 2^-(result_radix-1).
+
+    Symbolic estimate requires numeric size and radix of input, but
+    `result_radix` can be symbolic.
+    """
+
+    def __init__(self, *, result_radix: int, signed: bool = True, pebbling_arity: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.result_radix = result_radix
+        self.signed = signed
+        self.pebbling_arity = pebbling_arity
+
+    def _offset(self, q: int) -> int:
+        return 2 ** (q - 1) if self.signed else 0
+
+    def _compute(self, x: QFixed):
+        r = x.radix
+        q = x.num_qubits - r
+        assert r >= 1 and q >= 1
+        m = self.result_radix
+
+        segment = Pow2Segment(result_radix=m, pebbling_arity=self.pebbling_arity)
+        segment.compute(QUFixed(x[0:r], radix=r))
+        result = segment.get_result_qreg() | self.alloc_temp_qreg(2**q - 1, "pad")
+
+        if self.signed:
+            x[-1].x()
+        for j in range(q):
+            # Value occupies m+2+2^j-1 lowest qubits before j-th shift.
+            ShiftLeft(2**j).compute(result[0 : m + 1 + 2 ** (j + 1)], ctrl=x[r + j])
+        if self.signed:
+            x[-1].x()
+
+        self.set_result_qreg(QUFixed(result, radix=m + self._offset(q)))
+
+    def _estimate(self, x: QFixed):
+        n, r = x.num_qubits, x.radix
+        assert isinstance(n, int) and isinstance(r, int), "Estimate requires numeric input size and radix."
+        q = n - r
+        m = self.result_radix
+        segment = Pow2Segment(result_radix=m, pebbling_arity=self.pebbling_arity)
+        elbows, toffs, av, ancillae, garbage = segment._costs(r, m)
+
+        self.alloc_temp_qreg(garbage - (m + 2), "garbage")
+        pad_size = 2**q - 1
+        result = self.alloc_temp_qreg(m + 2 + pad_size, "result")
+        result.radix = m + self._offset(q)
+
+        # j-th shift does m+1+2^j controlled swaps.
+        num_swaps = q * (m + 1) + 2**q - 1
+        cost = QubrickCosts(
+            gidney_lelbows=elbows,
+            gidney_relbows=elbows,
+            toffs=toffs + num_swaps,
+            # Padding of the result is allocated after the segment is computed.
+            local_ancillae=Max(ancillae - pad_size, 0),
+            active_volume=av + 51 * num_swaps,
+        )
+        self.get_qc().add_cost_event(cost)
+        self.set_result_qreg(result)
+
+
+class ExpFbe(Qubrick):
+    """Computes e^x for signed QFixed x, as 2^(x*log2(e)).
+
+    The product is computed with MultiplyConstAdd into a register with one
+    more integer bit and `guard_bits` more fractional bits, and then Pow2Fbe
+    is applied to it. See Pow2Fbe for the format of the result.
+    """
+
+    def __init__(self, *, result_radix: int, guard_bits: int = 3, pebbling_arity: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.result_radix = result_radix
+        self.guard_bits = guard_bits
+        self.pebbling_arity = pebbling_arity
+
+    def _pow2(self, y: QFixed):
+        op = Pow2Fbe(result_radix=self.result_radix, pebbling_arity=self.pebbling_arity)
+        op.compute(y)
+        self.set_result_qreg(op.get_result_qreg())
+
+    def _compute(self, x: QFixed):
+        g = self.guard_bits
+        y = QFixed(self.alloc_temp_qreg(x.num_qubits + 1 + g, "y"), radix=x.radix + g)
+        # x*log2(e)=(x/2^g)*(2^g*log2(e)). This way truncation errors of
+        # shift-and-add are below 2^-(x.radix+g).
+        MultiplyConstAdd(2**g * math.log2(math.e)).compute(y, QFixed(x, radix=x.radix + g))
+        self._pow2(y)
+
+    def _estimate(self, x: QFixed):
+        g = self.guard_bits
+        y = self.alloc_temp_qreg(x.num_qubits + 1 + g, "y")
+        y.radix = x.radix + g
+        MultiplyConstAdd(2**g * math.log2(math.e)).compute(y, x)
+        self._pow2(y)
@@ -1,18 +1,32 @@
+import math
+
+import numpy as np
 import pytest
 
-from psiqworkbench import QPU, QFixed, SymbolicQPU, resource_estimator
+from psiqworkbench import QPU, QFixed, QUFixed, SymbolicQPU, resource_estimator
 from psiqworkbench.resource_estimation.qre._resource_dict import ResourceDict
 from psiqworkbench.symbolics import Parameter
 
-from qmath.func.fbe import CosFbe
+from qmath.func.fbe import (
+    CosFbe,
+    ExpFbe,
+    Log2Fbe,
+    Log2FbeSegment,
+    LogFbe,
+    Pow2Fbe,
+    Pow2Segment,
+    plan_cos_fbe,
+    plan_log2_fbe,
+)
 from qmath.utils.re_utils import FILTERS_FOR_NUMERIC_RE, verify_re
 from qmath.utils.symbolic import SymbolicQFixed
+from qmath.utils.test_utils import QPUTestHelper
 
 
-def re_symbolic_CosFbe() -> ResourceDict:
-    n = Parameter("n", "Input radix")
+def re_symbolic_CosFbe(n=None, pebbling_arity=None) -> ResourceDict:
+    n = n or Parameter("n", "Input radix")
     m = Parameter("m", "Result radix")
-    op = CosFbe(result_radix=m)
+    op = CosFbe(result_radix=m, pebbling_arity=pebbling_arity)
 
     qpu = SymbolicQPU()
     qs_x = SymbolicQFixed(num_qubits=n + 2, name="x", qpu=qpu, radix=n)
@@ -20,13 +34,13 @@ def re_symbolic_CosFbe() -> ResourceDict:
     return resource_estimator(qpu).resources()
 
 
-def re_numeric_CosFbe(assgn: dict[str, int]) -> ResourceDict:
-    """Numeric resource estimation for multiplier."""
+def re_numeric_CosFbe(assgn: dict[str, int], pebbling_arity=None) -> ResourceDict:
+    """Numeric resource estimation for CosFbe."""
     n, m = assgn["n"], assgn["m"]
-    op = CosFbe(result_radix=m)
+    op = CosFbe(result_radix=m, pebbling_arity=pebbling_arity)
 
     qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
-    qpu.reset(n * m + 3 * n + m + 12)
+    qpu.reset(2 * (n + 4) * (m + 2))
     qs_x = QFixed(n + 2, name="x", qpu=qpu, radix=n)
     op.compute(qs_x)
     return resource_estimator(qpu).resources()
@@ -39,3 +53,244 @@ def test_re_CosFbe():
     re_numeric = re_numeric_CosFbe
     for n, m in [(2, 2), (3, 4), (5, 8), (10, 10), (15, 10), (10, 16)]:
         verify_re(re_symbolic, re_numeric, {"n": n, "m": m})
+
+
+@pytest.mark.re
+@pytest.mark.slow
+@pytest.mark.parametrize("pebbling_arity", [2, 3])
+def test_re_CosFbe_pebbled(pebbling_arity: int):
+    for n, m in [(5, 8), (10, 10), (16, 8)]:
+        re_symbolic = re_symbolic_CosFbe(n=n, pebbling_arity=pebbling_arity)
+        re_numeric = lambda assgn: re_numeric_CosFbe(assgn | {"n": n}, pebbling_arity=pebbling_arity)
+        verify_re(re_symbolic, re_numeric, {"m": m}, av_rtol=0.02)
+
+
+@pytest.mark.re
+@pytest.mark.slow
+def test_CosFbe_pebbling_reduces_qubits():
+    m = 16
+    for n in [8, 16, 32]:
+        default = re_numeric_CosFbe({"n": n, "m": m})
+        pebbled = re_numeric_CosFbe({"n": n, "m": m}, pebbling_arity=2)
+        # O(n*m) vs O(m*log(n)).
+        assert pebbled["qubit_highwater"] < n + 2 + (2 * n.bit_length() + 3) * (m + 2) + m + 8
+        if n >= 32:
+            assert pebbled["qubit_highwater"] < default["qubit_highwater"] / 2
+
+
+@pytest.mark.re
+def test_re_CosFbe_planned():
+    plan = plan_cos_fbe(10, 1e-4)
+    n = 10
+    op = CosFbe(plan=plan)
+    qpu = SymbolicQPU()
+    op.compute(SymbolicQFixed(num_qubits=n + 2, name="x", qpu=qpu, radix=n))
+    re_symbolic = resource_estimator(qpu).resources()
+
+    def re_numeric(assgn):
+        qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+        qpu.reset(2 * (n + 4) * (plan.radixes[-1] + 2))
+        CosFbe(plan=plan).compute(QFixed(n + 2, name="x", qpu=qpu, radix=n))
+        return resource_estimator(qpu).resources()
+
+    verify_re(re_symbolic, re_numeric, {})
+
+    # Compare with uniform result_radix giving the same precision.
+    uniform = re_numeric_CosFbe({"n": n, "m": plan.radixes[-1]})
+    assert re_numeric({})["toffs"] < uniform["toffs"]
+
+
+@pytest.mark.re
+def test_Log2FbeSegment_planned_is_cheaper():
+    plan = plan_log2_fbe(1e-4)
+    r = plan.num_iterations
+
+    def toffs_and_elbows(plan):
+        qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+        qpu.reset(2000)
+        x = QUFixed(2 + plan.radixes[0], name="x", radix=plan.radixes[0], qpu=qpu)
+        result = QUFixed(r, name="result", radix=r, qpu=qpu)
+        Log2FbeSegment(plan=plan).compute(x, result)
+        re = resource_estimator(qpu).resources()
+        return re["toffs"] + re["gidney_lelbows"]
+
+    uniform = type(plan)((plan.radixes[0],) * r)
+    # Square cost is quadratic in register size, which now decreases linearly.
+    assert toffs_and_elbows(plan) < 0.7 * toffs_and_elbows(uniform)
+
+
+def re_symbolic_Log2FbeSegment(r=None, padded_square=False) -> ResourceDict:
+    r = r or Parameter("r", "Input radix")
+    k = Parameter("k", "Number of iterations")
+    qpu = SymbolicQPU()
+    x = SymbolicQFixed(num_qubits=r + 2, name="x", qpu=qpu, radix=r)
+    result = SymbolicQFixed(num_qubits=k, name="result", qpu=qpu, radix=k)
+    Log2FbeSegment(padded_square=padded_square).compute(x, result)
+    return resource_estimator(qpu).resources()
+
+
+def re_numeric_Log2FbeSegment(assgn: dict[str, int], padded_square=False) -> ResourceDict:
+    r, k = assgn["r"], assgn["k"]
+    qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+    qpu.reset((k + 4) * (r + 10) + k)
+    x = QUFixed(r + 2, name="x", qpu=qpu, radix=r)
+    result = QUFixed(k, name="result", qpu=qpu, radix=k)
+    Log2FbeSegment(padded_square=padded_square).compute(x, result)
+    return resource_estimator(qpu).resources()
+
+
+@pytest.mark.re
+def test_re_Log2FbeSegment():
+    re_symbolic = re_symbolic_Log2FbeSegment()
+    for r, k in [(4, 3), (8, 5), (10, 10), (15, 8), (20, 6)]:
+        verify_re(re_symbolic, re_numeric_Log2FbeSegment, {"r": r, "k": k}, av_rtol=0.02, elbows_rtol=0.01)
+
+
+@pytest.mark.re
+@pytest.mark.slow
+def test_re_Log2FbeSegment_padded():
+    for r, k in [(10, 5), (16, 8), (20, 10)]:
+        re_symbolic = re_symbolic_Log2FbeSegment(r=r, padded_square=True)
+        re_numeric = lambda assgn: re_numeric_Log2FbeSegment(assgn | {"r": r}, padded_square=True)
+        verify_re(re_symbolic, re_numeric, {"k": k}, av_rtol=0.02, elbows_rtol=0.01)
+
+
+def re_symbolic_Pow2Segment(n=None, pebbling_arity=None) -> ResourceDict:
+    n = n or Parameter("n", "Input radix")
+    m = Parameter("m", "Result radix")
+    qpu = SymbolicQPU()
+    op = Pow2Segment(result_radix=m, pebbling_arity=pebbling_arity)
+    op.compute(SymbolicQFixed(num_qubits=n, name="x", qpu=qpu, radix=n))
+    return resource_estimator(qpu).resources()
+
+
+def re_numeric_Pow2Segment(assgn: dict[str, int], pebbling_arity=None) -> ResourceDict:
+    n, m = assgn["n"], assgn["m"]
+    qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+    qpu.reset(n + (n + 3) * (m + 5))
+    Pow2Segment(result_radix=m, pebbling_arity=pebbling_arity).compute(QUFixed(n, name="x", qpu=qpu, radix=n))
+    return resource_estimator(qpu).resources()
+
+
+@pytest.mark.re
+def test_re_Pow2Segment():
+    re_symbolic = re_symbolic_Pow2Segment()
+    for n, m in [(2, 4), (3, 5), (5, 8), (8, 10), (10, 15)]:
+        verify_re(re_symbolic, re_numeric_Pow2Segment, {"n": n, "m": m}, av_rtol=0.02)
+
+
+@pytest.mark.re
+@pytest.mark.slow
+@pytest.mark.parametrize("pebbling_arity", [2, 3])
+def test_re_Pow2Segment_pebbled(pebbling_arity: int):
+    for n, m in [(1, 4), (5, 8), (10, 10), (16, 9)]:
+        re_symbolic = re_symbolic_Pow2Segment(n=n, pebbling_arity=pebbling_arity)
+        re_numeric = lambda assgn: re_numeric_Pow2Segment(assgn | {"n": n}, pebbling_arity=pebbling_arity)
+        verify_re(re_symbolic, re_numeric, {"m": m}, av_rtol=0.02)
+        if n >= 16:
+            default = re_numeric_Pow2Segment({"n": n, "m": m})
+            assert re_numeric({"m": m})["qubit_highwater"] < default["qubit_highwater"]
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("n, radix", [(8, 4), (12, 6), (16, 12)])
+def test_re_Log2Fbe(n: int, radix: int):
+    m = Parameter("m", "Result radix")
+    qpu = SymbolicQPU()
+    Log2Fbe(result_radix=m).compute(SymbolicQFixed(num_qubits=n, name="x", qpu=qpu, radix=radix))
+    re_symbolic = resource_estimator(qpu).resources()
+
+    def re_numeric(assgn):
+        qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+        qpu.reset(4 * n + (assgn["m"] + 4) * (n + 8))
+        Log2Fbe(result_radix=assgn["m"]).compute(QUFixed(n, name="x", qpu=qpu, radix=radix))
+        return resource_estimator(qpu).resources()
+
+    for m_value in [4, 8, 12]:
+        verify_re(re_symbolic, re_numeric, {"m": m_value}, av_rtol=0.02, elbows_rtol=0.01)
+
+
+@pytest.mark.re
+def test_re_Log2Fbe_symbolic_input_size():
+    # Size of integer part of the result and Normalize depend on numeric input size.
+    n = Parameter("n", "Input size")
+    qpu = SymbolicQPU()
+    with pytest.raises(AssertionError, match="numeric input size"):
+        Log2Fbe(result_radix=8).compute(SymbolicQFixed(num_qubits=n, name="x", qpu=qpu, radix=4))
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("padded_square", [False, True])
+@pytest.mark.parametrize("n, radix, error", [(8, 4, 1e-3), (12, 6, 1e-4)])
+def test_re_Log2Fbe_planned(n: int, radix: int, error: float, padded_square: bool):
+    plan = plan_log2_fbe(error)
+    qpu = SymbolicQPU()
+    op = Log2Fbe(plan=plan, padded_square=padded_square)
+    op.compute(SymbolicQFixed(num_qubits=n, name="x", qpu=qpu, radix=radix))
+    re_symbolic = resource_estimator(qpu).resources()
+
+    def re_numeric(assgn):
+        qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+        qpu.reset(4 * n + (plan.radixes[0] + 10) * (plan.num_iterations + 4))
+        Log2Fbe(plan=plan, padded_square=padded_square).compute(QUFixed(n, name="x", qpu=qpu, radix=radix))
+        return resource_estimator(qpu).resources()
+
+    verify_re(re_symbolic, re_numeric, {}, av_rtol=0.02, elbows_rtol=0.01)
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("base", [2.0, math.e])
+def test_re_LogFbe(base: float):
+    n, radix, m = 10, 5, 8
+    qpu = SymbolicQPU()
+    LogFbe(base, result_radix=m).compute(SymbolicQFixed(num_qubits=n, name="x", qpu=qpu, radix=radix))
+    re_symbolic = resource_estimator(qpu).resources()
+
+    def re_numeric(assgn):
+        qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+        qpu.reset(4 * n + (m + 4) * (n + 8))
+        LogFbe(base, result_radix=m).compute(QUFixed(n, name="x", qpu=qpu, radix=radix))
+        return resource_estimator(qpu).resources()
+
+    verify_re(re_symbolic, re_numeric, {}, av_rtol=0.05, elbows_rtol=0.01)
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("op_class", [Pow2Fbe, ExpFbe])
+@pytest.mark.parametrize("n, radix", [(6, 3), (8, 5), (10, 6)])
+@pytest.mark.parametrize("pebbling_arity", [None, 2])
+def test_re_Pow2Fbe_and_ExpFbe(op_class, n: int, radix: int, pebbling_arity):
+    m = Parameter("m", "Result radix")
+    qpu = SymbolicQPU()
+    op = op_class(result_radix=m, pebbling_arity=pebbling_arity)
+    op.compute(SymbolicQFixed(num_qubits=n, name="x", qpu=qpu, radix=radix))
+    re_symbolic = resource_estimator(qpu).resources()
+
+    def re_numeric(assgn):
+        qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+        qpu.reset(2 * (n + 4) * (assgn["m"] + 8) + 2**n)
+        op = op_class(result_radix=assgn["m"], pebbling_arity=pebbling_arity)
+        op.compute(QFixed(n, name="x", qpu=qpu, radix=radix))
+        return resource_estimator(qpu).resources()
+
+    for m_value in [8, 11, 16]:
+        verify_re(re_symbolic, re_numeric, {"m": m_value}, av_rtol=0.05, elbows_rtol=0.02)
+
+
+def _max_error(make_op, f, xs, *, n: int, radix: int) -> float:
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=1000, qubits_per_reg=n, radix=radix)
+    op = make_op()
+    op.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(op.get_result_qreg())
+    return max(abs(qpu_helper.apply_op([x]) - f(x)) for x in xs)
+
+
+@pytest.mark.slow
+def test_Pow2Fbe_max_error():
+    # Evaluate 2^x on [-8, 8) with absolute error 1e-3.
+    n, radix, error = 12, 8, 1e-3
+    f = lambda x: 2**x
+    xs = np.linspace(-8, 7.875, 13)
+    # Relative error of Pow2Fbe is 2^-(result_radix-1), and 2^x<2^8.
+    result_radix = math.ceil(math.log2(2**8 / error)) + 2
+    assert _max_error(lambda: Pow2Fbe(result_radix=result_radix), f, xs, n=n, radix=radix) < error
@@ -3,7 +3,7 @@ import pytest
 from psiqworkbench import QPU, QFixed, QUFixed
 from psiqworkbench.filter_presets import BIT_DEFAULT
 
-from qmath.func.fbe import CosFbe, Log2Fbe, SinFbe, Pow2Segment
+from qmath.func.fbe import CosFbe, ExpFbe, Log2Fbe, Pow2Fbe, SinFbe, Pow2Segment, plan_cos_fbe, plan_log2_fbe
 from qmath.utils.test_utils import QPUTestHelper
 
 
@@ -32,6 +32,19 @@ def test_cos():
         assert abs(result - expected) < 1e-4
 
 
+@pytest.mark.parametrize("pebbling_arity", [2, 3])
+def test_cos_pebbled(pebbling_arity: int):
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=500, qubits_per_reg=7, radix=5)
+    qs_x = qpu_helper.inputs[0]
+    op = CosFbe(result_radix=28, pebbling_arity=pebbling_arity)
+    op.compute(qs_x)
+    qpu_helper.record_op(op.get_result_qreg())
+
+    for x in np.linspace(-1, 1, 2**6 + 1):
+        result = qpu_helper.apply_op([x])
+        assert abs(result - np.cos(np.pi * x)) < 1e-4
+
+
 def test_sin():
     qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=500, qubits_per_reg=7, radix=5)
     qs_x = qpu_helper.inputs[0]
@@ -71,3 +84,104 @@ def test_pow2_segment():
     op.compute(qs_x)
     result = op.get_result_qreg().read()
     assert abs(result - 2**0.625) < 1e-3
+
+
+def test_pow2_segment_pebbled():
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(300)
+    qs_x = QUFixed(5, name="x", radix=5, qpu=qpu)
+    qs_x.write(0.40625)
+    op = Pow2Segment(result_radix=22, pebbling_arity=2)
+    op.compute(qs_x)
+    result = op.get_result_qreg().read()
+    assert abs(result - 2**0.40625) < 1e-3
+
+
+def test_plan_cos_fbe():
+    plan = plan_cos_fbe(5, 1e-3)
+    assert plan.num_iterations == 5
+    assert list(plan.radixes) == sorted(plan.radixes)
+    assert all(r % 2 == 0 for r in plan.radixes)
+    # Low input bits are ignored if they don't affect result.
+    assert plan_cos_fbe(30, 1e-3).num_iterations == 13
+
+
+def test_plan_log2_fbe():
+    plan = plan_log2_fbe(1e-3)
+    assert plan.num_iterations == 11
+    assert plan.radixes == tuple(range(17, 6, -1))
+
+
+@pytest.mark.parametrize("error", [1e-2, 1e-3])
+def test_cos_planned(error: float):
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=500, qubits_per_reg=7, radix=5)
+    qs_x = qpu_helper.inputs[0]
+    op = CosFbe(plan=plan_cos_fbe(5, error))
+    op.compute(qs_x)
+    qpu_helper.record_op(op.get_result_qreg())
+
+    for x in np.linspace(-1, 1, 2**6 + 1):
+        result = qpu_helper.apply_op([x])
+        assert abs(result - np.cos(np.pi * x)) < error
+
+
+def test_sin_planned_ignores_low_bits():
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=500, qubits_per_reg=12, radix=10)
+    qs_x = qpu_helper.inputs[0]
+    plan = plan_cos_fbe(10, 3e-2)
+    assert plan.num_iterations == 8
+    op = SinFbe(plan=plan)
+    op.compute(qs_x)
+    qpu_helper.record_op(op.get_result_qreg())
+
+    for x in np.linspace(-1, 1, 2**8 + 1):
+        result = qpu_helper.apply_op([x])
+        assert abs(result - np.sin(np.pi * x)) < 3e-2
+
+
+@pytest.mark.slow
+def test_log2_planned():
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=1000, qubits_per_reg=30, radix=24)
+    qs_x = qpu_helper.inputs[0]
+    op = Log2Fbe(plan=plan_log2_fbe(2e-3))
+    op.compute(qs_x)
+    qpu_helper.record_op(op.get_result_qreg())
+
+    x_range = list(np.linspace(1, 2, 21)) + [1e-5, 1e-3, 0.5, 3, 4, 10, 20]
+    for x in x_range:
+        result = qpu_helper.apply_op([x])
+        assert abs(result - np.log2(x)) < 2e-3
+
+
+def test_pow2():
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=300, qubits_per_reg=8, radix=5)
+    op = Pow2Fbe(result_radix=14)
+    op.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(op.get_result_qreg())
+
+    for x in np.linspace(-4, 3.875, 22):
+        result = qpu_helper.apply_op([x])
+        assert abs(result - 2**x) < 2**x * 2**-12
+
+
+def test_pow2_unsigned():
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(200)
+    qs_x = QUFixed(6, name="x", radix=3, qpu=qpu)
+    qs_x.write(5.625)
+    op = Pow2Fbe(result_radix=12, signed=False)
+    op.compute(qs_x)
+    result = op.get_result_qreg().read()
+    assert abs(result - 2**5.625) < 2**5.625 * 2**-10
+
+
+@pytest.mark.slow
+def test_exp():
+    qpu_helper = QPUTestHelper(num_inputs=1, num_qubits=500, qubits_per_reg=10, radix=6)
+    op = ExpFbe(result_radix=14, guard_bits=4)
+    op.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(op.get_result_qreg())
+
+    for x in np.linspace(-7.5, 7.5, 11):
+        result = qpu_helper.apply_op([x])
+        assert abs(result - np.exp(x)) < 5e-3 * np.exp(x)
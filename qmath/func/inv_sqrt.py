@@ -2,11 +2,13 @@ import psiqworkbench.qubricks as qbk
 from psiqworkbench import QFixed, QInt, QUInt, Qubits
 from psiqworkbench.qubricks import Qubrick
 from psiqworkbench.qubits.base_qubits import BaseQubits
+from psiqworkbench.symbolics.parameter import Max
 from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
 
-from .square import Square
+from .square import Square, SquareOptimized
 from .common import Subtract, MultiplyAdd
-from ..utils.symbolic import alloc_temp_qreg_like
+from ..utils.pebbling import PebbledChain
+from ..utils.symbolic import SymbolicQFixed, alloc_temp_qreg_like
 from .bits import HighestSetBit
 
 
@@ -48,21 +50,124 @@ class _NewtonIteration(Qubrick):
     """Computes x1 := x0*(1.5-a*x0^2).
 
     Here a is half of argument to inverse square root.
+    If `guard_bits` is set, uses truncated multiplication (see TruncatedMultiplyAdd).
+    If `optimized_square` is set, uses padded SquareOptimized instead of Square.
+    If `uncompute_temporaries` is set, temporary registers are returned to
+    zero and released, at the cost of computing c-a*x0^2 twice.
     """
 
+    def __init__(
+        self,
+        *,
+        guard_bits: int | None = None,
+        optimized_square: bool = False,
+        uncompute_temporaries: bool = False,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.guard_bits = guard_bits
+        self.optimized_square = optimized_square
+        self.uncompute_temporaries = uncompute_temporaries
+
+    def _correction(self, x0: QFixed, a: QFixed, t1: QFixed, t2: QFixed, t3: QFixed, c: float):
+        g = self.guard_bits
+        if self.optimized_square:
+            SquareOptimized(padding="auto").compute(x0, t1)  # t1 := x0^2.
+        else:
+            Square(guard_bits=g).compute(x0, t1)  # t1 := x0^2.
+        MultiplyAdd(guard_bits=g).compute(t2, t1, a)  # t2 := a*x0^2.
+        t3.write(c)
+        Subtract().compute(t3, t2)  # t3 := c - a*x0^2
+
     def _compute(self, x0: QFixed, x1: QFixed, a: QFixed, c=1.5):
+        g = self.guard_bits
+        if self.uncompute_temporaries:
+            t3_raw, t3 = alloc_temp_qreg_like(self, x0, name="t3")
+            with _NewtonCorrection(self).computed(x0, a, t3, c):
+                MultiplyAdd(guard_bits=g).compute(x1, x0, t3)  # x1 := x0*(c-a*x0^2).
+            t3_raw.release()
+            return
         _, t1 = alloc_temp_qreg_like(self, x0, name="t1")
         _, t2 = alloc_temp_qreg_like(self, x0, name="t2")
         _, t3 = alloc_temp_qreg_like(self, x0, name="t3")
-        Square().compute(x0, t1)  # t1 := x0^2.
-        MultiplyAdd().compute(t2, t1, a)  # t2 := a*x0^2.
-        t3.write(c)
-        Subtract().compute(t3, t2)  # t3 := c - a*x0^2
-        MultiplyAdd().compute(x1, x0, t3)  # x1 := x0*(c-a*x0^2).
+        self._correction(x0, a, t1, t2, t3, c)
+        MultiplyAdd(guard_bits=g).compute(x1, x0, t3)  # x1 := x0*(c-a*x0^2).
+
+    def _has_closed_form_estimate(self) -> bool:
+        return self.guard_bits is None and not self.optimized_square and not self.uncompute_temporaries
+
+    def _estimate(self, x0: SymbolicQFixed, x1: SymbolicQFixed, a: SymbolicQFixed, c=1.5):
+        if not self._has_closed_form_estimate():
+            self._compute(x0, x1, a, c=c)
+            return
+        n, r, ra = x0.num_qubits, x0.radix, a.radix
+        assert a.num_qubits == n and x1.num_qubits == n
+        assert x1.radix == r
+        self.alloc_temp_qreg(3 * n, "t")
+        cost = QubrickCosts(
+            gidney_lelbows=_newton_elbows(n, r, ra),
+            gidney_relbows=_newton_elbows(n, r, ra),
+            toffs=_newton_toffs(n, r, ra),
+            local_ancillae=Max(2 * n + 2 * r + 1, n + 2 * ra + 1),
+            active_volume=_newton_active_volume(n, r, ra),
+        )
+        self.get_qc().add_cost_event(cost)
+
+
+# Costs of _NewtonIteration, where x0 has n qubits and radix r, a has radix ra.
+# Sum of costs of 3 MultiplyAdds (with radixes r, ra, r), Negate, Add and 2n CNOTs.
+# These are correct when n>=4, 0<r<n, 0<ra<n.
+def _newton_elbows(n, r, ra):
+    return (n + r) ** 2 + 0.5 * (n + ra) ** 2 + 24.5 * n - r - 0.5 * ra - 51
+
+
+def _newton_toffs(n, r, ra):
+    return (n + r) ** 2 + 0.5 * (n + ra) ** 2 + 25.5 * n + r + 0.5 * ra - 24
+
+
+def _newton_active_volume(n, r, ra):
+    av = 177 * n**2 + 118 * n * (2 * r + ra) + 108 * r**2 + 54 * ra**2
+    return av + 2722 * n - 46 * r - 23 * ra - 3711
+
+
+class _NewtonCorrection(Qubrick):
+    """Computes t3 := c - a*x0^2, using temporary registers t1, t2."""
+
+    def __init__(self, newton: _NewtonIteration, **kwargs):
+        super().__init__(**kwargs)
+        self.newton = newton
+
+    def _compute(self, x0: QFixed, a: QFixed, t3: QFixed, c: float):
+        _, t1 = alloc_temp_qreg_like(self, x0, name="t1")
+        _, t2 = alloc_temp_qreg_like(self, x0, name="t2")
+        self.newton._correction(x0, a, t1, t2, t3, c)
+
+
+class _NewtonStep(Qubrick):
+    """Allocates x1 and computes x1 := x0*(c-a*x0^2).
+
+    If `radix` is set, the iteration is done with this many fractional bits:
+    x0 is padded with zeros and low bits of a are ignored.
+    """
+
+    def __init__(self, newton_kwargs: dict, c: float, radix: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.newton_kwargs = newton_kwargs
+        self.c = c
+        self.radix = radix
+
+    def _compute(self, x0: QFixed, a: QFixed):
+        if self.radix is not None:
+            if self.radix > x0.radix:
+                pad = self.alloc_temp_qreg(self.radix - x0.radix, "pad")
+                x0 = QFixed(pad | x0, radix=self.radix)
+            drop = a.radix - 1 - self.radix
+            a = QFixed(a[drop:], radix=a.radix - drop)
+        _, x1 = alloc_temp_qreg_like(self, x0, name="x")
+        _NewtonIteration(**self.newton_kwargs).compute(x0, x1, a, c=self.c)
+        self.set_result_qreg(x1)
 
 
-# TODO: simplify RE for qubit_highwater using rewriters.
-# See https://github.com/PsiQ/bartiq/blob/main/docs/tutorials/2025_ieee_qw/04_rewriters.ipynb
 class InverseSquareRoot(Qubrick):
     """Evaluates function f(a)=a^-0.5.
 
@@ -78,23 +183,113 @@ class InverseSquareRoot(Qubrick):
         * First iteration's constant C is taken 1.615 regardless of a.
 
     See https://github.com/fedimser/qmath/blob/main/notebooks/classic/inv_sqrt.ipynb
+
+    If `guard_bits` is set, Newton iterations use truncated multiplication
+    (see TruncatedMultiplyAdd). If `optimized_square` is set, they use padded
+    SquareOptimized instead of Square.
+
+    If `precision` is set, the last iteration and the result use this many
+    fractional bits (at most radix of a). Since every iteration roughly doubles
+    the number of correct bits, earlier iterations are done on narrower
+    registers, with about (f+m)/2+2 fractional bits, where f is the number of
+    fractional bits of the next iteration and m is the number of integer bits.
+
+    By default, all iterates and temporary registers are kept. To reduce the
+    number of qubits:
+        * `uncompute_temporaries` - uncompute temporaries after each iteration.
+        * `pebbling_arity` - uncompute intermediate iterates using PebbledChain
+          with this arity. Smaller arity means fewer live iterates, but more
+          recomputation.
     """
 
     def __init__(
         self,
         *,
         num_iterations=3,
+        guard_bits: int | None = None,
+        optimized_square: bool = False,
+        uncompute_temporaries: bool = False,
+        pebbling_arity: int | None = None,
+        precision: int | None = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
         self.num_iterations = num_iterations
+        self.precision = precision
+        self.newton_kwargs = dict(
+            guard_bits=guard_bits,
+            optimized_square=optimized_square,
+            uncompute_temporaries=uncompute_temporaries,
+        )
+        self.pebbling_arity = pebbling_arity
+
+    def _radixes(self, a: QFixed) -> list[int] | None:
+        # Numbers of fractional bits of iterates x_0, ..., x_n.
+        if self.precision is None:
+            return None
+        n, m = self.num_iterations, a.num_qubits - a.radix
+        assert isinstance(m, int), "Precision schedule requires numeric register sizes."
+        assert 0 < self.precision <= a.radix
+        radixes = [self.precision]
+        for _ in range(n):
+            radixes.append(min(radixes[-1], (radixes[-1] + m + 1) // 2 + 2))
+        return radixes[::-1]
+
+    def _make_step(self, i: int) -> _NewtonStep:
+        radix = None if self.radixes is None else self.radixes[i + 1]
+        return _NewtonStep(self.newton_kwargs, c=1.615 if i == 0 else 1.5, radix=radix)
 
     def _compute(self, a: QFixed):
         n = self.num_iterations
+        self.radixes = self._radixes(a)
+        if self.pebbling_arity is not None or self.radixes is not None:
+            if self.radixes is None:
+                _, x0 = alloc_temp_qreg_like(self, a, name="x_0")
+            else:
+                drop = a.radix - self.radixes[0]
+                x0 = QFixed(self.alloc_temp_qreg(a.num_qubits - drop, "x_0"), radix=self.radixes[0])
+            _InitialGuess().compute(a, x0)
+            a.radix = a.radix + 1  # a := a/2.
+            if self.pebbling_arity is None:
+                for i in range(n):
+                    step = self._make_step(i)
+                    step.compute(x0, a)
+                    x0 = step.get_result_qreg()
+                self.set_result_qreg(x0)
+            else:
+                chain = PebbledChain(self._make_step, n, arity=self.pebbling_arity)
+                chain.compute(x0, a)
+                self.set_result_qreg(chain.get_result_qreg())
+            return
+
         x = [alloc_temp_qreg_like(self, a, name=f"x_{i}")[1] for i in range(n + 1)]
         _InitialGuess().compute(a, x[0])
         a.radix = a.radix + 1  # a := a/2.
         for i in range(1, n + 1):
             c = 1.615 if i == 1 else 1.5
-            _NewtonIteration().compute(x[i - 1], x[i], a, c=c)
+            _NewtonIteration(**self.newton_kwargs).compute(x[i - 1], x[i], a, c=c)
         self.set_result_qreg(x[n])
+
+    def _estimate(self, a: SymbolicQFixed):
+        newton = _NewtonIteration(**self.newton_kwargs)
+        if self.pebbling_arity is not None or self.precision is not None or not newton._has_closed_form_estimate():
+            self._compute(a)
+            return
+        # Closed-form estimate for default configuration, equal to the sum of
+        # estimates of _InitialGuess and _NewtonIteration, but with compact
+        # expression for qubit high-water.
+        k = self.num_iterations
+        n, r = a.num_qubits, a.radix
+        x = [alloc_temp_qreg_like(self, a, name=f"x_{i}")[1] for i in range(k + 1)]
+        a.radix = a.radix + 1  # a := a/2.
+        # Garbage: flag and r from _InitialGuess, t1, t2, t3 from each iteration.
+        self.alloc_temp_qreg((3 * k + 1) * n + 1, "garbage")
+        cost = QubrickCosts(
+            gidney_lelbows=n + k * _newton_elbows(n, r, r + 1),
+            gidney_relbows=n + k * _newton_elbows(n, r, r + 1),
+            toffs=k * _newton_toffs(n, r, r + 1),
+            local_ancillae=2 * n + 2 * r + 1,
+            active_volume=52 * n + k * _newton_active_volume(n, r, r + 1),
+        )
+        self.get_qc().add_cost_event(cost)
+        self.set_result_qreg(x[k])
@@ -18,13 +18,13 @@ def test_re_newton_iteration():
     op = _NewtonIteration()
     re_symbolic = re_symbolic_fixed_point(op, n_inputs=3)
     re_numeric = lambda assgn: re_numeric_fixed_point(op, assgn, n_inputs=3)
-    for n, radix in [(10, 5)]:
+    for n, radix in [(10, 5), (10, 8), (16, 4), (20, 12)]:
         verify_re(re_symbolic, re_numeric, {"n": n, "radix": radix}, av_rtol=0.001)
 
 
 @pytest.mark.re
 @pytest.mark.slow
-@pytest.mark.parametrize("num_iterations", [1, 2])
+@pytest.mark.parametrize("num_iterations", [1, 2, 3, 4])
 def test_re_inv_sqrt(num_iterations: int):
     op = InverseSquareRoot(num_iterations=num_iterations)
     re_symbolic = re_symbolic_fixed_point(op, n_inputs=1)
@@ -32,3 +32,10 @@ def test_re_inv_sqrt(num_iterations: int):
     test_cases = [(6, 2), (6, 3), (6, 4), (10, 3), (10, 5), (10, 8), (20, 7), (20, 12)]
     for n, radix in test_cases:
         verify_re(re_symbolic, re_numeric, {"n": n, "radix": radix}, av_rtol=0.001)
+
+
+@pytest.mark.re
+def test_re_inv_sqrt_closed_form():
+    re = re_symbolic_fixed_point(InverseSquareRoot(num_iterations=3))
+    assert "Max" not in str(re["qubit_highwater"])
+    assert re.evaluate({"n": 20, "radix": 15})["qubit_highwater"] == 17 * 20 + 2 * 15 + 2
@@ -3,7 +3,7 @@ from math import floor, log2
 
 import numpy as np
 import pytest
-from psiqworkbench import QFixed
+from psiqworkbench import QPU, QFixed
 
 from qmath.func.inv_sqrt import InverseSquareRoot, _InitialGuess, _NewtonIteration
 from qmath.utils.test_utils import QPUTestHelper
@@ -22,6 +22,32 @@ def test_newton_iteration():
         assert np.isclose(result, expected)
 
 
+def test_newton_iteration_truncated():
+    qpu_helper = QPUTestHelper(num_qubits=200, qubits_per_reg=15, radix=9, num_inputs=2)
+    q_a, q_x0 = qpu_helper.inputs
+    q_x1 = QFixed(15, name="x1", radix=9, qpu=qpu_helper.qpu)
+    _NewtonIteration(guard_bits=3).compute(q_x0, q_x1, q_a)
+    qpu_helper.record_op(q_x1)
+
+    for x0, a in [(-1.25, -5), (0.5, 6.125), (1, 2)]:
+        result = qpu_helper.apply_op([a, x0])
+        expected = x0 * (1.5 - a * x0**2)
+        assert abs(result - expected) < 0.05
+
+
+def test_newton_iteration_uncompute_temporaries():
+    qpu_helper = QPUTestHelper(num_qubits=150, qubits_per_reg=15, radix=9, num_inputs=2)
+    q_a, q_x0 = qpu_helper.inputs
+    q_x1 = QFixed(15, name="x1", radix=9, qpu=qpu_helper.qpu)
+    _NewtonIteration(uncompute_temporaries=True).compute(q_x0, q_x1, q_a)
+    qpu_helper.record_op(q_x1)
+
+    for x0, a in [(-1.25, -5), (0.5, 6.125), (1, 2)]:
+        result = qpu_helper.apply_op([a, x0])
+        expected = x0 * (1.5 - a * x0**2)
+        assert np.isclose(result, expected)
+
+
 def test_initial_guess():
     qpu_helper = QPUTestHelper(num_qubits=100, qubits_per_reg=30, radix=20, num_inputs=1)
     q_a = qpu_helper.inputs[0]
@@ -48,3 +74,100 @@ def test_inverse_square_root_low_precision():
         result = qpu_helper.apply_op([a])
         expected = a**-0.5
         assert np.abs(result - expected) < 1e-3
+
+
+@pytest.mark.slow
+def test_inverse_square_root_optimized_square():
+    qpu_helper = QPUTestHelper(num_qubits=400, qubits_per_reg=15, radix=11)
+    func = InverseSquareRoot(num_iterations=3, optimized_square=True)
+    func.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(func.get_result_qreg())
+
+    for a in np.linspace(0.25, 5, 20):
+        result = qpu_helper.apply_op([a])
+        assert np.abs(result - a**-0.5) < 1e-3
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "kwargs",
+    [dict(uncompute_temporaries=True), dict(pebbling_arity=2), dict(uncompute_temporaries=True, pebbling_arity=2)],
+)
+def test_inverse_square_root_reclaimed(kwargs):
+    qpu_helper = QPUTestHelper(num_qubits=400, qubits_per_reg=15, radix=11)
+    func = InverseSquareRoot(num_iterations=3, **kwargs)
+    func.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(func.get_result_qreg())
+
+    for a in np.linspace(0.25, 5, 20):
+        result = qpu_helper.apply_op([a])
+        assert np.abs(result - a**-0.5) < 1e-3
+
+
+def _inv_sqrt_metrics(**kwargs) -> dict:
+    # Same configuration as InvSquareRoot(iter=3) benchmark.
+    qpu = QPU(filters=[">>witness>>"])
+    qpu.reset(1000)
+    qs_a = QFixed(20, name="a", radix=15, qpu=qpu)
+    InverseSquareRoot(**kwargs).compute(qs_a)
+    return qpu.metrics()
+
+
+@pytest.mark.slow
+def test_inverse_square_root_space_time_trade_off():
+    configs = [
+        dict(),
+        dict(uncompute_temporaries=True),
+        dict(uncompute_temporaries=True, pebbling_arity=2),
+        dict(num_iterations=5),
+        dict(num_iterations=5, uncompute_temporaries=True),
+        dict(num_iterations=5, uncompute_temporaries=True, pebbling_arity=2),
+    ]
+    results = []
+    for config in configs:
+        metrics = _inv_sqrt_metrics(**config)
+        results.append((metrics["qubit_highwater"], metrics["toffoli_count"]))
+
+    # Baseline matches the benchmark.
+    assert results[0] == (372, 14033)
+    # Each reclaiming step reduces qubits and increases Toffoli count.
+    for (q1, t1), (q2, t2) in zip(results[0:2], results[1:3]):
+        assert q2 < q1 and t2 > t1
+    for (q1, t1), (q2, t2) in zip(results[3:5], results[4:6]):
+        assert q2 < q1 and t2 > t1
+
+
+def test_precision_schedule():
+    qpu = QPU()
+    qpu.reset(40)
+    a = QFixed(40, name="a", radix=30, qpu=qpu)
+    assert InverseSquareRoot(num_iterations=4, precision=30)._radixes(a) == [15, 16, 18, 22, 30]
+    assert InverseSquareRoot(num_iterations=5, precision=26)._radixes(a) == [15, 15, 16, 17, 20, 26]
+    assert InverseSquareRoot(num_iterations=3)._radixes(a) is None
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("precision, pebbling_arity", [(11, None), (11, 2), (9, None)])
+def test_inverse_square_root_precision_doubling(precision: int, pebbling_arity: int | None):
+    qpu_helper = QPUTestHelper(num_qubits=400, qubits_per_reg=15, radix=11)
+    func = InverseSquareRoot(num_iterations=3, precision=precision, pebbling_arity=pebbling_arity)
+    func.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(func.get_result_qreg())
+
+    for a in np.linspace(0.25, 5, 20):
+        result = qpu_helper.apply_op([a])
+        assert np.abs(result - a**-0.5) < 1e-3 + 2 ** (-precision + 1)
+
+
+@pytest.mark.slow
+def test_inverse_square_root_precision_doubling_cost():
+    def toffoli_count(**kwargs) -> int:
+        qpu = QPU(filters=[">>witness>>"])
+        qpu.reset(2000)
+        qs_a = QFixed(40, name="a", radix=30, qpu=qpu)
+        InverseSquareRoot(num_iterations=4, **kwargs).compute(qs_a)
+        return qpu.metrics()["toffoli_count"]
+
+    full, doubling = toffoli_count(), toffoli_count(precision=30)
+    # Iterations have widths 26, 28, 32, 40 instead of 40, so multiplier cost drops by ~1/3.
+    assert doubling < 0.75 * full
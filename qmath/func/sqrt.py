@@ -58,18 +58,30 @@ class Sqrt(Qubrick):
         self.set_result_qreg(QUFixed(left_pad | ans | right_pad, radix=x.radix))
 
     def _estimate(self, x: SymbolicQFixed):
-        # Number of extra padding qubits added before calling Sqrt.
-        r = (x.radix + int(self.half_arg)) % 2
-
-        # Size of input to Sqrt.
-        n = x.num_qubits + r
-
-        num_elbows = 0.25 * n**2 + 0.5 * (3 + n % 2) * n - 4 + 1.75 * (n % 2)
+        elbows, toffs, av, ancillae = sqrt_costs(x.num_qubits, x.radix, half_arg=self.half_arg)
         cost = QubrickCosts(
-            gidney_lelbows=num_elbows,
-            gidney_relbows=num_elbows,
-            toffs=n + 1 + (n % 2),
-            local_ancillae=2 * n + 1 + 3 * (n % 2) + r,
-            active_volume=18.75 * n**2 + (151.5 + 37.5 * (n % 2)) * n + 170.25 * (n % 2) - 225,
+            gidney_lelbows=elbows,
+            gidney_relbows=elbows,
+            toffs=toffs,
+            local_ancillae=ancillae,
+            active_volume=av,
         )
         self.get_qc().add_cost_event(cost)
+
+
+def sqrt_costs(num_qubits, radix, *, half_arg: bool = False) -> tuple:
+    """Costs of Sqrt for input with given size and radix.
+
+    Ancillae include the qubits of the result.
+    Returns (elbows, toffs, active_volume, ancillae).
+    """
+    # Number of extra padding qubits added before calling Sqrt.
+    r = (radix + int(half_arg)) % 2
+
+    # Size of input to Sqrt.
+    n = num_qubits + r
+
+    elbows = 0.25 * n**2 + 0.5 * (3 + n % 2) * n - 4 + 1.75 * (n % 2)
+    toffs = n + 1 + (n % 2)
+    av = 18.75 * n**2 + (151.5 + 37.5 * (n % 2)) * n + 170.25 * (n % 2) - 225
+    return elbows, toffs, av, 2 * n + 1 + 3 * (n % 2) + r
@@ -1,20 +1,32 @@
+import math
+
 import psiqworkbench.qubricks as qbk
 from psiqworkbench import QFixed, Qubits, QUFixed
 from psiqworkbench.qubricks import Qubrick
+from psiqworkbench.symbolics.parameter import Max
 from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
 
 from ..func.common import AbsInPlace, MultiplyAdd
+from ..uint_arith.add.costs import adder_costs
+from ..uint_arith.add.policy import get_adder_policy
 from ..utils.gates import ParallelCnot
 from ..utils.symbolic import SymbolicQFixed, alloc_temp_qreg_like
 
 
 class Square(Qubrick):
-    """Computes square of given QFixed register by making a copy and calling MultiplyAdd."""
+    """Computes square of given QFixed register by making a copy and calling MultiplyAdd.
+
+    If `guard_bits` is set, uses truncated multiplication (see TruncatedMultiplyAdd).
+    """
+
+    def __init__(self, *, guard_bits: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.guard_bits = guard_bits
 
     def _compute(self, x: QFixed, target: QFixed):
         x_copy_reg, x_copy = alloc_temp_qreg_like(self, x)
         with ParallelCnot().computed(x, x_copy):
-            MultiplyAdd().compute(target, x, x_copy)
+            MultiplyAdd(guard_bits=self.guard_bits).compute(target, x, x_copy)
         x_copy_reg.release()
 
 
@@ -35,36 +47,42 @@ class SquareOptimized(Qubrick):
 
     Uses algorithm from Lemma 6 in https://arxiv.org/pdf/2105.12767.
 
-    This algorithm uses 2x less resources but requires ~1 extra qubit to achieve
-    the same precision as square via multiplication. This is because it doesn't
-    add padding qubits so result.radix=x.radix*2, like the multiplication does.
+    This algorithm uses ~3x less Toffolis than Square. Without padding, low
+    bits of partial products are dropped without rounding, so the error can
+    be several units of the last place of result.
 
-    TODO: achieve the same precision as Square by padding with
-    log2(lhs.radix+rhs.radix-dst.radix) qubits.
-    While this precision issue is not fixed, it's recommedned to use Square instead.
+    With `padding="auto"`, result is extended with ceil(log2(2*x.radix-target.radix))
+    less significant qubits, which gives the same precision as Square (error
+    below ~1.3 units of the last place). These qubits are left as garbage.
+    `padding` can also be set to explicit number of qubits.
     """
 
-    def __init__(self, *, signed=True, **kwargs):
+    def __init__(self, *, signed=True, padding: int | str = 0, **kwargs):
         super().__init__(**kwargs)
+        assert padding == "auto" or padding >= 0
         self.signed = signed
+        self.padding = padding
+
+    def _num_padding_qubits(self, x: QFixed, target: QFixed) -> int:
+        if self.padding != "auto":
+            return self.padding
+        dropped = 2 * x.radix - target.radix
+        assert isinstance(dropped, int), "Symbolic estimate requires explicit padding."
+        return math.ceil(math.log2(dropped)) if dropped > 1 else 0
 
     def _compute_unsigned(self, x: QUFixed, target: QUFixed):
         """Computes square assuming x is unsigned."""
         anc: Qubits = self.alloc_temp_qreg(target.num_qubits, "anc")
-        for i in range(x.num_qubits - 1):
-            j = 2 * (i - x.radix) + target.radix  # Where in target to write x[i]^2.
-            if j >= target.num_qubits:
-                break
-            skip = 0
-            if j < 0:
-                skip = -j
-                j = 0
-
+        for i, j, skip in _square_iterations(x.num_qubits, x.radix, target.num_qubits, target.radix):
             with _SquareIteration().computed(x, anc, i, j, skip):
-                qbk.GidneyAdd().compute(target[j:], anc[j:])
+                get_adder_policy().add(target[j:], anc[j:])
         anc.release()
 
     def _compute(self, x: QFixed, target: QFixed):
+        p = self._num_padding_qubits(x, target)
+        if p > 0:
+            target_cls = QFixed if self.signed else QUFixed
+            target = target_cls(self.alloc_temp_qreg(p, "pad") | target, radix=target.radix + p)
         if self.signed:
             with AbsInPlace().computed(x):
                 x_unsigned = QUFixed(x[0 : x.num_qubits - 1], radix=x.radix)
@@ -79,12 +97,94 @@ class SquareOptimized(Qubrick):
         assert target.num_qubits == n
         assert target.radix == r
 
-        num_elbows = -3 + 0.5 * n - r + 0.5 * n**2 + n * r - 0.5 * r**2
+        p = self._num_padding_qubits(x, target)
+        if p != 0:
+            self.alloc_temp_qreg(p, "pad")
+        elbows, toffs, av, ancillae = square_optimized_costs(n, r, p, signed=self.signed)
+        if isinstance(n, int) and isinstance(r, int):
+            # The formula above is fitted for GidneyAdd, so replace costs of
+            # additions for which adder policy chooses another adder.
+            policy, s, base_ancillae = get_adder_policy(), int(self.signed), ancillae
+            for _, j, _ in _square_iterations(n - s, r, n + p - s, r + p):
+                size = n + p - s - j
+                adder = policy.choose(size)
+                if not isinstance(adder, qbk.GidneyAdd):
+                    cost, default_cost = adder_costs(adder, size), adder_costs(policy.default, size)
+                    elbows += cost.elbows - default_cost.elbows
+                    toffs += cost.toffs - default_cost.toffs
+                    av += cost.active_volume - default_cost.active_volume
+                    ancillae = Max(ancillae, base_ancillae + cost.ancillae - default_cost.ancillae)
         cost = QubrickCosts(
-            gidney_lelbows=num_elbows,
-            gidney_relbows=num_elbows,
-            toffs=2 * n - 2,
-            local_ancillae=2 * n - 2,
-            active_volume=-248.5 + 120.4 * n - 76.5 * r + 30.3 * n**2 + 60.5 * n * r - 24.5 * r**2,
+            gidney_lelbows=elbows,
+            gidney_relbows=elbows,
+            toffs=toffs,
+            local_ancillae=ancillae,
+            active_volume=av,
         )
         self.get_qc().add_cost_event(cost)
+
+
+def _square_iterations(xn: int, xr: int, tn: int, tr: int):
+    """Yields (i, j, skip) for each addition in SquareOptimized on unsigned registers.
+
+    x[i]^2 is written to target[j], and first `skip` partial products are dropped.
+    """
+    for i in range(xn - 1):
+        j = 2 * (i - xr) + tr  # Where in target to write x[i]^2.
+        if j >= tn:
+            break
+        skip = 0
+        if j < 0:
+            skip = -j
+            j = 0
+        yield i, j, skip
+
+
+def square_optimized_costs(n, r, p=0, *, signed: bool = True) -> tuple:
+    """Costs of SquareOptimized for input and target of n qubits with radix r.
+
+    `p` is the number of padding qubits (which are not included in ancillae).
+    Returns (elbows, toffs, active_volume, ancillae).
+    """
+    if not signed:
+        # Unsigned square of n qubits is what signed square of n+1 qubits
+        # does between computing and uncomputing AbsInPlace.
+        elbows, _, av, ancillae = square_optimized_costs(n + 1, r, p)
+        return elbows - 2 * (n - 1), 0, av - 211 * n + 89, ancillae - 1
+
+    # Padding adds elbows for the partial products that it keeps.
+    # This is exact up to ±1 when 2*p<=r.
+    pad_elbows = r * p + 0.5 * p - 0.5 * p**2
+    elbows = -3 + 0.5 * n - r + 0.5 * n**2 + n * r - 0.5 * r**2 + pad_elbows
+    av = -248.5 + 120.4 * n - 76.5 * r + 30.3 * n**2 + 60.5 * n * r - 24.5 * r**2 + 60.5 * pad_elbows
+    return elbows, 2 * n - 2, av, 2 * n - 2 + 2 * p
+
+
+def _unsigned_square_counts(xn: int, xr: int, tn: int, tr: int) -> tuple[int, int, int]:
+    """Counts (elbows, active_volume, ancillae) of unsigned SquareOptimized from its iterations."""
+    elbows, av, ancillae = 0, 0, 0
+    for i, j, skip in _square_iterations(xn, xr, tn, tr):
+        # Elbow with single control is a CNOT.
+        num_elbows = len([i2 for i2 in range(max(1, skip - 1), xn - i) if j + i2 - skip + 1 < tn])
+        add_cost = adder_costs(qbk.GidneyAdd(), tn - j)
+        elbows += num_elbows + add_cost.elbows
+        av += 53 * num_elbows + 8 * int(skip == 0) + add_cost.active_volume
+        ancillae = max(ancillae, tn + add_cost.ancillae)
+    return elbows, av, ancillae
+
+
+def unsigned_square_costs(xn: int, xr: int, tn: int, tr: int, p: int = 0) -> tuple:
+    """Costs of unsigned SquareOptimized for x of xn qubits with radix xr and target of tn qubits with radix tr.
+
+    `p` is the number of padding qubits. Requires numeric sizes.
+    Returns (elbows, toffs, active_volume, ancillae).
+    """
+    # Fitted costs for target of the same format as x, corrected by counted
+    # difference for the actual target.
+    elbows, toffs, av, ancillae = square_optimized_costs(xn, xr, p, signed=False)
+    counts = _unsigned_square_counts(xn, xr, tn + p, tr + p)
+    same_format_counts = _unsigned_square_counts(xn, xr, xn + p, xr + p)
+    elbows += counts[0] - same_format_counts[0]
+    av += counts[1] - same_format_counts[1]
+    ancillae += counts[2] - same_format_counts[2]
+    return elbows, toffs, av, ancillae
@@ -22,3 +22,15 @@ def test_re_square_optimized():
     params += [(20, 6), (20, 10), (20, 15), (20, 16), (30, 10), (30, 20), (40, 10), (40, 20)]
     for n, radix in params:
         verify_re(re_symbolic, re_numeric, {"n": n, "radix": radix}, av_rtol=0.01, elbows_rtol=0.01)
+
+
+@pytest.mark.re
+@pytest.mark.slow
+@pytest.mark.parametrize("padding", [2, 4])
+def test_re_square_optimized_padded(padding: int):
+    op = SquareOptimized(padding=padding)
+    re_symbolic = re_symbolic_fixed_point(op, n_inputs=2)
+    re_numeric = lambda assgn: re_numeric_fixed_point(op, assgn, n_inputs=2)
+    params = [(20, 10), (20, 15), (30, 10), (30, 20), (40, 20)]
+    for n, radix in params:
+        verify_re(re_symbolic, re_numeric, {"n": n, "radix": radix}, av_rtol=0.02, elbows_rtol=0.01)
@@ -30,6 +30,29 @@ def test_square_optimzied():
     assert qs_y.read() == 2.25
 
 
+def test_square_truncated():
+    qpu_helper = QPUTestHelper(num_qubits=150, qubits_per_reg=20, radix=12, num_inputs=2)
+    q_x, q_ans = qpu_helper.inputs
+    Square(guard_bits=3).compute(q_x, q_ans)
+    qpu_helper.record_op(q_ans)
+
+    for x in [-3.5, -1.0, 0.0, 0.1, 2.75, 5.3]:
+        result = qpu_helper.apply_op([x, 0])
+        assert abs(result - x**2) < (1 + 20 * 2**-3) * 2**-12 + 2**-11
+
+
+def test_square_optimized_padded():
+    qpu_helper = QPUTestHelper(num_qubits=200, qubits_per_reg=31, radix=21, num_inputs=2)
+    q_x, q_ans = qpu_helper.inputs
+    SquareOptimized(padding="auto").compute(q_x, q_ans)
+    qpu_helper.record_op(q_ans)
+
+    for _ in range(20):
+        x = -30 + 60 * random.random()
+        result = qpu_helper.apply_op([x, 0])
+        assert abs(result - x**2) < 1.5 * 2**-21
+
+
 @pytest.mark.slow
 def test_square_optimized_random_high_precision():
     qpu_helper = QPUTestHelper(num_qubits=500, qubits_per_reg=51, radix=41, num_inputs=2)
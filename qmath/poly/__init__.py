@@ -2,4 +2,5 @@
 
 from .horner import HornerScheme
 from .piecewise import EvalFunctionPPA, EvalPiecewisePolynomial, WritePieceNumber
+from .range_reduction import ExponentSplit, LogNormalization, PeriodicReduction, RangeReduction
 from .remez import Piece, PiecewisePolynomial
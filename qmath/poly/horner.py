@@ -9,17 +9,19 @@ class HornerScheme(Qubrick):
     """Evaluates polynomial using Horner scheme.
 
     Given x in input regsiter, evaluates sum(coefs[i] * x**i) in result register.
+    If `guard_bits` is set, uses truncated multiplication (see TruncatedMultiplyAdd).
     """
 
-    def __init__(self, coefs: list[float], **kwargs):
+    def __init__(self, coefs: list[float], *, guard_bits: int | None = None, **kwargs):
         super().__init__(**kwargs)
         self.coefs = coefs
+        self.guard_bits = guard_bits
 
     def _compute(self, x: QFixed):
         # Computes ax + b.
         def linear(a: QFixed, b: float) -> QFixed:
             _, result = alloc_temp_qreg_like(self, x, name="result")
-            MultiplyAdd().compute(result, a, x)
+            MultiplyAdd(guard_bits=self.guard_bits).compute(result, a, x)
             AddConst(b).compute(result)
             return result
 
@@ -7,7 +7,7 @@ Reference:
 """
 
 import math
-from typing import Callable
+from typing import TYPE_CHECKING, Callable, Optional
 
 import numpy as np
 import psiqworkbench.qubricks as qbk
@@ -16,13 +16,16 @@ from psiqworkbench.qubricks import Qubrick
 
 from ..func.common import Add, MultiplyAdd
 from ..func.compare import CompareConstGT
-from ..func.square import Square
+from ..func.square import Square, SquareOptimized
 from ..utils.gates import write_uint
-from ..utils.lookup import TableLookup
+from ..utils.lookup import MultiTableLookup, MultiTableUnlookup, TableLookup, TableUnlookup, int_to_words
 from ..utils.symbolic import alloc_temp_qreg_like
 from .horner import HornerScheme
 from .remez import PiecewisePolynomial, remez_piecewise
 
+if TYPE_CHECKING:
+    from .range_reduction import RangeReduction
+
 
 # Converts signed real number to unsigned integer whose binary representation is
 # identical to that of given number if written to given QFixed register.
@@ -67,6 +70,19 @@ class EvalPiecewisePolynomial(Qubrick):
         interval - interval on which to approximate.
         degree - degree of polynomials used to approximate the function.
         error_tol - maximal error between true function and its apprimxation.
+        single_pass_lookup - whether to load all coefficients with one
+            MultiTableLookup into separate registers. This walks the label
+            register once instead of deg+1 times (~(deg+1)x fewer lookup
+            elbows) at the cost of deg-1 extra coefficient registers.
+        clean_coefs - whether to return coefficient registers to zero after
+            evaluation, using measurement-based unlookup (≈2sqrt(N) elbows
+            for N pieces, instead of repeating the lookup).
+        prune_lookup - whether coefficient lookups skip zero subtrees and
+            share writes between equal subtrees (see MultiTableLookup).
+            Pruning depends on coefficients, which are not known in symbolic
+            estimates, so they give cost of unpruned lookups (upper bound).
+        guard_bits - if set, multiplications are truncated with this many
+            guard bits (see TruncatedMultiplyAdd).
 
     Reference:
         Thomas Haner, Martin Roetteler, Krysta M. Svore.
@@ -74,9 +90,22 @@ class EvalPiecewisePolynomial(Qubrick):
         https://arxiv.org/abs/1805.12445
     """
 
-    def __init__(self, poly: PiecewisePolynomial, **kwargs):
+    def __init__(
+        self,
+        poly: PiecewisePolynomial,
+        *,
+        single_pass_lookup: bool = False,
+        clean_coefs: bool = False,
+        prune_lookup: bool = False,
+        guard_bits: int | None = None,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self.poly = poly
+        self.single_pass_lookup = single_pass_lookup
+        self.clean_coefs = clean_coefs
+        self.prune_lookup = prune_lookup
+        self.guard_bits = guard_bits
         self.num_pieces = len(self.poly.pieces)
         self.deg = max(len(p.coefs) for p in self.poly.pieces) - 1
 
@@ -91,9 +120,12 @@ class EvalPiecewisePolynomial(Qubrick):
         WritePieceNumber().compute(x, l, points)
         return l
 
+    def _prune(self) -> bool:
+        return self.prune_lookup and not self.qc.is_symbolic
+
     def _compute(self, x: QFixed):
         if self.num_pieces == 1:
-            hs = HornerScheme(self.poly.pieces[0].coefs)
+            hs = HornerScheme(self.poly.pieces[0].coefs, guard_bits=self.guard_bits)
             hs.compute(x)
             self.set_result_qreg(hs.get_result_qreg())
             return
@@ -101,16 +133,24 @@ class EvalPiecewisePolynomial(Qubrick):
         l = self._label(x)
 
         # Prepare coefficients.
-        a = np.zeros((self.num_pieces, self.deg + 1), dtype=np.int64)
+        # a[i, j] is j-th coefficient of i-th piece, split into 64-bit words.
+        num_words = 1 if self.qc.is_symbolic else (x.num_qubits + 63) // 64
+        a = np.zeros((self.num_pieces, self.deg + 1, num_words), dtype=np.uint64)
         if not self.qc.is_symbolic:
-            assert x.num_qubits <= 64  # So we can use np.int128 to represent coefficients.
             for i, piece in enumerate(self.poly.pieces):
                 for j, coef in enumerate(piece.coefs):
-                    a[i][j] = real_as_uint(coef, x)
+                    a[i][j] = int_to_words(real_as_uint(coef, x), x.num_qubits)
 
+        if self.single_pass_lookup:
+            ans = self._horner_single_pass_lookup(x, l, a)
+        else:
+            ans = self._horner(x, l, a)
+        self.set_result_qreg(ans)
+
+    def _horner(self, x: QFixed, l: QUInt, a: np.ndarray) -> QFixed:
         # Allocate register for the answer and write highest coefficient there.
         _, ans = alloc_temp_qreg_like(self, x, name="ans")
-        TableLookup(a[:, self.deg]).compute(l, ans)
+        TableLookup(a[:, self.deg], prune=self._prune()).compute(l, ans)
 
         # Allocate register to write coefficients.
         q_coefs_raw, q_coefs = alloc_temp_qreg_like(self, x, name="coefs")
@@ -119,15 +159,46 @@ class EvalPiecewisePolynomial(Qubrick):
         for i in range(self.deg - 1, -1, -1):
             # Write coefficients to register qa.
             coefs = a[:, i] ^ (0 if i == self.deg - 1 else a[:, i + 1])
-            TableLookup(coefs).compute(l, q_coefs_raw)
+            TableLookup(coefs, prune=self._prune()).compute(l, q_coefs_raw)
 
             # Compute ans := ans * x + coef.
             _, next_ans = alloc_temp_qreg_like(self, x, name=f"ans{i}")
-            MultiplyAdd().compute(next_ans, ans, x)
+            MultiplyAdd(guard_bits=self.guard_bits).compute(next_ans, ans, x)
             Add().compute(next_ans, q_coefs)
             ans = next_ans
 
-        self.set_result_qreg(ans)
+        if self.clean_coefs and self.deg >= 1:
+            # After XOR-differencing, coefficients register holds a[:, 0].
+            TableUnlookup(a[:, 0]).compute(l, q_coefs_raw)
+            q_coefs_raw.release()
+        return ans
+
+    def _horner_single_pass_lookup(self, x: QFixed, l: QUInt, a: np.ndarray) -> QFixed:
+        # Every coefficient gets its own register, so no XOR-differencing is
+        # needed. Targets are ordered the same way Horner scheme consumes them:
+        # highest coefficient (written directly to the answer) goes first.
+        _, ans = alloc_temp_qreg_like(self, x, name="ans")
+        coefs_raw, coefs = [], []
+        for i in range(self.deg - 1, -1, -1):
+            q_coefs_raw, q_coefs = alloc_temp_qreg_like(self, x, name=f"coefs{i}")
+            coefs_raw.append(q_coefs_raw)
+            coefs.append(q_coefs)
+        tables = [a[:, i] for i in range(self.deg, -1, -1)]
+        MultiTableLookup(tables, prune=self._prune()).compute(l, [ans] + coefs_raw)
+
+        # Parallel Horner scheme.
+        for i, q_coefs in zip(range(self.deg - 1, -1, -1), coefs):
+            # Compute ans := ans * x + coef.
+            _, next_ans = alloc_temp_qreg_like(self, x, name=f"ans{i}")
+            MultiplyAdd(guard_bits=self.guard_bits).compute(next_ans, ans, x)
+            Add().compute(next_ans, q_coefs)
+            ans = next_ans
+
+        if self.clean_coefs and self.deg >= 1:
+            MultiTableUnlookup(tables[1:]).compute(l, coefs_raw)
+            for q_coefs_raw in coefs_raw:
+                q_coefs_raw.release()
+        return ans
 
 
 def _square_interval(interval: tuple[float, float]) -> tuple[float, float]:
@@ -162,6 +233,17 @@ class EvalFunctionPPA(Qubrick):
         error_tol - maximal error between true function and its apprimxation.
         is_even - whether to apply "even trick".
         is_odd - whether to apply "odd trick".
+        single_pass_lookup - passed to EvalPiecewisePolynomial.
+        clean_coefs - passed to EvalPiecewisePolynomial.
+        prune_lookup - passed to EvalPiecewisePolynomial.
+        guard_bits - if set, all multiplications (including squaring for
+            even/odd trick) are truncated with this many guard bits.
+        optimized_square - whether even/odd trick uses padded SquareOptimized
+            instead of Square.
+        range_reduction - optional range reduction (see range_reduction.py).
+            If set, the polynomial approximates reduced function on the
+            reduced interval, which needs fewer pieces. Applied before
+            even/odd trick.
     """
 
     def __init__(
@@ -173,11 +255,27 @@ class EvalFunctionPPA(Qubrick):
         error_tol: float,
         is_even: bool = False,
         is_odd: bool = False,
+        single_pass_lookup: bool = False,
+        clean_coefs: bool = False,
+        prune_lookup: bool = False,
+        guard_bits: int | None = None,
+        optimized_square: bool = False,
+        range_reduction: Optional["RangeReduction"] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
         self.is_even = is_even
         self.is_odd = is_odd
+        self.single_pass_lookup = single_pass_lookup
+        self.clean_coefs = clean_coefs
+        self.prune_lookup = prune_lookup
+        self.guard_bits = guard_bits
+        self.optimized_square = optimized_square
+        self.range_reduction = range_reduction
+        self.interval = interval
+        if range_reduction is not None:
+            f = range_reduction.reduce_function(f)
+            interval = range_reduction.reduce_interval(interval)
         if is_even:
             assert not is_odd, "Cannot use both odd and even trick."
             g = lambda t: f(np.sqrt(t))
@@ -190,20 +288,37 @@ class EvalFunctionPPA(Qubrick):
         else:
             self.poly = remez_piecewise(f, interval, degree, error_tol)
 
-    def _compute(self, x: QFixed):
-        epp = EvalPiecewisePolynomial(self.poly)
+    def _eval(self, x: QFixed) -> QFixed:
+        epp = EvalPiecewisePolynomial(
+            self.poly,
+            single_pass_lookup=self.single_pass_lookup,
+            clean_coefs=self.clean_coefs,
+            prune_lookup=self.prune_lookup,
+            guard_bits=self.guard_bits,
+        )
         if self.is_odd or self.is_even:
             _, x_sq = alloc_temp_qreg_like(self, x, "x_sq")
-            Square().compute(x, x_sq)
+            if self.optimized_square:
+                SquareOptimized(padding="auto").compute(x, x_sq)
+            else:
+                Square(guard_bits=self.guard_bits).compute(x, x_sq)
             epp.compute(x_sq)
             if self.is_even:
                 # Return poly(x^2).
-                self.set_result_qreg(epp.get_result_qreg())
+                return epp.get_result_qreg()
             else:
                 # Return ans := poly(x^2)*x.
                 _, ans = alloc_temp_qreg_like(self, x, name="ans")
-                MultiplyAdd().compute(ans, epp.get_result_qreg(), x)
-                self.set_result_qreg(ans)
+                MultiplyAdd(guard_bits=self.guard_bits).compute(ans, epp.get_result_qreg(), x)
+                return ans
         else:
             epp.compute(x)
-            self.set_result_qreg(epp.get_result_qreg())
+            return epp.get_result_qreg()
+
+    def _compute(self, x: QFixed):
+        if self.range_reduction is None:
+            self.set_result_qreg(self._eval(x))
+        else:
+            t, aux = self.range_reduction.reduce(self, x, self.interval)
+            y = self._eval(t)
+            self.set_result_qreg(self.range_reduction.reconstruct(self, x, aux, y))
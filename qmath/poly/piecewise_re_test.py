@@ -26,3 +26,37 @@ def test_re_ppa_slow():
         re_numeric = lambda assgn: re_numeric_fixed_point(op, assgn, n_inputs=1)
         for n, radix in params:
             verify_re(re_symbolic, re_numeric, {"n": n, "radix": radix}, av_rtol=0.015, elbows_rtol=0.01)
+
+
+@pytest.mark.re
+def test_re_ppa_single_pass_lookup():
+    op = EvalFunctionPPA(np.sin, interval=[-1, 1], degree=4, error_tol=1e-7, single_pass_lookup=True)
+    re_symbolic = re_symbolic_fixed_point(op, n_inputs=1)
+    re_numeric = lambda assgn: re_numeric_fixed_point(op, assgn, n_inputs=1)
+    verify_re(re_symbolic, re_numeric, {"n": 30, "radix": 20}, av_rtol=0.015, elbows_rtol=0.01)
+
+
+@pytest.mark.re
+def test_re_ppa_pruned_lookup():
+    # Pruning depends on coefficients, so symbolic estimate is the one for unpruned lookups.
+    assgn = {"n": 10, "radix": 6}
+    args = dict(interval=[-1, 1], degree=2, error_tol=1e-3)
+    op = EvalFunctionPPA(np.cos, prune_lookup=True, **args)
+    re_symbolic = re_symbolic_fixed_point(op, n_inputs=1).evaluate(assgn)
+    op_unpruned = EvalFunctionPPA(np.cos, **args)
+    assert re_symbolic == re_symbolic_fixed_point(op_unpruned, n_inputs=1).evaluate(assgn)
+    assert re_symbolic["gidney_lelbows"] > 0
+
+    re_numeric = re_numeric_fixed_point(op, assgn, n_inputs=1)
+    assert re_numeric["gidney_lelbows"] <= re_symbolic["gidney_lelbows"] * 1.01
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("single_pass_lookup", [False, True])
+def test_re_ppa_clean_coefs(single_pass_lookup: bool):
+    op = EvalFunctionPPA(
+        np.cos, interval=[-1, 1], degree=2, error_tol=1e-3, single_pass_lookup=single_pass_lookup, clean_coefs=True
+    )
+    re_symbolic = re_symbolic_fixed_point(op, n_inputs=1)
+    re_numeric = lambda assgn: re_numeric_fixed_point(op, assgn, n_inputs=1)
+    verify_re(re_symbolic, re_numeric, {"n": 10, "radix": 6}, av_rtol=0.015, elbows_rtol=0.01)
@@ -1,10 +1,12 @@
 import numpy as np
 import pytest
-from psiqworkbench import QPU, QFixed, QUInt
+from psiqworkbench import QPU, QFixed, Qubits, QUInt
 from psiqworkbench.filter_presets import BIT_DEFAULT
 
 from qmath.utils.test_utils import QPUTestHelper
 from qmath.poly import WritePieceNumber, EvalPiecewisePolynomial, PiecewisePolynomial, Piece, EvalFunctionPPA
+from qmath.poly.piecewise import real_as_uint
+from qmath.utils.lookup import TableLookup
 
 
 def test_write_piece_number():
@@ -27,7 +29,8 @@ def test_write_piece_number():
         _check(x + 0.1, i + 1)
 
 
-def test_eval_piecewise_polynomial():
+@pytest.mark.parametrize("single_pass_lookup", [False, True])
+def test_eval_piecewise_polynomial(single_pass_lookup: bool):
     poly = PiecewisePolynomial(
         [
             Piece(-1, 0, [1, 1, 1, 0]),
@@ -40,6 +43,54 @@ def test_eval_piecewise_polynomial():
         qpu.reset(150)
         qx = QFixed(8, name="qx", radix=3, qpu=qpu)
         qx.write(x)
+        func = EvalPiecewisePolynomial(poly, single_pass_lookup=single_pass_lookup)
+        func.compute(qx)
+        result = func.get_result_qreg().read()
+        assert result == poly.eval(x)
+
+
+@pytest.mark.parametrize("single_pass_lookup", [False, True])
+def test_eval_piecewise_polynomial_clean_coefs(single_pass_lookup: bool):
+    poly = PiecewisePolynomial(
+        [
+            Piece(-1, 0, [1, 1, 1, 0]),
+            Piece(0, 1.5, [1, -2, -2.5, 0]),
+            Piece(1.5, 2.5, [5.875, -3, -5.5, 1]),
+        ]
+    )
+    num_qubits = 160
+    for x in [-1, 1.5, 2]:
+        states = []
+        for clean_coefs in [False, True]:
+            qpu = QPU()
+            qpu.reset(num_qubits)
+            qx = QFixed(8, name="qx", radix=3, qpu=qpu)
+            qx.write(x)
+            func = EvalPiecewisePolynomial(poly, single_pass_lookup=single_pass_lookup, clean_coefs=clean_coefs)
+            func.compute(qx)
+            assert func.get_result_qreg().read() == poly.eval(x)
+            states.append(QUInt(Qubits(from_mask=(1 << num_qubits) - 1, name="all", qpu=qpu)).read())
+
+        # Cleaning returns coefficient registers to zero, and doesn't change other qubits.
+        unclean, clean = states
+        assert clean & ~unclean == 0
+        assert clean != unclean
+
+
+def test_eval_piecewise_polynomial_wide():
+    # Coefficients don't fit in 64 bits.
+    poly = PiecewisePolynomial(
+        [
+            Piece(-1, 0, [1, 1, 1, 0]),
+            Piece(0, 1.5, [1, -2, -2.5, 0]),
+            Piece(1.5, 2.5, [5.875, -3, -5.5, 1]),
+        ]
+    )
+    qpu = QPU(filters=BIT_DEFAULT)
+    for x in [-1, 1.5, 2]:
+        qpu.reset(2000)
+        qx = QFixed(80, name="qx", radix=70, qpu=qpu)
+        qx.write(x)
         func = EvalPiecewisePolynomial(poly)
         func.compute(qx)
         result = func.get_result_qreg().read()
@@ -95,3 +146,24 @@ def test_eval_cos_even():
         func.compute(qx)
         result = func.get_result_qreg().read()
         assert np.abs(result - np.cos(x)) < 1e-3
+
+
+def test_pruned_lookup_on_ppa_tables():
+    # Benchmark: elbows of XOR-differenced coefficient lookups with and without pruning.
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(40)
+    qx = QFixed(40, name="qx", radix=30, qpu=qpu)
+    total_full, total_pruned = 0, 0
+    for f, interval in [(np.sin, (-1, 1)), (np.exp, (-2, 2)), (np.log, (0.1, 10)), (np.arctan, (-3, 3))]:
+        poly = EvalFunctionPPA(f, interval=interval, degree=3, error_tol=1e-9).poly
+        a = [[real_as_uint(coef, qx) for coef in piece.coefs] for piece in poly.pieces]
+        deg = len(a[0]) - 1
+        tables = [[row[deg] for row in a]]
+        for i in range(deg - 1, -1, -1):
+            tables.append([row[i] ^ (0 if i == deg - 1 else row[i + 1]) for row in a])
+        full = sum(TableLookup(t)._compute_elbows() for t in tables)
+        pruned = sum(TableLookup(t, prune=True)._compute_elbows() for t in tables)
+        assert pruned <= full
+        total_full += full
+        total_pruned += pruned
+    assert total_pruned < total_full
@@ -0,0 +1,182 @@
+"""Range reduction front ends for EvalFunctionPPA.
+
+A range reduction maps the input x to a reduced argument t which lies in a
+small canonical interval. Then a piecewise polynomial only needs to
+approximate some function g(t) on that interval, and f(x) is reconstructed
+from g(t) with cheap quantum operations. This needs far fewer pieces (and
+a narrower label register) than approximating f on the whole interval.
+"""
+
+import math
+from typing import Any, Callable
+
+import psiqworkbench.qubricks as qbk
+from psiqworkbench import QFixed, QInt, Qubrick
+
+from ..func.bits import Normalize
+from ..func.common import MultiplyAdd
+from ..utils.lookup import TableLookup
+from ..utils.symbolic import alloc_temp_qreg_like
+from .piecewise import EvalFunctionPPA, real_as_uint
+
+
+class RangeReduction:
+    """Base class for range reductions.
+
+    Subclasses define the classical part (which function must be approximated
+    and on which interval) and the quantum part (how to compute the reduced
+    argument and how to reconstruct the answer).
+    """
+
+    def reduce_interval(self, interval: tuple[float, float]) -> tuple[float, float]:
+        """Returns interval on which reduced function will be approximated."""
+        raise NotImplementedError()
+
+    def reduce_function(self, f: Callable[[float], float]) -> Callable[[float], float]:
+        """Returns reduced function g, which will be approximated."""
+        raise NotImplementedError()
+
+    def reduce(self, parent: Qubrick, x: QFixed, interval: tuple[float, float]) -> tuple[QFixed, Any]:
+        """Computes reduced argument t.
+
+        `interval` is the interval on which f is evaluated (before reduction).
+        Returns t and auxiliary data needed for reconstruction.
+        t must have the same size as x, but can have different radix.
+        """
+        raise NotImplementedError()
+
+    def reconstruct(self, parent: Qubrick, x: QFixed, aux: Any, y: QFixed) -> QFixed:
+        """Given y=g(t), computes f(x)."""
+        raise NotImplementedError()
+
+
+class PeriodicReduction(RangeReduction):
+    """Range reduction for periodic functions: f(x)=f(x mod period).
+
+    Period must be a power of 2. Then x mod period is given by the least
+    significant qubits of x, so reduction doesn't need any gates. It needs
+    only zero qubits to pad reduced argument to the size of x.
+    To reduce functions with other periods, rescale the argument, e.g. use
+    f(x)=sin(pi*x) (period 2) instead of sin(x).
+    """
+
+    def __init__(self, period: float):
+        log_period = math.log2(period)
+        assert log_period.is_integer(), "Period must be a power of 2."
+        self.period = period
+        self.log_period = int(log_period)
+
+    def reduce_interval(self, interval: tuple[float, float]) -> tuple[float, float]:
+        return (0, self.period)
+
+    def reduce_function(self, f: Callable[[float], float]) -> Callable[[float], float]:
+        return f
+
+    def reduce(self, parent: Qubrick, x: QFixed, interval: tuple[float, float]) -> tuple[QFixed, Any]:
+        n = x.num_qubits
+        w = x.radix + self.log_period  # Number of qubits in x mod period.
+        assert w >= 1, "Period is too small for given radix."
+        assert w < n, "Period must be smaller than 2**(num_qubits-radix-1)."
+        pad = parent.alloc_temp_qreg(n - w, "pad")
+        return QFixed(x[0:w] | pad, radix=x.radix), None
+
+    def reconstruct(self, parent: Qubrick, x: QFixed, aux: Any, y: QFixed) -> QFixed:
+        return y
+
+
+class ExponentSplit(RangeReduction):
+    """Range reduction for exponential functions: b^x = b^int(x) * b^frac(x).
+
+    b^frac(x) is approximated by a polynomial on [0, 1), and b^int(x) is
+    loaded with a TableLookup addressed by the integer bits of x.
+    Approximated function must be f(x)=c*b^x, where b is `base`.
+    """
+
+    def __init__(self, base: float = 2.0):
+        assert base > 0
+        self.base = base
+
+    def reduce_interval(self, interval: tuple[float, float]) -> tuple[float, float]:
+        return (0, 1)
+
+    def reduce_function(self, f: Callable[[float], float]) -> Callable[[float], float]:
+        return f
+
+    def reduce(self, parent: Qubrick, x: QFixed, interval: tuple[float, float]) -> tuple[QFixed, Any]:
+        n = x.num_qubits
+        assert x.radix < n, "Input must have integer part."
+        pad = parent.alloc_temp_qreg(n - x.radix, "pad")
+        # Range of int(x), used to check that b^int(x) fits into the answer.
+        int_range = (math.floor(interval[0]), math.floor(interval[1]))
+        return QFixed(x[0 : x.radix] | pad, radix=x.radix), int_range
+
+    def _scale_table(self, x: QFixed, scale: QFixed, int_range: tuple[int, int]) -> list[int]:
+        # Entry u corresponds to integer part int(x)=u (interpreted as signed).
+        w = x.num_qubits - x.radix
+        table = []
+        for u in range(2**w):
+            i = u if u < 2 ** (w - 1) else u - 2**w
+            value = self.base**i
+            if value >= 2 ** (scale.num_qubits - scale.radix - 1):
+                lo, hi = int_range
+                if lo <= i <= hi:
+                    raise ValueError(f"Register is too small to fit {self.base}^{i}.")
+                value = 0.0
+            table.append(real_as_uint(value, scale))
+        return table
+
+    def reconstruct(self, parent: Qubrick, x: QFixed, aux: Any, y: QFixed) -> QFixed:
+        scale_raw, scale = alloc_temp_qreg_like(parent, y, name="scale")
+        TableLookup(self._scale_table(x, scale, aux)).compute(x[x.radix :], scale_raw)
+        _, ans = alloc_temp_qreg_like(parent, y, name="ans")
+        MultiplyAdd().compute(ans, y, scale)
+        return ans
+
+
+class LogNormalization(RangeReduction):
+    """Range reduction for logarithms: log(x) = e*log(2) + log(x/2^e).
+
+    Here e=floor(log2(x)), and x/2^e in [1, 2) is computed with Normalize
+    (barrel shifter). The input must be positive.
+    Approximated function must be f(x)=c+log_b(x), where b is `base`.
+    """
+
+    def __init__(self, base: float = 2.0):
+        assert base > 0 and base != 1
+        self.base = base
+
+    def reduce_interval(self, interval: tuple[float, float]) -> tuple[float, float]:
+        assert interval[0] > 0, "Logarithm is defined only for positive numbers."
+        return (1, 2)
+
+    def reduce_function(self, f: Callable[[float], float]) -> Callable[[float], float]:
+        return f
+
+    def reduce(self, parent: Qubrick, x: QFixed, interval: tuple[float, float]) -> tuple[QFixed, Any]:
+        # Shifted copy of x, such that highest set bit is the second most
+        # significant qubit. Then value of the copy is in [1, 2).
+        # x is positive, so mantissa[0] is always 0 and can be dropped.
+        n = x.num_qubits
+        shift = parent.alloc_temp_qreg((n - 1).bit_length(), "shift")
+        mantissa = parent.alloc_temp_qreg(n, "mantissa")
+        Normalize().compute(x, shift, mantissa)
+        t = mantissa[1:] | parent.alloc_temp_qreg(1, "top")
+        return QFixed(t, radix=n - 2), shift
+
+    def reconstruct(self, parent: Qubrick, x: QFixed, aux: Any, y: QFixed) -> QFixed:
+        norm_shift = aux
+        _, ans = alloc_temp_qreg_like(parent, x, name="ans")
+
+        # Write e*log(2), where e=n-1-norm_shift-radix is position of highest set bit.
+        n = x.num_qubits
+        table = [real_as_uint((n - 1 - s - x.radix) * math.log(2, self.base), ans) for s in range(n)]
+        table += [0] * (2**norm_shift.num_qubits - n)
+        TableLookup(table).compute(norm_shift, ans)
+
+        # Add log(x/2^e), aligning radix of y with radix of the answer.
+        shift = y.radix - ans.radix
+        if shift >= 0:
+            qbk.GidneyAdd().compute(QInt(ans), QInt(y)[shift:])
+        else:
+            qbk.GidneyAdd().compute(QInt(ans)[-shift:], QInt(y))
+        return ans
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from psiqworkbench import QPU, QFixed
+
+from qmath.func.common import MultiplyAdd
+from qmath.utils.test_utils import QPUTestHelper
+from qmath.poly import EvalFunctionPPA, ExponentSplit, LogNormalization, PeriodicReduction
+from qmath.poly.range_reduction import RangeReduction
+
+
+def _check_ppa(func: EvalFunctionPPA, f, xs, *, atol, qubits_per_reg=24, radix=16):
+    qpu_helper = QPUTestHelper(num_qubits=800, qubits_per_reg=qubits_per_reg, radix=radix, num_inputs=1)
+    func.compute(qpu_helper.inputs[0])
+    qpu_helper.record_op(func.get_result_qreg())
+    for x in xs:
+        result = qpu_helper.apply_op([x])
+        assert np.abs(result - f(x)) < atol, f"x={x}"
+
+
+def test_fewer_pieces():
+    f = lambda x: np.sin(np.pi * x)
+    full = EvalFunctionPPA(f, interval=(-8, 8), degree=3, error_tol=1e-5)
+    reduced = EvalFunctionPPA(f, interval=(-8, 8), degree=3, error_tol=1e-5, range_reduction=PeriodicReduction(2))
+    assert len(reduced.poly.pieces) < len(full.poly.pieces)
+
+
+@pytest.mark.slow
+def test_periodic_reduction():
+    f = lambda x: np.sin(np.pi * x)
+    func = EvalFunctionPPA(f, interval=(-8, 8), degree=3, error_tol=1e-5, range_reduction=PeriodicReduction(2))
+    _check_ppa(func, f, np.linspace(-7.9, 7.9, 15), atol=1e-4)
+
+
+@pytest.mark.slow
+def test_exponent_split():
+    f = lambda x: 2**x
+    func = EvalFunctionPPA(f, interval=(-4, 4), degree=3, error_tol=1e-6, range_reduction=ExponentSplit(2))
+    _check_ppa(func, f, np.linspace(-3.9, 3.9, 15), atol=1e-3)
+
+
+@pytest.mark.slow
+def test_log_normalization():
+    f = np.log
+    func = EvalFunctionPPA(f, interval=(0.01, 100), degree=3, error_tol=1e-6, range_reduction=LogNormalization(np.e))
+    _check_ppa(func, f, [0.01, 0.1, 0.7, 1.0, 1.5, 3.0, 10.0, 99.0], atol=1e-3)
+
+
+def _compare_range_reduction(f, reduction: RangeReduction, *, num_qubits: int, radix: int, **ppa_args) -> dict:
+    # Reports number of pieces and Toffoli count of EvalFunctionPPA with and without range reduction.
+    report = dict()
+    for name, rr in [("full", None), ("reduced", reduction)]:
+        op = EvalFunctionPPA(f, range_reduction=rr, **ppa_args)
+        qpu = QPU(filters=[">>witness>>"])
+        qpu.reset(30 * num_qubits)
+        op.compute(QFixed(num_qubits, name="x", radix=radix, qpu=qpu))
+        report[f"{name}_pieces"] = len(op.poly.pieces)
+        report[f"{name}_toffoli"] = qpu.metrics()["toffoli_count"]
+    report["toffoli_savings"] = report["full_toffoli"] - report["reduced_toffoli"]
+    return report
+
+
+@pytest.mark.slow
+def test_range_reduction_saves_toffolis():
+    f = lambda x: np.sin(np.pi * x)
+    report = _compare_range_reduction(
+        f, PeriodicReduction(2), interval=(-8, 8), degree=3, error_tol=1e-5, num_qubits=24, radix=16
+    )
+    assert report["reduced_pieces"] < report["full_pieces"]
+    assert report["toffoli_savings"] > 0
+
+
+@pytest.mark.slow
+def test_log_normalization_saves_toffolis():
+    # Reduced argument is wider, so each multiplication is more expensive,
+    # but this is outweighed by the saved comparisons.
+    report = _compare_range_reduction(
+        np.log, LogNormalization(np.e), interval=(0.01, 100), degree=3, error_tol=1e-8, num_qubits=24, radix=16
+    )
+    assert report["reduced_pieces"] < report["full_pieces"]
+    assert report["toffoli_savings"] > 0
+
+
+@pytest.mark.slow
+def test_exponent_split_toffolis():
+    # ExponentSplit needs fewer pieces, but reconstruction multiplies by
+    # b^int(x), which costs about as much as the saved comparisons.
+    n, radix = 24, 18
+    report = _compare_range_reduction(
+        lambda x: 2**x, ExponentSplit(2), interval=(-4, 4), degree=3, error_tol=1e-6, num_qubits=n, radix=radix
+    )
+    assert report["reduced_pieces"] < report["full_pieces"]
+
+    qpu = QPU(filters=[">>witness>>"])
+    qpu.reset(10 * n)
+    regs = [QFixed(n, name=f"r{i}", radix=radix, qpu=qpu) for i in range(3)]
+    MultiplyAdd().compute(*regs)
+    multiply_toffoli = qpu.metrics()["toffoli_count"]
+    assert -report["toffoli_savings"] < multiply_toffoli
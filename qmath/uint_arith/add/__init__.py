@@ -1,5 +1,8 @@
 """Quantum addition algorithms."""
 
 from .cdkm2004 import CDKMAdder
+from .costs import adder_costs, constant_adder_costs, measured_adder_costs
+from .dkrs2004 import DKRSAdder, dkrs_toffoli_depth
 from .increment import Increment
+from .policy import AdderPolicy, adder_policy, get_adder_policy, set_adder_policy
 from .ttk2009 import TTKAdder
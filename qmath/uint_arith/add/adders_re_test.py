@@ -1,7 +1,8 @@
 import pytest
+from psiqworkbench import QPU, Qubits, QUInt, SymbolicQPU, SymbolicQubits, resource_estimator
 
-from qmath.uint_arith.add import CDKMAdder, TTKAdder
-from qmath.utils.re_utils import re_numeric_int_binary_op, re_symbolic_int_binary_op, verify_re
+from qmath.uint_arith.add import CDKMAdder, DKRSAdder, TTKAdder
+from qmath.utils.re_utils import FILTERS_FOR_NUMERIC_RE, re_numeric_int_binary_op, re_symbolic_int_binary_op, verify_re
 
 
 @pytest.mark.re
@@ -22,3 +23,53 @@ def test_adder_cdkm_re(controlled: bool):
     re_numeric = lambda assgn: re_numeric_int_binary_op(adder, assgn, controlled=controlled)
     for n in [5, 10, 20, 30, 40]:
         verify_re(re_symbolic, re_numeric, {"n": n})
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("controlled", [False, True])
+def test_adder_dkrs_re(controlled: bool):
+    adder = DKRSAdder()
+    for n in [2, 5, 8, 20, 33]:
+        qpu = SymbolicQPU()
+        ctrl = SymbolicQubits(1, "ctrl", qpu) if controlled else None
+        adder.compute(SymbolicQubits(n, "x", qpu), SymbolicQubits(n, "y", qpu), ctrl=ctrl)
+        re_symbolic = resource_estimator(qpu).resources()
+
+        def re_numeric(assgn):
+            qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+            qpu.reset(5 * n)
+            ctrl = Qubits(1, "ctrl", qpu) if controlled else None
+            adder.compute(QUInt(n, "x", qpu), QUInt(n, "y", qpu), ctrl=ctrl)
+            return resource_estimator(qpu).resources()
+
+        verify_re(re_symbolic, re_numeric, {}, av_rtol=0.1)
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("controlled", [False, True])
+def test_adder_dkrs_re_symbolic_size(controlled: bool):
+    adder = DKRSAdder()
+    re_symbolic = re_symbolic_int_binary_op(adder, controlled=controlled)
+    for n in [5, 8, 20, 64]:
+        qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+        qpu.reset(5 * n)
+        ctrl = Qubits(1, "ctrl", qpu) if controlled else None
+        adder.compute(QUInt(n, "x", qpu), QUInt(n, "y", qpu), ctrl=ctrl)
+        re_numeric = resource_estimator(qpu).resources()
+        estimate = re_symbolic.evaluate({"n": n})
+        # Prefix tree counts are upper bounds, within O(log n) of exact ones.
+        for key in ["toffs", "gidney_lelbows"]:
+            assert re_numeric[key] <= estimate[key] <= re_numeric[key] + 4 * n.bit_length() + 2
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("adder", [CDKMAdder(), DKRSAdder()])
+def test_adder_with_carry_costs(adder):
+    for n in [5, 8, 20]:
+        qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+        qpu.reset(5 * n)
+        adder.compute(QUInt(n + 1, "x", qpu), QUInt(n, "y", qpu))
+        re_numeric = resource_estimator(qpu).resources()
+        costs = adder.costs(n, carry=True)
+        assert re_numeric["toffs"] == costs.toffs
+        assert re_numeric["gidney_lelbows"] == costs.elbows
@@ -7,7 +7,9 @@ from psiqworkbench import QPU, Qubits, QUInt
 from psiqworkbench.filter_presets import BIT_DEFAULT
 from psiqworkbench.interfaces import Adder
 
-from qmath.uint_arith.add import CDKMAdder, TTKAdder
+from qmath.uint_arith.add import CDKMAdder, DKRSAdder, TTKAdder, dkrs_toffoli_depth
+from qmath.uint_arith.add.dkrs2004 import _num_prefix_ops, _num_propagate_blocks, _propagate_blocks
+from qmath.utils.prefix import brent_kung_schedule
 
 
 # Tests in-place adder:
@@ -110,3 +112,31 @@ def test_adder_ttk(num_bits: tuple[int, int]):
 def test_adder_ttk_controlled():
     _check_controlled_adder(TTKAdder(), 5, 5)
     _check_controlled_adder(TTKAdder(), 5, 4, num_trials=10)
+
+
+@pytest.mark.parametrize(
+    "num_bits", [(1, 1), (2, 1), (2, 2), (4, 4), (5, 4), (8, 8), (10, 10), (10, 9), (10, 5), (20, 20), (33, 32)]
+)
+def test_adder_dkrs(num_bits: tuple[int, int]):
+    n1, n2 = num_bits
+    _check_adder(DKRSAdder(), n1, n2)
+
+
+def test_adder_dkrs_controlled():
+    _check_controlled_adder(DKRSAdder(), 5, 4)
+    _check_controlled_adder(DKRSAdder(), 5, 5)
+
+
+def test_adder_dkrs_depth():
+    for k in range(5, 11):
+        n = 2**k
+        depth = dkrs_toffoli_depth(n)
+        assert depth <= 4 * k + 2
+        # Ripple-carry adders have Toffoli depth linear in n (CDKM: 2n-3).
+        assert depth < 2 * n - 3
+
+
+def test_dkrs_prefix_counts():
+    for m in range(100):
+        assert _num_prefix_ops(m) == len(brent_kung_schedule(m))
+        assert _num_propagate_blocks(m) == len(_propagate_blocks(m))
@@ -4,9 +4,10 @@ from psiqworkbench import Qubits, QUInt
 from psiqworkbench.interfaces import Adder
 from psiqworkbench.interoperability import implements
 from psiqworkbench.qubricks import Qubrick
-from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
 
+from ...utils.costs import Costs
 from ...utils.padding import padded
+from .costs import measured_adder_costs
 
 
 @implements(Adder[QUInt, QUInt])
@@ -128,24 +129,26 @@ class CDKMAdder(Qubrick):
                 assert len(rhs) == len(lhs) - 1
                 self._compute(lhs, rhs)
 
-    def _estimate(self, lhs: QUInt, rhs: QUInt, ctrl: Optional[Qubits] = None):
+    def costs(self, n, *, controlled: bool = False, carry: bool = False) -> Costs:
+        """Costs of adding n-qubit rhs.
+
+        Closed form is for n>=5 (n>=4 with carry). Costs for smaller registers
+        are measured (see measured_adder_costs).
+        """
+        if isinstance(n, int) and n < (4 if carry else 5):
+            # Small registers use the simple version in both modes.
+            return measured_adder_costs(CDKMAdder, n, controlled=controlled, carry=carry)
         assert self.optimized, "RE implemented only for optimized version."
+        if carry:
+            # Same circuit as for n+1 qubits without carry, except for the last CNOT.
+            if controlled:
+                raise NotImplementedError("Cost model with carry is implemented only without control.")
+            return Costs(toffs=2 * n - 1, ancillae=1, active_volume=114 * n - 59)
+        if controlled:
+            return Costs(elbows=2 * n - 3, toffs=5 * n - 6, ancillae=2, active_volume=341 * n - 445)
+        return Costs(toffs=2 * n - 3, ancillae=1, active_volume=114 * n - 169)
+
+    def _estimate(self, lhs: QUInt, rhs: QUInt, ctrl: Optional[Qubits] = None):
         assert lhs.num_qubits == rhs.num_qubits, "RE implemented only for inputs of equal size."
-        n = lhs.num_qubits
-        # Note: this RE is correct only for n>=5.
-
-        if ctrl is None:
-            cost = QubrickCosts(
-                toffs=2 * n - 3,
-                active_volume=114 * n - 169,
-                local_ancillae=1,
-            )
-        else:
-            cost = QubrickCosts(
-                gidney_lelbows=2 * n - 3,
-                gidney_relbows=2 * n - 3,
-                toffs=5 * n - 6,
-                active_volume=341 * n - 445,
-                local_ancillae=2,
-            )
-        self.get_qc().add_cost_event(cost)
+        cost = self.costs(lhs.num_qubits, controlled=ctrl is not None)
+        self.get_qc().add_cost_event(cost.to_qubrick_costs())
@@ -0,0 +1,80 @@
+"""Cost models of in-place adders.
+
+Every adder of quantum numbers in this package implements `costs(n, *,
+controlled=False, carry=False)`, returning Costs of computing lhs+=rhs for
+n-qubit rhs. If `carry` is set, lhs has n+1 qubits, otherwise lhs has n
+qubits. Adders of classical constants implement `constant_costs(n, constant,
+*, controlled=False)` for n-qubit lhs and integer constant. Their `_estimate`
+uses the same models. NotImplementedError is raised for unsupported cases.
+
+Cost models for adders from Workbench are defined here.
+"""
+
+from functools import cache
+
+import psiqworkbench.qubricks as qbk
+from psiqworkbench import QPU, Qubits, QUInt, resource_estimator
+from psiqworkbench.interfaces import Adder
+from psiqworkbench.qubricks import Qubrick
+
+from ...utils.costs import Costs
+from ...utils.re_utils import FILTERS_FOR_NUMERIC_RE
+from .increment import ctz
+
+
+@cache
+def measured_adder_costs(adder_type: type[Qubrick], n: int, *, controlled: bool = False, carry: bool = False) -> Costs:
+    """Costs of adder_type() for n-qubit rhs, measured with numeric resource estimation.
+
+    Used for small registers, where closed-form cost models don't apply.
+    """
+    qc = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+    qc.reset(4 * n + 4)
+    ctrl = Qubits(1, "ctrl", qc) if controlled else None
+    adder_type().compute(QUInt(n + int(carry), "x", qc), QUInt(n, "y", qc), ctrl=ctrl)
+    re = resource_estimator(qc).resources()
+    return Costs(
+        elbows=re["gidney_lelbows"],
+        toffs=re["toffs"],
+        ancillae=re["qubit_highwater"] - (2 * n + int(carry) + int(controlled)),
+        active_volume=re["active_volume"],
+    )
+
+
+def _gidney_add_costs(n, *, controlled: bool = False, carry: bool = False) -> Costs:
+    if carry:
+        raise NotImplementedError("Cost model for GidneyAdd with carry is not implemented.")
+    if controlled:
+        return Costs(elbows=n - 1, toffs=n, ancillae=n - 1, active_volume=118 * n - 85)
+    return Costs(elbows=n - 1, ancillae=n - 1, active_volume=72 * n - 83)
+
+
+def _gidney_add_constant_costs(n, constant: int, *, controlled: bool = False) -> Costs:
+    # Trailing zeros of the constant don't need to be added. Controlled
+    # version is what AbsInPlace does, without computing the sign.
+    if isinstance(n, int):
+        constant %= 2**n
+    if constant == 0:
+        return Costs()
+    n -= ctz(abs(constant))
+    if controlled:
+        return Costs(elbows=n - 2, toffs=n - 1, ancillae=n - 2, active_volume=101.5 * n - 154)
+    return Costs(elbows=n - 2, ancillae=n - 2, active_volume=61 * n - 118)
+
+
+def adder_costs(adder: Adder, n, *, controlled: bool = False, carry: bool = False) -> Costs:
+    """Returns costs of adder.compute(lhs, rhs, ctrl) for n-qubit rhs."""
+    if isinstance(adder, qbk.GidneyAdd):
+        return _gidney_add_costs(n, controlled=controlled, carry=carry)
+    if not hasattr(adder, "costs"):
+        raise NotImplementedError(f"No cost model for {adder.__class__.__name__}.")
+    return adder.costs(n, controlled=controlled, carry=carry)
+
+
+def constant_adder_costs(adder: Qubrick, n, constant: int, *, controlled: bool = False) -> Costs:
+    """Returns costs of adder.compute(lhs, constant, ctrl) for n-qubit lhs."""
+    if isinstance(adder, qbk.GidneyAdd):
+        return _gidney_add_constant_costs(n, constant, controlled=controlled)
+    if not hasattr(adder, "constant_costs"):
+        raise NotImplementedError(f"No cost model for {adder.__class__.__name__}.")
+    return adder.constant_costs(n, constant, controlled=controlled)
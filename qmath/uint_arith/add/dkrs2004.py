@@ -0,0 +1,213 @@
+from typing import Optional
+
+from psiqworkbench import Qubits, QUInt
+from psiqworkbench.interfaces import Adder
+from psiqworkbench.interoperability import implements
+from psiqworkbench.qubricks import Qubrick
+
+from ...utils.costs import Costs
+from ...utils.padding import padded
+from ...utils.prefix import brent_kung_schedule
+
+
+def _propagate_blocks(m: int) -> list[tuple[int, int]]:
+    """Blocks (d, k) of d>=2 bits ending at bit k, whose propagate bits are needed for m carries.
+
+    Sorted so that both halves of every block come before it.
+    """
+    blocks = set()
+
+    def _add(d: int, k: int):
+        if d >= 2 and (d, k) not in blocks:
+            blocks.add((d, k))
+            _add(d // 2, k - d // 2)
+            _add(d // 2, k)
+
+    for k, j in brent_kung_schedule(m):
+        _add(k - j, k)
+    return sorted(blocks)
+
+
+def _num_prefix_ops(m) -> int:
+    """Number of operations in brent_kung_schedule(m).
+
+    Exact value is 2m-1-w(m)-floor(log2(m)), where w(m) is the number of set
+    bits of m. For symbolic m, returns upper bound 2m-2, which exceeds the
+    exact value by O(log m).
+    """
+    if not isinstance(m, int):
+        return 2 * m - 2
+    return 2 * m - 1 - bin(m).count("1") - (m.bit_length() - 1) if m > 0 else 0
+
+
+def _num_propagate_blocks(m) -> int:
+    """Number of blocks in _propagate_blocks(m).
+
+    Blocks are the aligned blocks of the Brent-Kung up-sweep on floor(m/2)
+    pairs of bits, so this is _num_prefix_ops(m//2). For symbolic m, returns
+    upper bound m-2.
+    """
+    if not isinstance(m, int):
+        return m - 2
+    return _num_prefix_ops(m // 2)
+
+
+class _BlockPropagates(Qubrick):
+    """Computes ancs[i]:=AND(p[k-d+1:k+1]) for i-th block (d, k)."""
+
+    def _compute(self, p: Qubits, ancs: Qubits):
+        blocks = _propagate_blocks(p.num_qubits)
+        index = {(1, k): p[k] for k in range(p.num_qubits)}
+        for i, (d, k) in enumerate(blocks):
+            ancs[i].lelbow(index[(d // 2, k - d // 2)] | index[(d // 2, k)])
+            index[(d, k)] = ancs[i]
+
+
+class _Carries(Qubrick):
+    """Computes c[k]:=carry out of bit k in a+b, for all k.
+
+    Generate bits are written to c, and are combined with Brent-Kung prefix
+    tree using propagate bits of aligned blocks.
+    """
+
+    def _combine(self, p: Qubits, c: Qubits, block_propagates: dict[tuple[int, int], Qubits]):
+        # Combining block ending at j with block ending at k: g_k ^= p_k & g_j.
+        index = {(1, k): p[k] for k in range(p.num_qubits)} | block_propagates
+        for k, j in brent_kung_schedule(p.num_qubits):
+            c[k].x(index[(k - j, k)] | c[j])
+
+    def _compute(self, a: Qubits, b: Qubits, c: Qubits):
+        m = a.num_qubits
+        for k in range(m):
+            c[k].lelbow(a[k] | b[k])
+        for k in range(m):
+            b[k].x(a[k])
+
+        blocks = _propagate_blocks(m)
+        if len(blocks) == 0:
+            self._combine(b, c, {})
+        else:
+            ancs = self.alloc_temp_qreg(len(blocks), "p")
+            with _BlockPropagates().computed(b, ancs):
+                self._combine(b, c, {block: ancs[i] for i, block in enumerate(blocks)})
+            ancs.release()
+
+        for k in range(m):
+            b[k].x(a[k])
+
+
+class _ControlledCopy(Qubrick):
+    """Computes dst:=src if ctrl=1, else 0."""
+
+    def _compute(self, ctrl: Qubits, src: Qubits, dst: Qubits):
+        for k in range(src.num_qubits):
+            dst[k].lelbow(src[k] | ctrl)
+
+
+def dkrs_toffoli_depth(n: int, *, carry: bool = False, controlled: bool = False) -> int:
+    """Toffoli depth of DKRSAdder for n-bit rhs.
+
+    Every elbow and Toffoli is counted as one layer, gates are scheduled as
+    early as possible, and gates sharing a qubit are not parallel. Controlled
+    version adds 2 layers, assuming that ctrl is fanned out.
+    """
+    m = n if carry else n - 1
+    gates = [(("c", k), ("a", k), ("b", k)) for k in range(m)]
+    key = {(1, k): ("b", k) for k in range(m)}
+    for d, k in _propagate_blocks(m):
+        key[(d, k)] = ("p", d, k)
+        gates.append((key[(d, k)], key[(d // 2, k - d // 2)], key[(d // 2, k)]))
+    gates += [(("c", k), key[(k - j, k)], ("c", j)) for k, j in brent_kung_schedule(m)]
+    gates += [gate for gate in gates[::-1] if gate[0][0] == "p"]
+    # Carries are computed, and later uncomputed with the same circuit.
+    gates = gates + gates[::-1]
+
+    depth = {}
+    for gate in gates:
+        layer = max(depth.get(q, 0) for q in gate) + 1
+        for q in gate:
+            depth[q] = layer
+    return max(depth.values(), default=0) + (2 if controlled else 0)
+
+
+@implements(Adder[QUInt, QUInt])
+class DKRSAdder(Qubrick):
+    """Computes lhs += rhs using carry-lookahead addition algorithm.
+
+    Sizes of registers must match or lhs must be 1 qubit longer (then carry
+    is added to its most significant qubit). Shorter rhs is padded.
+
+    All carries are computed at once with O(log n) depth, then lhs is
+    replaced with the sum s. Carries of a+~s are the same as carries of a+b,
+    so they are uncomputed by running carry computation in reverse on ~s.
+    Toffoli depth is O(log n) (see dkrs_toffoli_depth), instead of O(n) for
+    ripple-carry adders. Controlled version first copies rhs to ancillae if
+    ctrl is set.
+
+    Implementation of the in-place adder presented in paper:
+        "A logarithmic-depth quantum carry-lookahead adder",
+        Draper, Kutin, Rains, Svore, 2004.
+        https://arxiv.org/abs/quant-ph/0406142
+    """
+
+    def _add(self, lhs: Qubits, rhs: Qubits):
+        n = rhs.num_qubits
+        m = lhs.num_qubits - 1 if lhs.num_qubits == n else n
+        if m > 0:
+            c = self.alloc_temp_qreg(m, "c")
+            carries = _Carries()
+            carries.compute(rhs[0:m], lhs[0:m], c)
+        for k in range(n):
+            lhs[k].x(rhs[k])
+        for k in range(1, lhs.num_qubits):
+            lhs[k].x(c[k - 1])
+        if m > 0:
+            lhs[0:m].x()
+            carries.uncompute()
+            lhs[0:m].x()
+            c.release()
+
+    def _compute(self, lhs: QUInt, rhs: QUInt, ctrl: Optional[Qubits] = None):
+        n = len(rhs)
+        assert len(lhs) >= n, "Register `rhs` cannot be longer than register `lhs`."
+        if len(lhs) > n + 1:
+            with padded(self, (rhs,), (len(lhs) - 1,)) as (rhs,):
+                self._compute(lhs, rhs, ctrl=ctrl)
+        elif ctrl is None:
+            self._add(lhs, rhs)
+        else:
+            rhs_ctrl = self.alloc_temp_qreg(n, "rhs_ctrl")
+            with _ControlledCopy().computed(ctrl, rhs, rhs_ctrl):
+                self._add(lhs, rhs_ctrl)
+            rhs_ctrl.release()
+
+    def costs(self, n: int, *, controlled: bool = False, carry: bool = False) -> Costs:
+        """Costs of adding n-qubit rhs.
+
+        Exact for numeric n. For symbolic n, counts of the prefix tree are
+        replaced with upper bounds (see _num_prefix_ops), so elbows and
+        Toffolis are overestimated by O(log n).
+        """
+        m = n if carry else n - 1
+        num_blocks = _num_propagate_blocks(m)
+        num_toffs = 2 * _num_prefix_ops(m)
+        # Generate bits, and propagate bits of blocks (computed and
+        # uncomputed twice). Active volume of elbow and its uncomputation is
+        # the same as in lookup, and of Toffoli is the same as in JHHAMultipler.
+        num_elbows = m + 2 * num_blocks
+        num_cnots = 4 * m + n + m
+        ancillae = m + num_blocks
+        if controlled:
+            num_elbows += n
+            ancillae += n
+        return Costs(
+            elbows=num_elbows,
+            toffs=num_toffs,
+            ancillae=ancillae,
+            active_volume=53 * num_elbows + 51 * num_toffs + 4 * num_cnots,
+        )
+
+    def _estimate(self, lhs: QUInt, rhs: QUInt, ctrl: Optional[Qubits] = None):
+        assert lhs.num_qubits == rhs.num_qubits, "RE implemented only for inputs of equal size."
+        cost = self.costs(lhs.num_qubits, controlled=ctrl is not None)
+        self.get_qc().add_cost_event(cost.to_qubrick_costs())
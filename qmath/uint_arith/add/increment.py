@@ -2,6 +2,8 @@ import psiqworkbench.qubricks as qbk
 from psiqworkbench import QUInt, Qubits
 from psiqworkbench.qubricks import Qubrick
 
+from ...utils.costs import Costs
+
 
 def ctz(n: int) -> int:
     """Counts trailing zeros"""
@@ -69,3 +71,17 @@ class Increment(Qubrick):
             return
         tz = ctz(rhs)
         self._add_constant_internal(rhs >> tz, lhs[tz:])
+
+    def constant_costs(self, n, constant: int, *, controlled: bool = False) -> Costs:
+        """Costs of adding constant to n-qubit register. Active volume is approximate."""
+        if controlled:
+            raise NotImplementedError("Increment is not controlled.")
+        if isinstance(n, int):
+            constant %= 2**n
+        if constant == 0:
+            return Costs()
+        n -= ctz(abs(constant))
+        if isinstance(n, int) and n <= 3:
+            return Costs(toffs=1 if n == 3 else 0, active_volume=51 if n == 3 else 0)
+        # Chain of elbows and one Toffoli, 2 CNOTs per qubit.
+        return Costs(elbows=n - 3, toffs=1, ancillae=n - 3, active_volume=53 * (n - 3) + 51 + 8 * n)
@@ -0,0 +1,139 @@
+"""Process-wide policy choosing which adder is used at each call site.
+
+By default, GidneyAdd is used everywhere. A policy with a `metric` picks, for
+every addition, the candidate with the smallest cost for given register size,
+controlledness and constant operand, according to cost models in costs.py.
+Costs can be compared only for numeric register sizes, otherwise the default
+adder is used. Decisions are logged at DEBUG level.
+
+Usage:
+    with adder_policy(AdderPolicy(metric="ancillae")):
+        op.compute(x)
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Sequence
+
+import psiqworkbench.qubricks as qbk
+from psiqworkbench import Qubits, QUInt
+from psiqworkbench.qubricks import Qubrick
+
+from .cdkm2004 import CDKMAdder
+from .costs import adder_costs, constant_adder_costs
+from .dkrs2004 import DKRSAdder
+from .increment import Increment
+from .ttk2009 import TTKAdder
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("toffolis", "elbows", "toffs", "ancillae", "active_volume")
+
+
+class AdderPolicy:
+    """Chooses adder for every addition.
+
+    If `metric` is None, GidneyAdd is always used. Otherwise, the adder
+    minimizing `metric` (see Costs) is chosen from `adders` for additions of
+    quantum numbers, and from `constant_adders` for additions of classical
+    constants. Ties are broken by order of candidates.
+    """
+
+    def __init__(
+        self,
+        metric: str | None = None,
+        *,
+        adders: Sequence[Qubrick] | None = None,
+        constant_adders: Sequence[Qubrick] | None = None,
+    ):
+        assert metric is None or metric in METRICS, f"Unknown metric: {metric}."
+        self.metric = metric
+        self.default = qbk.GidneyAdd()
+        self.adders = adders if adders is not None else (self.default, TTKAdder(), CDKMAdder(), DKRSAdder())
+        if constant_adders is None:
+            constant_adders = (self.default, Increment())
+        self.constant_adders = constant_adders
+
+    def choose(self, n, *, controlled: bool = False, constant: int | None = None) -> Qubrick:
+        """Returns adder for n-qubit registers, or for n-qubit lhs and integer constant rhs."""
+        if self.metric is None or not isinstance(n, int):
+            return self.default
+        candidates = []
+        for adder in self.adders if constant is None else self.constant_adders:
+            try:
+                if constant is None:
+                    cost = adder_costs(adder, n, controlled=controlled)
+                else:
+                    cost = constant_adder_costs(adder, n, constant, controlled=controlled)
+            except NotImplementedError:
+                continue
+            candidates.append((cost.get(self.metric), adder))
+        if len(candidates) == 0:
+            return self.default
+        value, adder = min(candidates, key=lambda c: c[0])
+        logger.debug(
+            "Chose %s for n=%d, controlled=%s, constant=%s: %s=%s.",
+            adder.__class__.__name__,
+            n,
+            controlled,
+            constant,
+            self.metric,
+            value,
+        )
+        return adder
+
+    def add(self, lhs: Qubits, rhs: Qubits | int | float, *, ctrl: Qubits | None = None):
+        """Computes lhs+=rhs with chosen adder.
+
+        rhs is a quantum register or a classical number. Numbers are in units
+        of lhs (i.e. scaled by 2^lhs.radix for QFixed). Other adders than
+        GidneyAdd add registers as integers, so radixes must match.
+        """
+        n = lhs.num_qubits
+        radix = getattr(lhs, "radix", 0)
+        controlled = ctrl is not None
+        if isinstance(rhs, (int, float)):
+            constant = round(rhs * 2**radix) % 2**n
+            adder = self.choose(n, controlled=controlled, constant=constant)
+            if isinstance(adder, qbk.GidneyAdd):
+                adder.compute(lhs, rhs, ctrl=ctrl)
+            elif constant != 0 and ctrl is None:
+                adder.compute(QUInt(lhs), constant)
+            elif constant != 0:
+                # Adder is chosen for controlled addition only if its cost
+                # model supports it.
+                adder.compute(QUInt(lhs), constant, ctrl=ctrl)
+            return
+
+        # Adders other than GidneyAdd require rhs to be no longer than lhs.
+        adder = self.choose(n, controlled=controlled) if rhs.num_qubits <= n else self.default
+        if isinstance(adder, qbk.GidneyAdd):
+            adder.compute(lhs, rhs, ctrl=ctrl)
+        else:
+            assert getattr(rhs, "radix", 0) == radix, "Radixes must match."
+            adder.compute(QUInt(lhs), QUInt(rhs), ctrl=ctrl)
+
+
+_policy = AdderPolicy()
+
+
+def get_adder_policy() -> AdderPolicy:
+    """Returns current process-wide adder policy."""
+    return _policy
+
+
+def set_adder_policy(policy: AdderPolicy):
+    """Sets process-wide adder policy."""
+    global _policy
+    _policy = policy
+
+
+@contextmanager
+def adder_policy(policy: AdderPolicy):
+    """Sets adder policy within the scope, and restores previous policy after it."""
+    previous = get_adder_policy()
+    set_adder_policy(policy)
+    try:
+        yield policy
+    finally:
+        set_adder_policy(previous)
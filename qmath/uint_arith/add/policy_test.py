@@ -0,0 +1,117 @@
+import random
+
+import psiqworkbench.qubricks as qbk
+import pytest
+from psiqworkbench import QPU, QFixed, QUInt
+from psiqworkbench.filter_presets import BIT_DEFAULT
+from psiqworkbench.symbolics import Parameter
+
+from qmath.func.common import Add, AddConst, Negate
+from qmath.uint_arith.add import (
+    AdderPolicy,
+    CDKMAdder,
+    Increment,
+    TTKAdder,
+    adder_costs,
+    adder_policy,
+    get_adder_policy,
+    set_adder_policy,
+)
+from qmath.uint_arith.div import TMVHDivider
+from qmath.utils.test_utils import QPUTestHelper
+
+
+def test_default_policy():
+    policy = get_adder_policy()
+    assert policy.metric is None
+    assert isinstance(policy.choose(20), qbk.GidneyAdd)
+    assert isinstance(policy.choose(20, controlled=True), qbk.GidneyAdd)
+    assert isinstance(policy.choose(20, constant=1), qbk.GidneyAdd)
+
+
+def test_choose():
+    policy = AdderPolicy(metric="ancillae")
+    assert isinstance(policy.choose(20), TTKAdder)
+    assert isinstance(policy.choose(20, controlled=True), TTKAdder)
+    assert isinstance(policy.choose(20, constant=5), Increment)
+    # Increment has no controlled version.
+    assert isinstance(policy.choose(20, constant=5, controlled=True), qbk.GidneyAdd)
+    assert isinstance(AdderPolicy(metric="toffolis").choose(20), qbk.GidneyAdd)
+    assert isinstance(AdderPolicy(metric="ancillae", adders=[CDKMAdder()]).choose(20), CDKMAdder)
+
+
+@pytest.mark.parametrize("metric", ["toffolis", "ancillae", "active_volume"])
+def test_choose_small_registers(metric: str):
+    policy = AdderPolicy(metric=metric)
+    for n in range(1, 6):
+        for controlled in [False, True]:
+            adder = policy.choose(n, controlled=controlled)
+            assert adder_costs(adder, n, controlled=controlled).toffolis <= 5 * n
+    assert adder_costs(TTKAdder(), 1).toffolis == 0
+    assert adder_costs(TTKAdder(), 1, controlled=True).toffolis == 1
+
+
+def test_choose_symbolic_size_uses_default():
+    policy = AdderPolicy(metric="ancillae")
+    assert isinstance(policy.choose(Parameter("n", "Register size")), qbk.GidneyAdd)
+
+
+def test_adder_policy_scope():
+    policy = AdderPolicy(metric="ancillae")
+    previous = get_adder_policy()
+    with adder_policy(policy):
+        assert get_adder_policy() is policy
+    assert get_adder_policy() is previous
+
+    with pytest.raises(ValueError):
+        with adder_policy(policy):
+            raise ValueError()
+    assert get_adder_policy() is previous
+
+    set_adder_policy(policy)
+    assert get_adder_policy() is policy
+    set_adder_policy(previous)
+
+
+@pytest.mark.parametrize("metric", ["ancillae", "active_volume"])
+def test_add_with_policy(metric: str):
+    with adder_policy(AdderPolicy(metric=metric)):
+        qpu_helper = QPUTestHelper(num_inputs=2, num_qubits=100, qubits_per_reg=12, radix=5)
+        qs_x, qs_y = qpu_helper.inputs
+        Add().compute(qs_x, qs_y)
+        AddConst(1.40625).compute(qs_x)
+        Negate().compute(qs_x)
+        qpu_helper.record_op(qs_x)
+
+    for _ in range(5):
+        x = random.randint(-(2**9), 2**9) / 2**5
+        y = random.randint(-(2**9), 2**9) / 2**5
+        assert qpu_helper.apply_op([x, y]) == -(x + y + 1.40625)
+
+
+@pytest.mark.parametrize("ctrl_value", [0, 1])
+def test_controlled_add_with_custom_constant_adders(ctrl_value: int):
+    policy = AdderPolicy(metric="ancillae", constant_adders=[qbk.GidneyAdd(), Increment()])
+    # Increment has no controlled version, so the custom GidneyAdd is chosen.
+    assert policy.choose(8, controlled=True, constant=1) is not policy.default
+
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(20)
+    x, ctrl = QFixed(8, name="x", radix=3, qpu=qpu), QUInt(1, "ctrl", qpu)
+    x.write(2.625)
+    ctrl.write(ctrl_value)
+    with adder_policy(policy):
+        Negate().compute(x, ctrl=ctrl)
+    assert x.read() == (-2.625 if ctrl_value else 2.625)
+
+
+def test_divider_with_policy():
+    n = 8
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(4 * n)
+    a, b, c = QUInt(n, "a", qpu), QUInt(n - 1, "b", qpu), QUInt(n, "c", qpu)
+    a.write(200)
+    b.write(7)
+    with adder_policy(AdderPolicy(metric="ancillae")):
+        TMVHDivider().compute(a, b, c)
+    assert (a.read(), b.read(), c.read()) == (200 % 7, 7, 200 // 7)
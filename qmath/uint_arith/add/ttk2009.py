@@ -4,9 +4,10 @@ from psiqworkbench import Qubits, QUInt
 from psiqworkbench.interfaces import Adder
 from psiqworkbench.interoperability import implements
 from psiqworkbench.qubricks import Qubrick
-from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
 
+from ...utils.costs import Costs
 from ...utils.padding import padded
+from .costs import measured_adder_costs
 
 
 class ApplyOuterTTKAdder(Qubrick):
@@ -81,19 +82,21 @@ class TTKAdder(Qubrick):
                 assert len(rhs) == len(lhs) - 1
                 self._compute(lhs, rhs)
 
+    def costs(self, n, *, controlled: bool = False, carry: bool = False) -> Costs:
+        """Costs of adding n-qubit rhs.
+
+        Closed form is for n>=2. Costs for n=1 are measured (see
+        measured_adder_costs).
+        """
+        if carry:
+            raise NotImplementedError("Cost model with carry is not implemented.")
+        if isinstance(n, int) and n < 2:
+            return measured_adder_costs(TTKAdder, n, controlled=controlled)
+        if controlled:
+            return Costs(toffs=7 * n - 8, active_volume=329 * n - 376)
+        return Costs(toffs=2 * n - 2, active_volume=114 * n - 118)
+
     def _estimate(self, lhs: QUInt, rhs: QUInt, ctrl: Optional[Qubits] = None):
         assert lhs.num_qubits == rhs.num_qubits, "RE implemented only for inputs of equal size."
-        n = lhs.num_qubits
-        # Note: this RE is correct only for n>=2.
-
-        if ctrl is None:
-            cost = QubrickCosts(
-                toffs=2 * n - 2,
-                active_volume=114 * n - 118,
-            )
-        else:
-            cost = QubrickCosts(
-                toffs=7 * n - 8,
-                active_volume=329 * n - 376,
-            )
-        self.get_qc().add_cost_event(cost)
+        cost = self.costs(lhs.num_qubits, controlled=ctrl is not None)
+        self.get_qc().add_cost_event(cost.to_qubrick_costs())
@@ -1,8 +1,10 @@
+import psiqworkbench.qubricks as qbk
 import pytest
 from psiqworkbench import QPU, QUInt, SymbolicQPU, SymbolicQubits, resource_estimator
 from psiqworkbench.resource_estimation.qre._resource_dict import ResourceDict
 from psiqworkbench.symbolics import Parameter
 
+from qmath.uint_arith.add import CDKMAdder, DKRSAdder, TTKAdder
 from qmath.uint_arith.div import TMVHDivider
 from qmath.utils.re_utils import verify_re, FILTERS_FOR_NUMERIC_RE
 
@@ -44,3 +46,22 @@ def test_re_tmvh_divider(restoring: bool):
     re_numeric = lambda assgn: re_numeric_divider(op, assgn)
     for na, nb in [(2, 2), (5, 3), (8, 7), (10, 10)]:
         verify_re(re_symbolic, re_numeric, {"na": na, "nb": nb})
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("restoring", [True, False])
+@pytest.mark.parametrize("adder", [TTKAdder(), CDKMAdder()])
+def test_re_tmvh_divider_with_adder(restoring: bool, adder):
+    op = TMVHDivider(restoring=restoring, adder=adder)
+    re_symbolic = re_symbolic_divider(op)
+    re_numeric = lambda assgn: re_numeric_divider(op, assgn)
+    for na, nb in [(6, 5), (8, 7), (10, 10)]:
+        verify_re(re_symbolic, re_numeric, {"na": na, "nb": nb})
+
+
+@pytest.mark.parametrize("restoring", [True, False])
+def test_cheapest_adder_for_divider(restoring: bool):
+    adders = [qbk.GidneyAdd(), TTKAdder(), CDKMAdder(), DKRSAdder()]
+    costs = {adder.__class__.__name__: TMVHDivider(restoring=restoring, adder=adder).costs(32) for adder in adders}
+    assert min(costs, key=lambda name: costs[name].toffs) == "GidneyAdd"
+    assert min(costs, key=lambda name: costs[name].ancillae) == "TTKAdder"
@@ -1,14 +1,15 @@
-import psiqworkbench.qubricks as qbk
+import dataclasses
+
 from psiqworkbench import Qubits, QUInt
 from psiqworkbench.interfaces import Adder
 from psiqworkbench.qubricks import Qubrick
-from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
-from psiqworkbench.symbolics.parameter import Max, Parameter
-from psiqworkbench import SymbolicQubits
+from psiqworkbench.symbolics.parameter import Max
 
+from ...utils.costs import Costs
 from ...utils.gates import cnot
 from ...utils.padding import padded
-from ...utils.re_utils import re_symbolic_int_binary_op
+from ..add.costs import adder_costs
+from ..add.policy import get_adder_policy
 
 
 class TMVHDivider(Qubrick):
@@ -29,29 +30,36 @@ class TMVHDivider(Qubrick):
         restoring (bool): Whether to use "restoring" or "non-restoring" division algorithm.
                           Non-restoring is the default.
         adder (Adder): in-place adder to use in this divider.
+                       If not set, adders are chosen by current adder policy.
     """
 
-    def __init__(self, *, restoring: bool = False, adder: Adder = qbk.GidneyAdd(), **kwargs):
+    def __init__(self, *, restoring: bool = False, adder: Adder | None = None, **kwargs):
         super().__init__(**kwargs)
         self.restoring = restoring
         self.adder = adder
 
+    def _get_adder(self, n, *, controlled: bool = False) -> Adder:
+        """Returns adder for n-qubit registers."""
+        if self.adder is not None:
+            return self.adder
+        return get_adder_policy().choose(n, controlled=controlled)
+
     def _ctrl_add(self, ctrl: Qubits, xs: Qubits, ys: Qubits):
         """Computes ys+=xs if ctrl=1, does nothing if ctrl=0."""
         assert len(ctrl) == 1
-        self.adder.compute(ys, xs, ctrl=ctrl)
+        self._get_adder(len(ys), controlled=True).compute(ys, xs, ctrl=ctrl)
 
     def _subtract(self, xs: Qubits, ys: Qubits):
         """Computes ys -= xs by reducing problem to addition."""
         ys.x()
-        self.adder.compute(ys, xs)
+        self._get_adder(len(ys)).compute(ys, xs)
         ys.x()
 
     def _add_sub(self, ctrl: Qubits, xs: Qubits, ys: Qubits):
         """Computes ys-=xs if ctrl=1, and ys+=xs if ctrl=0."""
         for i in range(len(ys)):
             cnot(ctrl, ys[i])
-        self.adder.compute(ys, xs)
+        self._get_adder(len(ys)).compute(ys, xs)
         for i in range(len(ys)):
             cnot(ctrl, ys[i])
 
@@ -114,32 +122,43 @@ class TMVHDivider(Qubrick):
                 self._divide_non_restoring(a, b | c[0], c[1:])
                 a[n - 1].swap(c[0])
 
+    def costs(self, n) -> Costs:
+        """Costs of division for a, c of size n, and b of size n-1 (no padding needed).
+
+        Built from cost model of the adder (see adder_costs), so it works with
+        any adder that has one.
+        """
+        if self.restoring:
+            # Each of n steps: subtraction, CNOT and controlled addition on n qubits.
+            plain = adder_costs(self._get_adder(n), n)
+            ctrl = adder_costs(self._get_adder(n, controlled=True), n, controlled=True)
+            return Costs(
+                elbows=n * (plain.elbows + ctrl.elbows),
+                toffs=n * (plain.toffs + ctrl.toffs),
+                ancillae=Max(plain.ancillae, ctrl.ancillae),
+                active_volume=n * (plain.active_volume + ctrl.active_volume + 4),
+            )
+        else:
+            # Subtraction, n-1 additions/subtractions surrounded by 2n CNOTs,
+            # and controlled addition on n-1 qubits.
+            plain = adder_costs(self._get_adder(n), n)
+            ctrl = adder_costs(self._get_adder(n - 1, controlled=True), n - 1, controlled=True)
+            return Costs(
+                elbows=n * plain.elbows + ctrl.elbows,
+                toffs=n * plain.toffs + ctrl.toffs,
+                ancillae=Max(plain.ancillae, ctrl.ancillae),
+                active_volume=n * plain.active_volume + ctrl.active_volume + 8 * n * (n - 1),
+            )
+
     def _estimate(self, a: QUInt, b: QUInt, c: QUInt):
         na = a.num_qubits
         nb = b.num_qubits
         assert c.num_qubits == na
-        assert self.adder.__class__.__name__ == "GidneyAdd", "RE supported only for GidneyAdd (default adder)."
 
         # Complexity depends only n. Diference nb-na affects only padding.
         n = Max(na, nb + 1)
         padded_size = (3 * n) if self.restoring else (3 * n - 1)
         padding_size = padded_size - (na + nb + na)
-
-        if self.restoring:
-            cost = QubrickCosts(
-                toffs=n**2,
-                local_ancillae=padding_size + (n - 1),
-                active_volume=190 * n**2 - 164 * n,
-                gidney_lelbows=2 * n**2 - 2 * n,
-                gidney_relbows=2 * n**2 - 2 * n,
-            )
-        else:
-            cost = QubrickCosts(
-                toffs=n - 1,
-                local_ancillae=padding_size + (n - 1),
-                active_volume=80 * n**2 + 27 * n - 203,
-                gidney_lelbows=n**2 - 2,
-                gidney_relbows=n**2 - 2,
-            )
-
-        self.get_qc().add_cost_event(cost)
+        cost = self.costs(n)
+        cost = dataclasses.replace(cost, ancillae=padding_size + cost.ancillae)
+        self.get_qc().add_cost_event(cost.to_qubrick_costs())
@@ -1,5 +1,6 @@
 """Quantum multiplication algorithms."""
 
 from .jhaa2016 import JHHAMultipler
+from .karatsuba import GidneyMultiplier, KaratsubaMultiplier
 from .mct2017 import MCTMultipler
 from .multiplier import Multiplier
@@ -0,0 +1,212 @@
+import math
+from functools import cache
+
+import psiqworkbench.qubricks as qbk
+from psiqworkbench import QPU, Qubits, QUInt, resource_estimator
+from psiqworkbench.interoperability import implements
+from psiqworkbench.qubricks import Qubrick
+from psiqworkbench.symbolics.parameter import Max
+from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
+
+from ...utils.gates import ParallelCnot
+from ...utils.re_utils import FILTERS_FOR_NUMERIC_RE
+from .mct2017 import MCTMultipler
+from .multiplier import Multiplier
+
+
+@implements(Multiplier)
+class GidneyMultiplier(Qubrick):
+    """Computes result:=a*b using GidneyMultiplyAdd from psiqworkbench."""
+
+    def _compute(self, a: QUInt, b: QUInt, result: QUInt) -> None:
+        qbk.GidneyMultiplyAdd().compute(QUInt(result), QUInt(a), QUInt(b))
+
+
+# Computes anc[i] := x[i] AND y.
+class _AndCopy(Qubrick):
+    def _compute(self, x: Qubits, y: Qubits, anc: Qubits):
+        for i in range(x.num_qubits):
+            anc[i].lelbow(x[i] | y)
+
+
+class _KaratsubaStep(Qubrick):
+    """Computes result:=a*b, leaving garbage in temporary registers.
+
+    Splits a=a0+2^h*a1, b=b0+2^h*b1 and uses a*b=z0+2^h*(z1-z0-z2)+2^(2h)*z2,
+    where z0=a0*b0, z2=a1*b1 and z1=(a0+a1)*(b0+b1). The carry bits of the
+    sums a0+a1 and b0+b1 are handled with controlled additions, so all 3
+    products are of h-bit numbers.
+    """
+
+    def __init__(self, kara: "KaratsubaMultiplier", **kwargs):
+        super().__init__(**kwargs)
+        self.kara = kara
+
+    def _multiply(self, a: Qubits, b: Qubits, result: Qubits, parent_size: int):
+        # Clean multiplication for small sizes, dirty recursive step otherwise.
+        reclaim_size = self.kara.reclaim_size
+        if a.num_qubits <= self.kara.base_size:
+            self.kara.base().compute(QUInt(a), QUInt(b), QUInt(result))
+        elif reclaim_size is not None and a.num_qubits <= reclaim_size < parent_size:
+            self.kara._multiply_clean(a, b, result)
+        else:
+            _KaratsubaStep(self.kara).compute(a, b, result)
+
+    # t += 2^h*ctrl*x.
+    def _add_controlled(self, t: Qubits, x: Qubits, ctrl: Qubits, h: int):
+        anc = self.alloc_temp_qreg(x.num_qubits, "anc")
+        with _AndCopy().computed(x, ctrl, anc):
+            qbk.GidneyAdd().compute(QUInt(t[h:]), QUInt(anc))
+        anc.release()
+
+    def _compute(self, a: Qubits, b: Qubits, result: Qubits):
+        n = a.num_qubits
+        h = (n + 1) // 2
+        a0, a1, b0, b1 = a[0:h], a[h:], b[0:h], b[h:]
+        self._multiply(a0, b0, result[0 : 2 * h], n)
+        self._multiply(a1, b1, result[2 * h :], n)
+
+        # sa:=a0+a1, sb:=b0+b1.
+        sa = self.alloc_temp_qreg(h + 1, "sa")
+        sb = self.alloc_temp_qreg(h + 1, "sb")
+        for s, x0, x1 in [(sa, a0, a1), (sb, b0, b1)]:
+            ParallelCnot().compute(x0, s[0:h])
+            qbk.GidneyAdd().compute(QUInt(s), QUInt(x1))
+
+        # t:=sa*sb.
+        t = self.alloc_temp_qreg(2 * h + 2, "t")
+        self._multiply(sa[0:h], sb[0:h], t[0 : 2 * h], n)
+        self._add_controlled(t, sb[0:h], sa[h], h)
+        self._add_controlled(t, sa[0:h], sb[h], h)
+        self._add_controlled(t, sa[h], sb[h], 2 * h)
+
+        # t:=t-z0-z2=a0*b1+a1*b0, which is less than 2^(n+1).
+        t.x()
+        qbk.GidneyAdd().compute(QUInt(t), QUInt(result[0 : 2 * h]))
+        qbk.GidneyAdd().compute(QUInt(t), QUInt(result[2 * h :]))
+        t.x()
+        qbk.GidneyAdd().compute(QUInt(result[h:]), QUInt(t[0 : n + 1]))
+
+
+@implements(Multiplier)
+class KaratsubaMultiplier(Qubrick):
+    """Computes result:=a*b using Karatsuba algorithm.
+
+    Requires that registers a and b are of the same size n, and register
+    `result` is of size 2n.
+
+    Recursion stops when size of the inputs is at most `base_size`, then
+    `base` multiplier is used (any class implementing Multiplier protocol).
+    Each recursion level leaves its sums and middle product as garbage, which
+    is cleaned by uncomputing the whole recursion after copying the result
+    (Bennett's trick). This takes O(n^log2(3)) Toffolis and ancillae.
+
+    If `reclaim_size` is set, every subproblem of size at most `reclaim_size`
+    is also computed this way, so its ancillae are released and reused by
+    the next subproblem. This doubles cost of recursion levels below
+    `reclaim_size`, but reduces number of ancillae.
+
+    Resource estimate is valid only if n and `reclaim_size` are `base_size`
+    times a power of 2. This is checked for numeric n, and assumed for
+    symbolic n.
+
+    Reference:
+        Alex Parent, Martin Roetteler, Michele Mosca.
+        Improved reversible and quantum circuits for Karatsuba-based integer multiplication.
+        https://arxiv.org/abs/1706.03419
+    """
+
+    def __init__(
+        self,
+        *,
+        base: type[Qubrick] = MCTMultipler,
+        base_size: int = 16,
+        reclaim_size: int | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        assert base_size >= 3
+        assert reclaim_size is None or reclaim_size > base_size
+        self.base = base
+        self.base_size = base_size
+        self.reclaim_size = reclaim_size
+
+    def _multiply_clean(self, a: Qubits, b: Qubits, result: Qubits):
+        work = self.alloc_temp_qreg(result.num_qubits, "work")
+        with _KaratsubaStep(self).computed(a, b, work):
+            ParallelCnot().compute(work, result)
+        work.release()
+
+    def _compute(self, a: QUInt, b: QUInt, result: QUInt) -> None:
+        n = a.num_qubits
+        assert b.num_qubits == n, "Register sizes must match."
+        assert result.num_qubits == 2 * n, "Register sizes must match."
+        if n <= self.base_size:
+            self.base().compute(a, b, result)
+        else:
+            self._multiply_clean(a, b, result)
+
+    def _estimate(self, a: QUInt, b: QUInt, result: QUInt) -> None:
+        n = a.num_qubits
+        assert b.num_qubits == n
+        assert result.num_qubits == 2 * n
+
+        # This RE assumes that n and reclaim_size are base_size times power of 2.
+        message = "Estimate requires sizes that are base_size times power of 2."
+        assert not isinstance(n, int) or _is_pow2_multiple(n, self.base_size), message
+        assert self.reclaim_size is None or _is_pow2_multiple(self.reclaim_size, self.base_size), message
+        base = _base_costs(self.base, self.base_size)
+        if self.reclaim_size is None or n <= self.reclaim_size:
+            costs = _karatsuba_costs(n, self.base_size, base)
+        else:
+            sub = _karatsuba_costs(self.reclaim_size, self.base_size, base)
+            costs = _karatsuba_costs(n, self.reclaim_size, sub)
+        elbows, toffs, av, ancillae = costs
+        cost = QubrickCosts(
+            gidney_lelbows=elbows,
+            gidney_relbows=elbows,
+            toffs=toffs,
+            local_ancillae=ancillae,
+            active_volume=av,
+        )
+        self.get_qc().add_cost_event(cost)
+
+
+def _is_pow2_multiple(n: int, s: int) -> bool:
+    """Whether n is s times a power of 2."""
+    q, r = divmod(n, s)
+    return r == 0 and q >= 1 and q & (q - 1) == 0
+
+
+@cache
+def _base_costs(base: type[Qubrick], n: int) -> tuple:
+    """Numeric costs of base multiplier: (elbows, toffs, active_volume, ancillae)."""
+    qc = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+    qc.reset(5 * n)
+    base().compute(QUInt(n, "x", qc), QUInt(n, "y", qc), QUInt(2 * n, "z", qc))
+    re = resource_estimator(qc).resources()
+    return re["gidney_lelbows"], re["toffs"], re["active_volume"], re["qubit_highwater"] - 4 * n
+
+
+def _karatsuba_costs(n, s: int, sub: tuple) -> tuple:
+    """Costs of clean Karatsuba multiplication of n-bit numbers.
+
+    Recursion stops at size s, where every subproblem costs `sub`.
+    Returns (elbows, toffs, active_volume, ancillae).
+    """
+    sub_elbows, sub_toffs, sub_av, sub_ancillae = sub
+    # Number of subproblems of size s is 3^k, and sum of 3^i*(n/2^i) over
+    # levels is 2n(1.5^k-1), where k=log2(n/s).
+    leaves = (n / s) ** math.log2(3)
+    level_sum = 2 * n * ((n / s) ** math.log2(1.5) - 1)
+    # Per level of size n: 6.5n+5 elbows, 448n+248 active volume,
+    # and 2n+4 garbage qubits. Twice for computing and uncomputing, and 2n
+    # CNOTs to copy result.
+    elbows = 2 * (leaves * sub_elbows + 6.5 * level_sum + 5 * (leaves - 1) / 2)
+    toffs = 2 * leaves * sub_toffs
+    av = 2 * (leaves * sub_av + 448 * level_sum + 248 * (leaves - 1) / 2) + 8 * n
+    # Peak is reached when all garbage is allocated, plus work register and
+    # ancillae of one subproblem or of the largest addition.
+    garbage = 2 * level_sum + 4 * (leaves - 1) / 2
+    ancillae = 2 * n + garbage + Max(sub_ancillae, 1.5 * n)
+    return elbows, toffs, av, ancillae
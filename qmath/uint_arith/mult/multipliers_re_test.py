@@ -3,7 +3,7 @@ from psiqworkbench import QPU, QUInt, SymbolicQPU, SymbolicQubits, resource_esti
 from psiqworkbench.resource_estimation.qre._resource_dict import ResourceDict
 from psiqworkbench.symbolics import Parameter
 
-from qmath.uint_arith.mult import JHHAMultipler, MCTMultipler, Multiplier
+from qmath.uint_arith.mult import JHHAMultipler, KaratsubaMultiplier, MCTMultipler, Multiplier
 from qmath.utils.re_utils import FILTERS_FOR_NUMERIC_RE, verify_re
 
 
@@ -20,11 +20,11 @@ def re_symbolic_multiplier(op: Multiplier) -> ResourceDict:
     return re.resources()
 
 
-def re_numeric_multiplier(op: Multiplier, assgn: dict[str, int]) -> ResourceDict:
+def re_numeric_multiplier(op: Multiplier, assgn: dict[str, int], qubits_factor: int = 4) -> ResourceDict:
     """Numeric resource estimation for multiplier."""
     n = assgn["n"]
     qc = QPU(filters=FILTERS_FOR_NUMERIC_RE)
-    qc.reset(4 * n + 1)
+    qc.reset(qubits_factor * n + 1)
     qs_x = QUInt(n, "x", qc)
     qs_y = QUInt(n, "y", qc)
     qs_z = QUInt(2 * n, "z", qc)
@@ -50,3 +50,37 @@ def test_re_mct():
     re_numeric = lambda assgn: re_numeric_multiplier(op, assgn)
     for n in [1, 5, 10, 20]:
         verify_re(re_symbolic, re_numeric, {"n": n}, no_fail=True)
+
+
+@pytest.mark.re
+@pytest.mark.parametrize("reclaim_size", [None, 16])
+def test_re_karatsuba(reclaim_size):
+    op = KaratsubaMultiplier(base_size=8, reclaim_size=reclaim_size)
+    re_symbolic = re_symbolic_multiplier(op)
+    re_numeric = lambda assgn: re_numeric_multiplier(op, assgn, qubits_factor=30)
+    for n in [16, 32, 64]:
+        # Toffolis and elbows are exact, qubit high-water is approximate.
+        verify_re(re_symbolic, re_numeric, {"n": n}, av_rtol=0.05, no_fail=True)
+        re1, re2 = re_numeric({"n": n}), re_symbolic.evaluate({"n": n})
+        assert re1["toffs"] == re2["toffs"]
+        assert abs(re1["gidney_lelbows"] - re2["gidney_lelbows"]) < 1e-6 * re1["gidney_lelbows"] + 1
+
+
+@pytest.mark.re
+@pytest.mark.slow
+def test_karatsuba_crossover():
+    # Benchmark: Toffoli count (including elbows) of Karatsuba and schoolbook multipliers.
+    ops = {"mct": MCTMultipler(), "jhha": JHHAMultipler(), "karatsuba": KaratsubaMultiplier(base_size=16)}
+    symbolic = {name: re_symbolic_multiplier(op) for name, op in ops.items()}
+    sizes = [32, 64, 128, 256, 512, 1024, 2048]
+    costs = dict()
+    for n in sizes:
+        for name, re in symbolic.items():
+            re_n = re.evaluate({"n": n})
+            costs[(n, name)] = re_n["toffs"] + re_n["gidney_lelbows"]
+    assert costs[(32, "karatsuba")] > costs[(32, "mct")]
+    assert costs[(2048, "karatsuba")] < 0.5 * costs[(2048, "mct")]
+    # Once Karatsuba is cheaper than schoolbook multiplier, it stays cheaper for larger n.
+    for name in ["mct", "jhha"]:
+        cheaper = [costs[(n, "karatsuba")] < costs[(n, name)] for n in sizes]
+        assert cheaper == sorted(cheaper)
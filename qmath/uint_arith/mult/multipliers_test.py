@@ -4,12 +4,12 @@ import pytest
 from psiqworkbench import QPU, QUInt
 from psiqworkbench.filter_presets import BIT_DEFAULT
 
-from qmath.uint_arith.mult import JHHAMultipler, MCTMultipler, Multiplier
+from qmath.uint_arith.mult import GidneyMultiplier, JHHAMultipler, KaratsubaMultiplier, MCTMultipler, Multiplier
 
 
-def _check_multiplier(multiplier: Multiplier, num_bits, num_trials=5):
+def _check_multiplier(multiplier: Multiplier, num_bits, num_trials=5, num_qubits=None):
     qc = QPU(filters=BIT_DEFAULT)
-    qc.reset(4 * num_bits + 1)
+    qc.reset(num_qubits or 4 * num_bits + 1)
 
     a = QUInt(num_bits, "a", qc)
     b = QUInt(num_bits, "b", qc)
@@ -33,3 +33,13 @@ def test_mct_multiplier(num_bits: int):
 @pytest.mark.parametrize("num_bits", [1, 2, 5, 10])
 def test_jhha_multiplier(num_bits: int):
     _check_multiplier(JHHAMultipler(num_bits), 10)
+
+
+@pytest.mark.parametrize("num_bits", [5, 8, 13, 20])
+@pytest.mark.parametrize("base", [MCTMultipler, JHHAMultipler, GidneyMultiplier])
+def test_karatsuba_multiplier(num_bits: int, base):
+    _check_multiplier(KaratsubaMultiplier(base=base, base_size=3), num_bits, num_qubits=20 * num_bits)
+
+
+def test_karatsuba_multiplier_reclaim():
+    _check_multiplier(KaratsubaMultiplier(base_size=3, reclaim_size=8), 24, num_qubits=500)
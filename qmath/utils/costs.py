@@ -0,0 +1,37 @@
+"""Closed-form costs of Qubricks, which can be queried without running estimation."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
+
+
+@dataclass(frozen=True)
+class Costs:
+    """Costs of one call of a Qubrick. Values may be symbolic.
+
+    Every left elbow is assumed to be uncomputed by a right elbow.
+    """
+
+    elbows: Any = 0
+    toffs: Any = 0
+    ancillae: Any = 0
+    active_volume: Any = 0
+
+    @property
+    def toffolis(self) -> Any:
+        """Number of Toffolis, counting elbows as Toffolis (their uncomputation is free)."""
+        return self.elbows + self.toffs
+
+    def get(self, metric: str) -> Any:
+        """Returns cost by name: "elbows", "toffs", "toffolis", "ancillae" or "active_volume"."""
+        return getattr(self, metric)
+
+    def to_qubrick_costs(self) -> QubrickCosts:
+        return QubrickCosts(
+            gidney_lelbows=self.elbows,
+            gidney_relbows=self.elbows,
+            toffs=self.toffs,
+            local_ancillae=self.ancillae,
+            active_volume=self.active_volume,
+        )
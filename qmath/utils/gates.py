@@ -68,3 +68,9 @@ class ParallelCnotCtrl(Qubrick):
         assert dst.num_qubits == n
         for i in range(n):
             dst[i].x(src[i] | ctrl)
+
+    def _estimate(self, ctrl: Qubits, src: Qubits, dst: Qubits):
+        n = src.num_qubits
+        assert dst.num_qubits == n
+        # Active volume of Toffoli is the same as in JHHAMultipler.
+        self.get_qc().add_cost_event(QubrickCosts(toffs=n, active_volume=51 * n))
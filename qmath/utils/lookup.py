@@ -1,84 +1,613 @@
 import math
 from typing import Optional
 
+import numpy as np
+
 from psiqworkbench import QFixed, Qubits, QUInt, SymbolicQubits
 from psiqworkbench.qubricks import Qubrick
 from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
 
-from .gates import write_uint
+from .gates import ParallelCnot, swap, write_uint
 
 
-class TableLookup(Qubrick):
-    """Assigns target ⊕= table[input].
+def num_lookup_elbows(address_size: int, table_size: int) -> int:
+    """Number of left/right elbows used by MultiTableLookup.
+
+    num_elbows≈ts and abs(num_elbows-ts)<log2(ts), where ts=table_size.
+    The construction places one elbow per node of the unary iteration tree
+    (except the root). A full subtree of depth k has 2^k-1 nodes, so only the
+    rightmost path needs to be walked, which takes O(log(ts)) steps.
+    """
+    count = 0
+    m, ts = address_size, table_size
+    while m > 0 and ts > 0:
+        half = 2 ** (m - 1)
+        count += 1
+        if ts > half:
+            # Left subtree is full.
+            count += half - 1
+            ts -= half
+        m -= 1
+    return count - 1
+
+
+def _unlookup_elbows(table_size: int, log_one_hot_size: int) -> int:
+    # Elbows of MultiTableUnlookup with one-hot register of size 2^l.
+    l = log_one_hot_size
+    address_size = int(math.ceil(math.log2(table_size)))
+    num_blocks = (table_size + 2**l - 1) // 2**l
+    lookup_elbows = num_lookup_elbows(address_size - l, num_blocks) if num_blocks >= 2 else 0
+    return 2**l - 1 + lookup_elbows
+
+
+def _log_one_hot_size(table_size: int) -> int:
+    # Size of one-hot register, chosen to minimize number of elbows.
+    address_size = int(math.ceil(math.log2(table_size)))
+    return min(range(address_size + 1), key=lambda l: _unlookup_elbows(table_size, l))
+
+
+def unlookup_costs(table_size: int) -> tuple[int, int, int]:
+    """Returns elbows, ancillae and active volume of MultiTableUnlookup.
+
+    Costs depend only on the table size (measurements are not included).
+    """
+    address_size = int(math.ceil(math.log2(table_size)))
+    l = _log_one_hot_size(table_size)
+    num_elbows = _unlookup_elbows(table_size, l)
+    # Phase table depends on measurement outcomes, so we assume half of CZs are applied.
+    ancillae = 2**l + max(0, address_size - l - 1)
+    return num_elbows, ancillae, 53 * num_elbows + 8 * (2**l - 1) + 2 * table_size
+
+
+def as_word_table(table) -> np.ndarray:
+    """Converts table of non-negative integers to (N, words) array of uint64.
+
+    Row i holds table[i] split into 64-bit words, least significant first.
+    Accepts lists of Python ints of any size, 1D integer arrays and
+    already packed 2D arrays.
+    """
+    if isinstance(table, np.ndarray) and table.ndim == 2:
+        return np.ascontiguousarray(table, dtype=np.uint64)
+    try:
+        return np.ascontiguousarray(table, dtype=np.uint64).reshape(-1, 1)
+    except OverflowError:
+        # Values don't fit in 64 bits.
+        values = [int(v) for v in table]
+        assert min(values) >= 0, "Table values must be non-negative."
+        return np.array([int_to_words(v, max(values).bit_length()) for v in values], dtype=np.uint64)
+
+
+def int_to_words(value: int, num_bits: int) -> np.ndarray:
+    """Splits non-negative integer of at most num_bits bits into 64-bit words."""
+    num_words = max(1, (num_bits + 63) // 64)
+    assert 0 <= value < 2 ** (64 * num_words)
+    return np.array([(value >> (64 * i)) & (2**64 - 1) for i in range(num_words)], dtype=np.uint64)
+
+
+def table_bits(words: np.ndarray, num_bits: int) -> np.ndarray:
+    """Converts (N, words) table to (N, num_bits) boolean array of its bits."""
+    all_bits = np.unpackbits(words.astype("<u8").view(np.uint8), axis=1, bitorder="little")
+    assert not all_bits[:, num_bits:].any(), f"Table values must fit in {num_bits} bits."
+    return all_bits[:, :num_bits].astype(bool)
+
+
+def bits_to_words(bits: np.ndarray) -> np.ndarray:
+    """Converts (N, num_bits) boolean array to (N, words) table. Inverse of table_bits."""
+    num_words = max(1, (bits.shape[1] + 63) // 64)
+    padded = np.zeros((bits.shape[0], 64 * num_words), dtype=np.uint8)
+    padded[:, : bits.shape[1]] = bits
+    packed = np.packbits(padded, axis=1, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8").astype(np.uint64)
+
+
+def popcount(values) -> int:
+    """Total number of set bits in all values (which must be non-negative integers)."""
+    if len(values) == 0:
+        return 0
+    words = as_word_table(values)
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+class MultiTableLookup(Qubrick):
+    """Assigns targets[j] ⊕= tables[j][input] for all j.
+
+    All tables are indexed by the same address, so the unary iteration over
+    the address is done only once, and at every leaf of the iteration all
+    targets are written. This costs the same number of elbows as a single
+    TableLookup, instead of len(tables) times more.
+
+    If `prune=True`, the iteration skips subtrees in which all entries are
+    zero, and doesn't branch on subtrees whose two halves have equal entries
+    (the write is shared by both halves). Entries beyond the end of the table
+    are treated as "don't care", so the address must be less than table size.
+    This is useful for sparse tables (e.g. XOR-differenced coefficients) and
+    tables whose length is not a power of 2.
 
     Reference: https://arxiv.org/pdf/1805.03662 (fig. 7).
     """
 
-    def __init__(self, table: list[int], **kwargs):
+    def __init__(self, tables: list[list[int]], *, prune: bool = False, **kwargs):
         super().__init__(**kwargs)
-        assert len(table) >= 2
-        self.table = table
-        self.address_size = int(math.ceil(math.log2(len(table))))
+        assert len(tables) >= 1
+        assert len(tables[0]) >= 2
+        assert all(len(table) == len(tables[0]) for table in tables), "All tables must have the same size."
+        self.tables = tables
+        self.words = [as_word_table(table) for table in tables]
+        self.table_size = len(tables[0])
+        self.address_size = int(math.ceil(math.log2(self.table_size)))
+        self.prune = prune
+        self._bit_plans = dict()
+        self._prune_flags = None
 
-    def _lookup_ctrl(self, ctrl: Qubits, address: Optional[Qubits], target: QUInt, table: list[int]):
-        if len(table) == 0:
+    def _set_bits(self, table_idx: int, num_bits: int, index: int) -> np.ndarray:
+        # Positions of set bits in tables[table_idx][index].
+        # Bits of the whole table are unpacked once per target size.
+        key = (table_idx, num_bits)
+        if key not in self._bit_plans:
+            self._bit_plans[key] = table_bits(self.words[table_idx], num_bits)
+        return np.flatnonzero(self._bit_plans[key][index])
+
+    def _write(self, ctrl: Qubits, targets: list[QUInt], index: int):
+        for j, target in enumerate(targets):
+            for i in self._set_bits(j, target.num_qubits, index):
+                target[int(i)].x(ctrl)
+
+    def _lookup_ctrl(self, ctrl: Qubits, address: Optional[Qubits], targets: list[QUInt], start: int, end: int):
+        # Writes entries with indices start..end-1, addressed by `address` relative to `start`.
+        if start >= end:
             return
         if address is None:
-            assert len(table) == 1
-            write_uint(target, table[0], ctrl=ctrl)
+            assert end == start + 1
+            self._write(ctrl, targets, start)
             return
 
         m = len(address)
-        assert len(table) <= 2**m
+        assert end - start <= 2**m
+        mid = min(start + 2 ** (m - 1), end)
 
         anc = self.alloc_temp_qreg(1, "anc")
         address[m - 1].x()
         anc.lelbow(ctrl | address[m - 1])
         address[m - 1].x()
         address_rec = address[0 : m - 1] if m > 1 else None
-        self._lookup_ctrl(anc, address_rec, target, table[0 : 2 ** (m - 1)])
+        self._lookup_ctrl(anc, address_rec, targets, start, mid)
         anc.x(ctrl)
-        self._lookup_ctrl(anc, address_rec, target, table[2 ** (m - 1) :])
+        self._lookup_ctrl(anc, address_rec, targets, mid, end)
         anc.relbow(ctrl | address[m - 1])
         anc.release()
 
-    def _compute(self, address: QUInt, target: QUInt):
+    def _get_prune_flags(self) -> tuple[list[np.ndarray], list[np.ndarray]]:
+        """For every level k and block b of entries b*2^k..(b+1)*2^k-1, computes two flags.
+
+        zero[k][b] - whether all entries in the block are zero (or absent).
+        merge[k][b] - whether two halves of the block have equal entries,
+            ignoring absent entries.
+        """
+        if self._prune_flags is not None:
+            return self._prune_flags
+        m = self.address_size
+        size = 2**m
+        rows = np.concatenate(self.words, axis=1)
+        padded = np.zeros((size, rows.shape[1]), dtype=np.uint64)
+        padded[: self.table_size] = rows
+        present = np.arange(size) < self.table_size
+        zero = [~padded.any(axis=1)]
+        merge = [np.zeros(size, dtype=bool)]
+        for k in range(1, m + 1):
+            halves = padded.reshape(2 ** (m - k), 2, 2 ** (k - 1), -1)
+            right_present = present.reshape(2 ** (m - k), 2, 2 ** (k - 1))[:, 1]
+            equal = (halves[:, 0] == halves[:, 1]).all(axis=-1)
+            merge.append((equal | ~right_present).all(axis=-1))
+            zero.append(zero[k - 1][0::2] & zero[k - 1][1::2])
+        self._prune_flags = (zero, merge)
+        return self._prune_flags
+
+    def _lookup_pruned(
+        self, ctrl: Optional[Qubits], address: Optional[Qubits], targets: list[QUInt], start: int, k: int
+    ):
+        # Writes entries with indices start..start+2^k-1, addressed by `address` (k qubits).
+        # If ctrl is None, the block is not controlled by anything yet (top of the tree).
+        zero, merge = self._get_prune_flags()
+        block = start >> k
+        if zero[k][block]:
+            return
+        if k == 0:
+            self._write(ctrl, targets, start)
+            return
+
+        address_rec = address[0 : k - 1] if k > 1 else None
+        if merge[k][block]:
+            # Both halves are equal, no need to branch on address[k-1].
+            self._lookup_pruned(ctrl, address_rec, targets, start, k - 1)
+            return
+
+        mid = start + 2 ** (k - 1)
+        if ctrl is None:
+            address[k - 1].x()
+            self._lookup_pruned(address[k - 1], address_rec, targets, start, k - 1)
+            address[k - 1].x()
+            self._lookup_pruned(address[k - 1], address_rec, targets, mid, k - 1)
+            return
+
+        anc = self.alloc_temp_qreg(1, "anc")
+        if zero[k - 1][2 * block + 1]:
+            # Only left half is non-zero.
+            address[k - 1].x()
+            anc.lelbow(ctrl | address[k - 1])
+            self._lookup_pruned(anc, address_rec, targets, start, k - 1)
+            anc.relbow(ctrl | address[k - 1])
+            address[k - 1].x()
+        elif zero[k - 1][2 * block]:
+            # Only right half is non-zero.
+            anc.lelbow(ctrl | address[k - 1])
+            self._lookup_pruned(anc, address_rec, targets, mid, k - 1)
+            anc.relbow(ctrl | address[k - 1])
+        else:
+            address[k - 1].x()
+            anc.lelbow(ctrl | address[k - 1])
+            address[k - 1].x()
+            self._lookup_pruned(anc, address_rec, targets, start, k - 1)
+            anc.x(ctrl)
+            self._lookup_pruned(anc, address_rec, targets, mid, k - 1)
+            anc.relbow(ctrl | address[k - 1])
+        anc.release()
+
+    def _pruned_costs(self) -> tuple[int, int, int, int]:
+        """Returns (elbows, one-sided elbows, max nested elbows, written bits) for pruned lookup.
+
+        Walks the tree level by level, vectorised over all blocks of a level.
+        """
+        zero, merge = self._get_prune_flags()
+        # State of each block: 0 - not visited, 1 - controlled, 2 - not controlled (top of the tree).
+        state = np.array([2], dtype=np.int8)
+        depth = np.zeros(1, dtype=np.int64)
+        num_elbows, num_one_sided, max_depth = 0, 0, 0
+        for k in range(self.address_size, 0, -1):
+            active = (state != 0) & ~zero[k]
+            merged = active & merge[k]
+            split = active & ~merge[k]
+            elbow = split & (state == 1)
+            one_sided = elbow & (zero[k - 1][0::2] | zero[k - 1][1::2])
+            num_elbows += int(elbow.sum())
+            num_one_sided += int(one_sided.sum())
+            depth = depth + elbow
+            max_depth = max(max_depth, int(depth.max(initial=0)))
+            left_state = np.where(merged, state, np.where(split, 1, 0))
+            right_state = np.where(split, 1, 0)
+            state = np.stack([left_state, right_state], axis=1).reshape(-1).astype(np.int8)
+            depth = np.repeat(depth, 2)
+        written = (state != 0) & ~zero[0]
+        rows = np.concatenate(self.words, axis=1)[written[: self.table_size]]
+        return num_elbows, num_one_sided, max_depth, popcount(rows)
+
+    def _lookup(self, address: QUInt, targets: list[QUInt]):
         m = self.address_size
         assert address.num_qubits == m, f"Address size must be exactly {m}."
+        if self.prune:
+            self._lookup_pruned(None, address, targets, 0, m)
+            return
+        mid = 2 ** (m - 1)
         address[m - 1].x()
         address_rec = address[0 : m - 1] if m > 1 else None
-        self._lookup_ctrl(address[m - 1], address_rec, target, self.table[0 : 2 ** (m - 1)])
+        self._lookup_ctrl(address[m - 1], address_rec, targets, 0, mid)
         address[m - 1].x()
-        self._lookup_ctrl(address[m - 1], address_rec, target, self.table[2 ** (m - 1) :])
+        self._lookup_ctrl(address[m - 1], address_rec, targets, mid, self.table_size)
+
+    def _compute(self, address: QUInt, targets: list[QUInt]):
+        assert len(targets) == len(self.tables), "Number of targets must match number of tables."
+        self._lookup(address, targets)
 
     def _compute_elbows(self):
-        """Computes number of left/right elbows for given table size.
+        """Computes number of left/right elbows for given table size."""
+        if self.prune:
+            return self._pruned_costs()[0]
+        return num_lookup_elbows(self.address_size, self.table_size)
 
-        num_elbows≈ts and abs(num_elbows-ts)<log2(ts), where ts=len(table).
-        However, there is no exact closed formula. To get exact value, we have
-        to simulate the construction.
+    def _bits_sum(self) -> int:
+        return sum(popcount(words) for words in self.words)
 
-        g(m, ts) - Number of elbows placed by call to _lookup_ctrl,
-        where m=len(address), ts=len(table).
-        """
+    def _add_lookup_cost(self):
+        # Cost of lookup is fully determined by the tables.
+        if self.prune:
+            num_elbows, num_one_sided, max_depth, bits_sum = self._pruned_costs()
+            # One-sided branches don't need the CNOT switching to the right half.
+            cost = QubrickCosts(
+                gidney_lelbows=num_elbows,
+                gidney_relbows=num_elbows,
+                local_ancillae=max_depth,
+                active_volume=53 * num_elbows - 4 * num_one_sided + 4 * bits_sum,
+            )
+            self.get_qc().add_cost_event(cost)
+            return
+        num_elbows = self._compute_elbows()
+        cost = QubrickCosts(
+            gidney_lelbows=num_elbows,
+            gidney_relbows=num_elbows,
+            local_ancillae=self.address_size - 1,
+            active_volume=53 * num_elbows + 4 * self._bits_sum(),
+        )
+        self.get_qc().add_cost_event(cost)
+
+    def _estimate(self, address: SymbolicQubits, targets: list[SymbolicQubits]):
+        self._add_lookup_cost()
+
+    def unlookup(self, address: QUInt, targets: list[QUInt]):
+        """Uncomputes targets[j] ⊕= tables[j][input], using MultiTableUnlookup."""
+        MultiTableUnlookup(self.tables).compute(address, targets)
+
+
+class TableLookup(MultiTableLookup):
+    """Assigns target ⊕= table[input].
+
+    Reference: https://arxiv.org/pdf/1805.03662 (fig. 7).
+    """
 
-        def g(m, ts):
-            if ts == 0 or m == 0:
-                return 0
-            half = 2 ** (m - 1)
-            return 1 + g(m - 1, min(ts, half)) + g(m - 1, max(0, ts - half))
+    def __init__(self, table: list[int], *, prune: bool = False, **kwargs):
+        super().__init__([table], prune=prune, **kwargs)
+        self.table = table
 
-        return g(self.address_size, len(self.table)) - 1
+    def _compute(self, address: QUInt, target: QUInt):
+        self._lookup(address, [target])
 
     def _estimate(self, address: SymbolicQubits, target: SymbolicQubits):
-        # Cost of TableLookup is fully determined by the table.
-        num_elbows = self._compute_elbows()
-        bits_sum = sum(v.bit_count() for v in self.table)
+        self._add_lookup_cost()
+
+    def unlookup(self, address: QUInt, target: QUInt):
+        """Uncomputes target ⊕= table[input], using TableUnlookup."""
+        TableUnlookup(self.table).compute(address, target)
+
+
+class QROAMLookup(Qubrick):
+    """Assigns target ⊕= table[input], using select-swap QROAM.
+
+    Table is split into blocks of k consecutive entries. The high bits of the
+    address select a block, which is loaded into k scratch registers at once
+    using MultiTableLookup (≈N/k elbows). Then a network of controlled swaps,
+    controlled by the low bits of the address, moves the requested entry to
+    the first scratch register (b·(k-1) Toffolis, where b=target size). The
+    entry is copied to target, and the swaps and the lookup are undone.
+
+    This trades b·k extra qubits for a Toffoli count of ≈2(N/k+b·k), instead
+    of ≈N for TableLookup. If k is not given, it is chosen automatically (as
+    a power of 2 close to sqrt(N/b)) to minimize the Toffoli count.
+
+    Reference: https://arxiv.org/pdf/1812.00954 (section 2).
+    """
+
+    def __init__(self, table: list[int], k: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        assert len(table) >= 2
+        self.table = table
+        self.words = as_word_table(table)
+        self.table_size = len(table)
+        self.address_size = int(math.ceil(math.log2(self.table_size)))
+        if k is not None:
+            assert k >= 1 and (k & (k - 1)) == 0, "k must be a power of 2."
+            assert k <= 2**self.address_size, "k must not exceed 2**address_size."
+        self.k = k
+
+    def _swap_toffolis(self, k: int, b: int) -> int:
+        return b * (k - 1)
+
+    def _toffolis(self, k: int, b: int) -> int:
+        num_blocks = (self.table_size + k - 1) // k
+        log_k = k.bit_length() - 1
+        elbows = num_lookup_elbows(self.address_size - log_k, num_blocks) if num_blocks >= 2 else 0
+        return 2 * (elbows + self._swap_toffolis(k, b))
+
+    def choose_k(self, b: int) -> int:
+        """Returns block size k minimizing Toffoli count, for target of size b."""
+        if self.k is not None:
+            return self.k
+        candidates = [2**l for l in range(self.address_size + 1)]
+        return min(candidates, key=lambda k: (self._toffolis(k, b), k))
 
+    def _block_tables(self, k: int) -> list[np.ndarray]:
+        # Table i holds entries i, k+i, 2k+i, ...
+        num_blocks = (self.table_size + k - 1) // k
+        padded = np.zeros((num_blocks * k, self.words.shape[1]), dtype=np.uint64)
+        padded[: self.table_size] = self.words
+        blocks = padded.reshape(num_blocks, k, -1)
+        return [blocks[:, i, :] for i in range(k)]
+
+    def _load_blocks(self, address_hi: Optional[Qubits], scratch: list[QUInt], block_tables: list[np.ndarray]):
+        if address_hi is None:
+            for reg, words in zip(scratch, block_tables):
+                for i in np.flatnonzero(table_bits(words, reg.num_qubits)[0]):
+                    reg[int(i)].x()
+        else:
+            MultiTableLookup(block_tables).compute(address_hi, scratch)
+
+    def _swap_network(self, address_lo: Qubits, scratch: list[QUInt], reverse: bool = False):
+        k = len(scratch)
+        steps = [(j, i) for j in range(len(address_lo)) for i in range(0, k, 2 ** (j + 1))]
+        if reverse:
+            steps = steps[::-1]
+        for j, i in steps:
+            for q in range(scratch[i].num_qubits):
+                swap(scratch[i][q], scratch[i + 2**j][q], ctrl=address_lo[j])
+
+    def _compute(self, address: QUInt, target: QUInt):
+        m = self.address_size
+        assert address.num_qubits == m, f"Address size must be exactly {m}."
+        b = target.num_qubits
+        k = self.choose_k(b)
+        if k == 1:
+            TableLookup(self.table).compute(address, target)
+            return
+
+        log_k = k.bit_length() - 1
+        address_lo = address[0:log_k]
+        address_hi = address[log_k:m] if log_k < m else None
+        scratch = [QUInt(self.alloc_temp_qreg(b, f"scratch{i}")) for i in range(k)]
+        block_tables = self._block_tables(k)
+
+        self._load_blocks(address_hi, scratch, block_tables)
+        self._swap_network(address_lo, scratch)
+        ParallelCnot().compute(scratch[0], target)
+        self._swap_network(address_lo, scratch, reverse=True)
+        self._load_blocks(address_hi, scratch, block_tables)
+
+        for reg in scratch:
+            reg.release()
+
+    def _estimate(self, address: SymbolicQubits, target: SymbolicQubits):
+        m = self.address_size
+        b = target.num_qubits
+        if self.k is None:
+            assert isinstance(b, int), "Automatic choice of k requires numeric target size."
+        k = self.choose_k(b)
+        if k == 1:
+            TableLookup(self.table).compute(address, target)
+            return
+
+        log_k = k.bit_length() - 1
+        num_blocks = (self.table_size + k - 1) // k
+        elbows = 0
+        lookup_av = 0
+        lookup_ancillae = 0
+        if num_blocks >= 2:
+            elbows = num_lookup_elbows(m - log_k, num_blocks)
+            bits_sum = popcount(self.words)
+            lookup_av = 53 * elbows + 4 * bits_sum
+            lookup_ancillae = m - log_k - 1
+        swaps = self._swap_toffolis(k, b)
+        # Controlled swap costs 1 Toffoli, with the same active volume as in JHHAMultipler.
+        cost = QubrickCosts(
+            gidney_lelbows=2 * elbows,
+            gidney_relbows=2 * elbows,
+            toffs=2 * swaps,
+            local_ancillae=k * b + lookup_ancillae,
+            active_volume=2 * lookup_av + 2 * 51 * swaps + 4 * b,
+        )
+        self.get_qc().add_cost_event(cost)
+
+    def unlookup(self, address: QUInt, target: QUInt):
+        """Uncomputes target ⊕= table[input], using TableUnlookup."""
+        TableUnlookup(self.table).compute(address, target)
+
+
+class _PhaseLookup(MultiTableLookup):
+    """Applies Z to qubit i of one-hot register if bit i of table[input] is set."""
+
+    def _write(self, ctrl: Qubits, targets: list[Qubits], index: int):
+        one_hot = targets[0]
+        for i in self._set_bits(0, one_hot.num_qubits, index):
+            one_hot[int(i)].z(ctrl)
+
+
+class MultiTableUnlookup(Qubrick):
+    """Uncomputes targets[j] ⊕= tables[j][input], returning targets to zero.
+
+    Instead of repeating the lookup, measures targets in X basis. The outcome
+    s leaves phase (-1)^(s·tables[input]) on the address, which is fixed by a
+    phase lookup: low l bits of the address are expanded to one-hot register
+    of size 2^l (2^l-1 elbows), and lookup over high bits applies CZs on the
+    one-hot register (≈N/2^l elbows). With l≈log2(N)/2 this costs ≈2sqrt(N)
+    elbows instead of ≈N.
+
+    Reference: https://arxiv.org/pdf/1902.02134 (appendix C).
+    """
+
+    def __init__(self, tables: list[list[int]], **kwargs):
+        super().__init__(**kwargs)
+        assert len(tables) >= 1
+        assert len(tables[0]) >= 2
+        assert all(len(table) == len(tables[0]) for table in tables), "All tables must have the same size."
+        self.tables = tables
+        self.words = [as_word_table(table) for table in tables]
+        self.table_size = len(tables[0])
+        self.address_size = int(math.ceil(math.log2(self.table_size)))
+        self.log_one_hot_size = _log_one_hot_size(self.table_size)
+
+    def num_elbows(self) -> int:
+        """Number of left (and right) elbows used by unlookup."""
+        return _unlookup_elbows(self.table_size, self.log_one_hot_size)
+
+    def _costs(self) -> tuple:
+        """Returns elbows, ancillae and active volume of unlookup (without measurements)."""
+        return unlookup_costs(self.table_size)
+
+    def _phase_table(self, outcomes: list[int]) -> np.ndarray:
+        # Bit i of entry j is the phase for address j*2^l+i.
+        parity = np.zeros(self.table_size, dtype=np.uint8)
+        for s, words in zip(outcomes, self.words):
+            num_bits = 64 * words.shape[1]
+            masked = words & int_to_words(s % 2**num_bits, num_bits)
+            parity ^= (np.unpackbits(masked.view(np.uint8), axis=1).sum(axis=1) % 2).astype(np.uint8)
+        l = self.log_one_hot_size
+        num_blocks = (self.table_size + 2**l - 1) // 2**l
+        padded = np.zeros(num_blocks * 2**l, dtype=np.uint8)
+        padded[: self.table_size] = parity
+        return bits_to_words(padded.reshape(num_blocks, 2**l))
+
+    def _one_hot(self, address: QUInt, one_hot: Qubits, reverse: bool = False):
+        # Maps |0..0> to one-hot encoding of l lowest bits of address (or back, if reverse).
+        steps = [(j, i) for j in range(self.log_one_hot_size) for i in range(2**j)]
+        if not reverse:
+            one_hot[0].x()
+            for j, i in steps:
+                one_hot[i + 2**j].lelbow(one_hot[i] | address[j])
+                one_hot[i].x(one_hot[i + 2**j])
+        else:
+            for j, i in steps[::-1]:
+                one_hot[i].x(one_hot[i + 2**j])
+                one_hot[i + 2**j].relbow(one_hot[i] | address[j])
+            one_hot[0].x()
+
+    def _compute(self, address: QUInt, targets: list[QUInt]):
+        assert len(targets) == len(self.tables), "Number of targets must match number of tables."
+        m = self.address_size
+        assert address.num_qubits == m, f"Address size must be exactly {m}."
+
+        # Measure targets in X basis and reset them. Qubits are measured one
+        # at a time, so the superposition never grows beyond 2 branches.
+        outcomes = []
+        for target in targets:
+            s = 0
+            for i in range(target.num_qubits):
+                target[i].had()
+                s |= QUInt(target[i]).read() << i
+            write_uint(target, s)
+            outcomes.append(s)
+
+        # Fix phases.
+        l = self.log_one_hot_size
+        phases = self._phase_table(outcomes)
+        one_hot = self.alloc_temp_qreg(2**l, "one_hot")
+        self._one_hot(address, one_hot)
+        if len(phases) == 1:
+            for i in np.flatnonzero(table_bits(phases, 2**l)[0]):
+                one_hot[int(i)].z()
+        else:
+            _PhaseLookup([phases]).compute(address[l:m], [one_hot])
+        self._one_hot(address, one_hot, reverse=True)
+        one_hot.release()
+
+    def _estimate(self, address: SymbolicQubits, targets: list[SymbolicQubits]):
+        num_elbows, ancillae, av = self._costs()
         cost = QubrickCosts(
             gidney_lelbows=num_elbows,
             gidney_relbows=num_elbows,
-            local_ancillae=self.address_size - 1,
-            active_volume=53 * num_elbows + 4 * bits_sum,
+            measurements=sum(target.num_qubits for target in targets),
+            local_ancillae=ancillae,
+            active_volume=av,
         )
         self.get_qc().add_cost_event(cost)
+
+
+class TableUnlookup(MultiTableUnlookup):
+    """Uncomputes target ⊕= table[input], returning target to zero.
+
+    See MultiTableUnlookup.
+    """
+
+    def __init__(self, table: list[int], **kwargs):
+        super().__init__([table], **kwargs)
+        self.table = table
+
+    def _compute(self, address: QUInt, target: QUInt):
+        super()._compute(address, [target])
+
+    def _estimate(self, address: SymbolicQubits, target: SymbolicQubits):
+        super()._estimate(address, [target])
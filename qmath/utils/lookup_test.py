@@ -1,12 +1,25 @@
 import random
+import time
 
+import numpy as np
 import pytest
 from psiqworkbench import QPU, QUInt, SymbolicQPU, SymbolicQubits, resource_estimator
 from psiqworkbench.filter_presets import BIT_DEFAULT
 from psiqworkbench.resource_estimation.qre._resource_dict import ResourceDict
 from psiqworkbench.symbolics import Parameter
 
-from qmath.utils.lookup import TableLookup
+from qmath.utils.lookup import (
+    MultiTableLookup,
+    MultiTableUnlookup,
+    QROAMLookup,
+    TableLookup,
+    TableUnlookup,
+    as_word_table,
+    num_lookup_elbows,
+    popcount,
+    table_bits,
+    unlookup_costs,
+)
 from qmath.utils.re_utils import FILTERS_FOR_NUMERIC_RE, verify_re
 
 
@@ -26,6 +39,89 @@ def test_table_lookup():
             assert target.read() == table[i]
 
 
+@pytest.mark.parametrize("seed", range(5))
+def test_pruned_lookup(seed: int):
+    random.seed(seed)
+    tables = [
+        [random.choice([0, 0, 0, random.randint(0, 15)]) for _ in range(13)],
+        [random.choice([3, 5]) for _ in range(13)],
+        [random.randint(0, 15) for _ in range(13)],
+    ]
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(4 + 4 + 3)
+    address = QUInt(4, name="address", qpu=qpu)
+    target = QUInt(4, name="target", qpu=qpu)
+    for table in tables:
+        op = TableLookup(table, prune=True)
+        assert op._compute_elbows() <= TableLookup(table)._compute_elbows()
+        for i in range(len(table)):
+            address.write(i)
+            target.write(0)
+            op.compute(address, target)
+            assert target.read() == table[i]
+
+
+def test_pruned_lookup_elbows():
+    # Dense table of size 2^m: nothing to prune.
+    table = [random.randint(1, 2**20) for _ in range(64)]
+    assert TableLookup(table, prune=True)._compute_elbows() == TableLookup(table)._compute_elbows()
+    # Padded table.
+    table = [random.randint(1, 2**20) for _ in range(33)]
+    assert TableLookup(table, prune=True)._compute_elbows() < TableLookup(table)._compute_elbows()
+    # Sparse table.
+    table = [0] * 30 + [7, 7]
+    assert TableLookup(table, prune=True)._compute_elbows() == 3
+
+
+def test_table_lookup_wide_words():
+    n = 130
+    table = [random.randint(0, 2**n - 1) for _ in range(5)]
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(3 + n + 2)
+    address = QUInt(3, name="address", qpu=qpu)
+    target = QUInt(n, name="target", qpu=qpu)
+    op = TableLookup(table)
+    assert op.words.shape == (5, 3)
+    for i in range(len(table)):
+        address.write(i)
+        target.write(0)
+        op.compute(address, target)
+        assert target.read() == table[i]
+
+
+def test_word_table():
+    values = [random.randint(0, 2**100) for _ in range(20)]
+    bits = table_bits(as_word_table(values), 101)
+    for value, row in zip(values, bits):
+        assert sum(int(b) << i for i, b in enumerate(row)) == value
+    assert as_word_table([1, 2, 3]).shape == (3, 1)
+    with pytest.raises(AssertionError):
+        table_bits(as_word_table([4]), 2)
+
+
+@pytest.mark.smoke
+def test_multi_table_lookup():
+    tables = [[1, 8, 7, 9, 15, 0, 3], [8, 4, 9, 0, 0, 1, 1], [2, 2, 2, 2, 0, 0, 7]]
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(15)
+    address = QUInt(3, name="address", qpu=qpu)
+    targets = [QUInt(4, name=f"target_{j}", qpu=qpu) for j in range(len(tables))]
+    op = MultiTableLookup(tables)
+    for i in range(len(tables[0])):
+        address.write(i)
+        for target in targets:
+            target.write(0)
+        op.compute(address, targets)
+        for target, table in zip(targets, tables):
+            assert target.read() == table[i]
+
+
+def test_multi_table_lookup_elbows():
+    # Walking the address once costs the same number of elbows as one lookup.
+    tables = [[random.randint(0, 15) for _ in range(13)] for _ in range(5)]
+    assert MultiTableLookup(tables)._compute_elbows() == TableLookup(tables[0])._compute_elbows()
+
+
 def _re_symbolic_lookup(op: TableLookup) -> ResourceDict:
     n = Parameter("n", "Target size")
     m = op.address_size
@@ -55,3 +151,172 @@ def test_re_table_lookup():
         re_symbolic = _re_symbolic_lookup(op)
         re_numeric = lambda assgn: _re_numeric_lookup(op, assgn)
         verify_re(re_symbolic, re_numeric, {"n": n})
+
+
+@pytest.mark.re
+def test_re_pruned_table_lookup():
+    for table_size, n in [(10, 20), (33, 25)]:
+        table = [random.choice([0, 0, random.randint(0, 2**n - 1)]) for _ in range(table_size)]
+        op = TableLookup(table, prune=True)
+        re_symbolic = _re_symbolic_lookup(op)
+        re_numeric = lambda assgn: _re_numeric_lookup(op, assgn)
+        verify_re(re_symbolic, re_numeric, {"n": n}, av_rtol=0.05)
+
+
+def _re_symbolic_multi_lookup(op: MultiTableLookup) -> ResourceDict:
+    n = Parameter("n", "Target size")
+    m = op.address_size
+    qpu = SymbolicQPU()
+    address = SymbolicQubits(m, "address", qpu)
+    targets = [SymbolicQubits(n, f"target_{j}", qpu) for j in range(len(op.tables))]
+    op.compute(address, targets)
+    return resource_estimator(qpu).resources()
+
+
+def _re_numeric_multi_lookup(op: MultiTableLookup, assgn: dict[str, int]) -> ResourceDict:
+    n = assgn["n"]
+    m = op.address_size
+    qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+    qpu.reset((len(op.tables) + 1) * n + m)
+    address = QUInt(m, "address", qpu)
+    targets = [QUInt(n, f"target_{j}", qpu) for j in range(len(op.tables))]
+    op.compute(address, targets)
+    return resource_estimator(qpu).resources()
+
+
+@pytest.mark.re
+def test_re_multi_table_lookup():
+    for table_size, num_tables, n in [(2, 2, 10), (10, 3, 20), (32, 5, 25)]:
+        tables = [[random.randint(0, 2**n - 1) for _ in range(table_size)] for _ in range(num_tables)]
+        op = MultiTableLookup(tables)
+        re_symbolic = _re_symbolic_multi_lookup(op)
+        re_numeric = lambda assgn: _re_numeric_multi_lookup(op, assgn)
+        verify_re(re_symbolic, re_numeric, {"n": n})
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize("k", [None, 1, 2, 4, 8])
+def test_qroam_lookup(k):
+    table = [1, 8, 7, 9, 15, 0, 3, 4, 11, 2, 6]
+    op = QROAMLookup(table, k=k)
+    qpu = QPU(filters=BIT_DEFAULT)
+    qpu.reset(4 + 4 + 4 * 8 + 3)
+    address = QUInt(4, name="address", qpu=qpu)
+    target = QUInt(4, name="target", qpu=qpu)
+    for i in range(len(table)):
+        address.write(i)
+        target.write(0)
+        op.compute(address, target)
+        assert target.read() == table[i]
+        assert address.read() == i
+
+
+def test_qroam_choose_k():
+    table = [random.randint(0, 2**8 - 1) for _ in range(1024)]
+    op = QROAMLookup(table)
+    k = op.choose_k(8)
+    assert k > 1
+    assert op._toffolis(k, 8) < op._toffolis(1, 8)
+    assert QROAMLookup(table, k=4).choose_k(8) == 4
+
+
+def _re_numeric_qroam(op: QROAMLookup, assgn: dict[str, int]) -> ResourceDict:
+    n = assgn["n"]
+    m = op.address_size
+    qpu = QPU(filters=FILTERS_FOR_NUMERIC_RE)
+    qpu.reset((op.k + 2) * n + m)
+    address = QUInt(m, "address", qpu)
+    target = QUInt(n, "target", qpu)
+    op.compute(address, target)
+    return resource_estimator(qpu).resources()
+
+
+@pytest.mark.re
+def test_re_qroam_lookup():
+    for table_size, k, n in [(10, 2, 10), (32, 4, 12), (100, 8, 6)]:
+        table = [random.randint(0, 2**n - 1) for _ in range(table_size)]
+        op = QROAMLookup(table, k=k)
+        re_symbolic = _re_symbolic_lookup(op)
+        re_numeric = lambda assgn: _re_numeric_qroam(op, assgn)
+        verify_re(re_symbolic, re_numeric, {"n": n}, av_rtol=0.2)
+
+
+def _check_unlookup(lookup, num_targets: int):
+    m, n = 3, 3
+    qpu = QPU()
+    qpu.reset(m + num_targets * n + 2**m + m)
+    address = QUInt(m, name="address", qpu=qpu)
+    targets = [QUInt(n, name=f"target_{j}", qpu=qpu) for j in range(num_targets)]
+    address.had()
+    if num_targets == 1:
+        lookup.compute(address, targets[0])
+        lookup.unlookup(address, targets[0])
+    else:
+        lookup.compute(address, targets)
+        lookup.unlookup(address, targets)
+
+    # Targets must be returned to zero, and the address must be in uniform superposition without phases.
+    state = qpu.pull_state(with_qreg_labels=True)
+    amps = state["amps"]
+    assert amps.keys() == {(a,) + (0,) * num_targets for a in range(2**m)}
+    assert np.allclose(np.array(list(amps.values())), 2 ** (-m / 2))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_table_unlookup(seed: int):
+    random.seed(seed)
+    table = [random.randint(0, 7) for _ in range(8)]
+    _check_unlookup(TableLookup(table), 1)
+    _check_unlookup(QROAMLookup(table, k=2), 1)
+    tables = [[random.randint(0, 7) for _ in range(7)] for _ in range(2)]
+    _check_unlookup(MultiTableLookup(tables), 2)
+
+
+def test_unlookup_elbows():
+    for table_size in [16, 100, 1024]:
+        table = [random.randint(0, 255) for _ in range(table_size)]
+        unlookup_elbows = TableUnlookup(table).num_elbows()
+        assert unlookup_elbows <= 3 * np.sqrt(table_size)
+        assert unlookup_elbows < TableLookup(table)._compute_elbows()
+        assert unlookup_costs(table_size)[0] == unlookup_elbows
+    assert MultiTableUnlookup([table, table]).num_elbows() == TableUnlookup(table).num_elbows()
+
+
+def test_num_lookup_elbows():
+    def g(m, ts):
+        # Direct simulation of the unary iteration.
+        if ts == 0 or m == 0:
+            return 0
+        half = 2 ** (m - 1)
+        return 1 + g(m - 1, min(ts, half)) + g(m - 1, max(0, ts - half))
+
+    for table_size in range(2, 600):
+        m = (table_size - 1).bit_length()
+        for address_size in [m, m + 1]:
+            assert num_lookup_elbows(address_size, table_size) == g(address_size, table_size) - 1
+
+
+def test_popcount():
+    assert popcount([0, 1, 3, 7]) == 6
+    assert popcount(np.array([5, 6], dtype=np.int64)) == 4
+    assert popcount([2**64 - 1, 2**63 + 1]) == 66
+    assert popcount([2**70 - 1, 1]) == 71
+    values = [random.randint(0, 2**50) for _ in range(1000)]
+    assert popcount(values) == sum(v.bit_count() for v in values)
+
+
+@pytest.mark.slow
+def test_lookup_estimation_time():
+    # Micro-benchmark: elbow count is O(log N), bit sum is vectorised O(N).
+    for log_size in [10, 15, 20]:
+        table = np.random.randint(0, 2**40, size=2**log_size, dtype=np.int64)
+        op = TableLookup(table)
+        start = time.perf_counter()
+        for _ in range(100):
+            op._compute_elbows()
+        elbows_time = (time.perf_counter() - start) / 100
+        start = time.perf_counter()
+        op._bits_sum()
+        bits_time = time.perf_counter() - start
+        assert elbows_time < 1e-3
+        assert bits_time < 1.0
@@ -0,0 +1,94 @@
+"""Reversible pebbling of chains of computations.
+
+Reference:
+    Charles H. Bennett. Time/space trade-offs for reversible computation. 1989.
+    https://doi.org/10.1137/0218053
+"""
+
+from typing import Callable
+
+from psiqworkbench import Qubits
+from psiqworkbench.qubricks import Qubrick
+
+
+def _split(length: int, arity: int) -> list[int]:
+    # Splits chain into at most `arity` segments of nearly equal lengths.
+    num_segments = min(arity, length)
+    return [length // num_segments + (1 if i < length % num_segments else 0) for i in range(num_segments)]
+
+
+def pebbling_cost(num_steps: int, arity: int) -> tuple[int, int]:
+    """Returns number of applied steps (including uncomputations) and maximal number of live values.
+
+    Initial value of the chain is not counted as live value.
+    """
+    if num_steps == 1:
+        return 1, 1
+    steps, live = 0, 0
+    segments = _split(num_steps, arity)
+    for j, length in enumerate(segments):
+        seg_steps, seg_live = pebbling_cost(length, arity)
+        steps += seg_steps if j == len(segments) - 1 else 2 * seg_steps
+        live = max(live, j + seg_live)
+        if j < len(segments) - 1:
+            # Segment is uncomputed while the final value is live too.
+            live = max(live, j + 1 + seg_live)
+    return steps, live
+
+
+class _PebbledSegment(Qubrick):
+    def __init__(self, chain: "PebbledChain", start: int, length: int, **kwargs):
+        super().__init__(**kwargs)
+        self.chain = chain
+        self.start = start
+        self.length = length
+
+    def _compute(self, x: Qubits, *args):
+        if self.length == 1:
+            step = self.chain.make_step(self.start)
+            step.compute(x, *args)
+            self.set_result_qreg(step.get_result_qreg())
+            return
+
+        # Advance pebble to the end of every segment, then remove pebbles
+        # from intermediate points in reverse order.
+        segments = []
+        start = self.start
+        for length in _split(self.length, self.chain.arity):
+            segment = _PebbledSegment(self.chain, start, length)
+            segment.compute(x, *args)
+            x = segment.get_result_qreg()
+            segments.append(segment)
+            start += length
+        for segment in segments[-2::-1]:
+            segment.uncompute()
+        self.set_result_qreg(x)
+
+
+class PebbledChain(Qubrick):
+    """Computes x_k=f_k(...f_2(f_1(x_0))), keeping only x_0 and x_k.
+
+    `make_step(i)` must return a Qubrick computing x_{i+1} from x_i, which
+    allocates x_{i+1} and sets it as its result register. Additional arguments
+    passed to `compute` are passed to every step.
+
+    Intermediate values are uncomputed using Bennett's pebbling strategy: the
+    chain is split into `arity` segments, each segment is computed recursively,
+    then all but the last segment are uncomputed. About
+    (arity-1)*log_arity(k)+1 values are live at the same time, and
+    k^log_arity(2*arity-1) steps are applied. If arity>=k, every step is
+    applied at most twice, but all intermediate values are live at once.
+    """
+
+    def __init__(self, make_step: Callable[[int], Qubrick], num_steps: int, *, arity: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        assert num_steps >= 1
+        assert arity >= 2
+        self.make_step = make_step
+        self.num_steps = num_steps
+        self.arity = arity
+
+    def _compute(self, x: Qubits, *args):
+        segment = _PebbledSegment(self, 0, self.num_steps)
+        segment.compute(x, *args)
+        self.set_result_qreg(segment.get_result_qreg())
@@ -0,0 +1,26 @@
+import pytest
+
+from qmath.utils.pebbling import pebbling_cost
+
+
+@pytest.mark.parametrize(
+    "num_steps, arity, expected",
+    [
+        (1, 2, (1, 1)),
+        (2, 2, (3, 2)),
+        (3, 2, (7, 3)),
+        (4, 2, (9, 3)),
+        (5, 2, (17, 4)),
+        (16, 2, (81, 5)),
+        (5, 5, (9, 5)),
+    ],
+)
+def test_pebbling_cost(num_steps: int, arity: int, expected: tuple[int, int]):
+    assert pebbling_cost(num_steps, arity) == expected
+
+
+def test_pebbling_cost_trade_off():
+    # Larger arity means fewer applied steps, but more live values.
+    costs = [pebbling_cost(27, arity) for arity in [2, 3, 27]]
+    assert costs[0][0] > costs[1][0] > costs[2][0]
+    assert costs[0][1] < costs[1][1] < costs[2][1]
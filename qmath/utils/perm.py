@@ -2,6 +2,7 @@
 
 from psiqworkbench import Qubits, QUFixed
 from psiqworkbench.qubricks import Qubrick
+from psiqworkbench.symbolics.qubrick_costs import QubrickCosts
 
 from typing import Optional
 
@@ -30,6 +31,28 @@ def rotate_right(qs: Qubits, ctrl: Optional[Qubits] = None):
     RotateLeftByOne().compute(qs, ctrl=ctrl, dagger=True)
 
 
+class ShiftLeft(Qubrick):
+    """Shifts qubits in register left (towards higher bits) by `shift`.
+
+    Assumes that `shift` most significant qubits are zero. Then rotating every
+    chain of qubits with step `shift` is a shift, which takes n-shift SWAPs.
+    """
+
+    def __init__(self, shift: int, **kwargs):
+        super().__init__(**kwargs)
+        self.shift = shift
+
+    def _compute(self, x: Qubits, ctrl: Optional[Qubits] = None):
+        for i in range(x.num_qubits - 1, self.shift - 1, -1):
+            swap(x[i], x[i - self.shift], ctrl=ctrl)
+
+    def _estimate(self, x: Qubits, ctrl: Optional[Qubits] = None):
+        if ctrl is not None:
+            # Active volume of controlled swap is the same as in JHHAMultipler.
+            num_swaps = x.num_qubits - self.shift
+            self.get_qc().add_cost_event(QubrickCosts(toffs=num_swaps, active_volume=51 * num_swaps))
+
+
 class Div2(Qubrick):
     """Conditional division by 2.
 
@@ -0,0 +1,23 @@
+"""Schedules for parallel prefix computations."""
+
+
+def brent_kung_schedule(n: int) -> list[tuple[int, int]]:
+    """Pairs (k, j) such that doing p[k]:=p[j] OP p[k] in order computes prefixes of p.
+
+    Uses Brent-Kung tree: up-sweep combines blocks of sizes 1, 2, 4, ... and
+    down-sweep propagates prefixes to the remaining positions. Takes about 2n
+    operations in 2*log2(n) rounds. In every operation, p[k] before it is
+    the combination of the aligned block of k-j elements ending at k.
+    """
+    ops = []
+    d = 1
+    while 2 * d <= n:
+        for k in range(2 * d - 1, n, 2 * d):
+            ops.append((k, k - d))
+        d *= 2
+    d //= 2
+    while d >= 1:
+        for k in range(3 * d - 1, n, 2 * d):
+            ops.append((k, k - d))
+        d //= 2
+    return ops